@@ -0,0 +1,29 @@
+"""Operator-only endpoints, enabled by `GYMYO_ADMIN_TOKEN`."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import require_admin
+from app.profiling import profiler
+from app.singleflight import flight_stats
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/allocations")
+def allocations(limit: int = Query(default=20, ge=1, le=200)) -> dict[str, object]:
+    """Per-route allocation figures, top live allocation sites and growth since the last reset."""
+    return profiler.report(limit)
+
+
+@router.post("/allocations/reset")
+def reset_allocations() -> dict[str, str]:
+    profiler.reset()
+    return {"status": "reset"}
+
+
+@router.get("/singleflight")
+def singleflight() -> dict[str, dict[str, float]]:
+    """Calls, executions and coalesced waiters per single-flight group."""
+    return flight_stats()
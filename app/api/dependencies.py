@@ -0,0 +1,181 @@
+"""Request-scoped dependencies: tenant resolution, shard-bound sessions and conditional GETs."""
+
+from __future__ import annotations
+
+import hmac
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Generator
+from dataclasses import dataclass
+from datetime import date
+
+from fastapi import Depends, Header, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from app.conditional import data_etag, not_modified
+from app.db.database import get_user_read_session, get_user_session, shards
+from app.db.repositories import DEFAULT_USER_ID, get_data_version, hash_api_token, verify_api_token
+from app.prescriptions import prescription_day
+
+AUTH_REQUIRED = os.getenv("GYMYO_AUTH_REQUIRED", "0") == "1"
+# Operator token for /api/admin; admin endpoints are disabled while unset.
+ADMIN_TOKEN = os.getenv("GYMYO_ADMIN_TOKEN", "")
+# Verified tokens are trusted this long per worker, so a rotated token keeps working
+# until its entry expires; 0 checks the database on every request.
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("GYMYO_TOKEN_CACHE_TTL_SECONDS", "60"))
+TOKEN_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Tenant the request acts on."""
+
+    id: int
+    authenticated: bool
+
+
+class _TokenCache:
+    """Small TTL cache of verified token hashes to skip repeat lookups."""
+
+    def __init__(self, ttl: float, size: int) -> None:
+        self._ttl = ttl
+        self._size = size
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def get(self, token_hash: str) -> int | None:
+        entry = self._entries.get(token_hash)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def put(self, token_hash: str, user_id: int) -> None:
+        if self._ttl <= 0:
+            return
+        self._entries[token_hash] = (user_id, time.monotonic() + self._ttl)
+        self._entries.move_to_end(token_hash)
+        while len(self._entries) > self._size:
+            self._entries.popitem(last=False)
+
+
+_token_cache = _TokenCache(TOKEN_CACHE_TTL_SECONDS, TOKEN_CACHE_SIZE)
+
+
+def _authenticate(token: str) -> int:
+    user_part, _, secret = token.partition(".")
+    if not user_part.isdigit() or not secret:
+        raise HTTPException(status_code=401, detail="Invalid API token")
+    token_hash = hash_api_token(token)
+    cached = _token_cache.get(token_hash)
+    if cached is not None:
+        return cached
+
+    user_id = int(user_part)
+    db = shards.session(user_id)
+    try:
+        valid = verify_api_token(db, user_id, token)
+    finally:
+        db.close()
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid API token")
+    _token_cache.put(token_hash, user_id)
+    return user_id
+
+
+def current_user(
+    user_id: int | None = Query(default=None, gt=0),
+    authorization: str | None = Header(default=None),
+    access_token: str | None = Query(default=None),
+) -> CurrentUser:
+    """Resolve the tenant once per request (FastAPI caches the result).
+
+    A `Bearer <token>` header identifies the user; `access_token` covers
+    clients such as `EventSource` that cannot set headers. Without either, and
+    unless `GYMYO_AUTH_REQUIRED=1`, the legacy `user_id` query parameter is trusted.
+    """
+    if access_token and not authorization:
+        authorization = f"Bearer {access_token}"
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(status_code=401, detail="Unsupported authorization scheme")
+        resolved = _authenticate(token.strip())
+        if user_id is not None and user_id != resolved:
+            raise HTTPException(status_code=403, detail="Cannot access another user's data")
+        return CurrentUser(id=resolved, authenticated=True)
+    if AUTH_REQUIRED:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    return CurrentUser(id=user_id or DEFAULT_USER_ID, authenticated=False)
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    """Guard operator endpoints with the shared `GYMYO_ADMIN_TOKEN`."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def current_user_id(user: CurrentUser = Depends(current_user)) -> int:
+    return user.id
+
+
+def get_tenant_db(user: CurrentUser = Depends(current_user)) -> Generator[Session, None, None]:
+    """Yield a session on the current user's shard primary."""
+    yield from get_user_session(user.id)
+
+
+def get_read_db(user: CurrentUser = Depends(current_user)) -> Generator[Session, None, None]:
+    """Yield a read-only session, served by a replica of the user's shard when possible."""
+    yield from get_user_read_session(user.id)
+
+
+def ensure_same_tenant(user: CurrentUser, payload_user_id: int) -> None:
+    """Reject payloads addressed to a different user than the caller."""
+    if payload_user_id != user.id:
+        raise HTTPException(status_code=403, detail="Cannot write another user's data")
+
+
+def conditional_get(
+    response: Response,
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+    if_none_match: str | None = Header(default=None),
+) -> None:
+    """Answer 304 from the user's data version before the endpoint loads anything.
+
+    Only for reads that are a pure function of the user's data; the version
+    lookup is a primary-key read on the same session the endpoint then uses.
+    """
+    _answer_conditional(response, db, user_id, if_none_match)
+
+
+def conditional_get_daily(
+    response: Response,
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+    if_none_match: str | None = Header(default=None),
+) -> None:
+    """`conditional_get` for reads that also depend on today's date, such as prescriptions.
+
+    The tag carries the day, so it also changes when the day turns over.
+    """
+    _answer_conditional(response, db, user_id, if_none_match, day=prescription_day())
+
+
+def _answer_conditional(
+    response: Response,
+    db: Session,
+    user_id: int,
+    if_none_match: str | None,
+    day: date | None = None,
+) -> None:
+    version = get_data_version(db, user_id)
+    if version is None:
+        return
+    data_version, _ = version
+    etag = data_etag(user_id, data_version, day=day)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if not_modified(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
@@ -2,112 +2,317 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
 from datetime import date
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.engine import AdaptiveEngine
-from app.core.physiology import fatigue_model, recovery_model, stimulus_model
-from app.db.database import get_db
+from app.api.dependencies import (
+    CurrentUser,
+    conditional_get,
+    conditional_get_daily,
+    current_user,
+    current_user_id,
+    ensure_same_tenant,
+    get_read_db,
+    get_tenant_db,
+)
+from app.core.analytics import AnalyticsWindows, extend_with_rollups, summarize_history
+from app.core.physiology import recovery_model
+from app.core.trends import TREND_HORIZONS, lift_trends
+from app.db.database import shards
 from app.db.repositories import (
+    EXPORT_COLUMNS,
+    get_e1rm_series,
     get_e1rm_trend,
     get_latest_metrics,
-    get_or_create_default_user,
+    get_personal_records,
+    get_prescription_history,
     get_recent_session_summaries,
     get_recent_sessions,
+    get_rollup_watermark,
+    get_sync_delta,
     get_user_profile,
+    get_weekly_rollups,
     get_weekly_volume,
-    save_prescription,
+    get_workload,
+    iter_export_rows,
+    iter_session_history,
     save_session,
     update_metrics,
     update_user_profile,
 )
+from app.events import bus
+from app.ingest import CONTENT_TYPE as BINARY_SESSIONS, IngestError, decode_sessions, sessions_from_json
+from app.export import EXPORT_FORMATS, PARQUET_AVAILABLE, encode_rows, gzip_chunks
+from app.prescriptions import baseline_for, prescription_day, prescription_for
 from app.schemas.models import (
     AnalyticsResponse,
     DailyMetricsUpdate,
     DashboardResponse,
+    ExerciseTrend,
+    MuscleWorkload,
+    PersonalRecord,
+    PrescriptionHistoryPoint,
     ProfileUpdate,
     SessionInput,
     SessionMetrics,
+    SyncResponse,
     TrainingPrescription,
+    TrendWindow,
     UserProfile,
 )
+from app.static import accepted_encodings
 
 router = APIRouter()
-engine = AdaptiveEngine()
+logger = logging.getLogger(__name__)
+
+STREAM_HEARTBEAT_SECONDS = 15.0
+# Reads that depend only on the user's data; /workload (as of today) and
+# /prescriptions/history (prescription saves do not bump the version) are excluded.
+_CONDITIONAL = [Depends(conditional_get)]
+# Reads that include the prescription, whose workload ratio is projected to today.
+_CONDITIONAL_DAILY = [Depends(conditional_get_daily)]
+
+
+def _publish_update(db: Session, user_id: int) -> None:
+    """Push readiness, prescription and summary deltas to live dashboard streams.
+
+    Runs after the write has committed, so a failure here is logged rather
+    than turning the successful write into an error the client would retry.
+    """
+    try:
+        if not bus.wants_updates(user_id):
+            return
+        latest_metrics = get_latest_metrics(db, user_id)
+        recent = get_recent_sessions(db, user_id)
+        prescription = None
+        if len(recent) >= 5:
+            prescription = prescription_for(db, user_id)
+        snapshot = {
+            "readiness": recovery_model(latest_metrics, baseline_for(db, user_id)) if latest_metrics is not None else None,
+            "latest_metrics": latest_metrics,
+            "next_workout": prescription,
+            "recent_sessions": get_recent_session_summaries(db, user_id),
+        }
+        bus.publish(user_id, jsonable_encoder(snapshot))
+    except Exception:
+        db.rollback()
+        logger.exception("Live update for user %s failed", user_id)
 
 
-@router.get("/profile", response_model=UserProfile)
-def profile(db: Session = Depends(get_db)) -> UserProfile:
-    user = get_or_create_default_user(db)
-    return get_user_profile(db, user.id)
+@router.get("/profile", response_model=UserProfile, dependencies=_CONDITIONAL)
+def profile(user_id: int = Depends(current_user_id), db: Session = Depends(get_read_db)) -> UserProfile:
+    try:
+        return get_user_profile(db, user_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
 @router.put("/profile", response_model=UserProfile)
-def put_profile(payload: ProfileUpdate, db: Session = Depends(get_db)) -> UserProfile:
-    user = get_or_create_default_user(db)
+def put_profile(payload: ProfileUpdate, user_id: int = Depends(current_user_id), db: Session = Depends(get_tenant_db)) -> UserProfile:
     try:
-        return update_user_profile(db, user.id, payload)
+        updated = update_user_profile(db, user_id, payload)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    _publish_update(db, user_id)
+    return updated
+
+
+_INGEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"$ref": "#/components/schemas/SessionInput"}},
+            BINARY_SESSIONS: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
 
 
-@router.post("/log-session")
-def log_session(payload: SessionInput, db: Session = Depends(get_db)) -> dict[str, int]:
-    get_or_create_default_user(db)
+async def _ingest_payloads(request: Request) -> list[SessionInput]:
+    """Parse a JSON body or a binary `application/vnd.gymyo.sessions` batch."""
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").split(";")[0].strip() == BINARY_SESSIONS:
+            return decode_sessions(body).to_inputs()
+        return sessions_from_json(body, many=request.url.path.endswith("/bulk"))
+    except IngestError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+@router.post("/log-session", openapi_extra=_INGEST_BODY)
+def log_session(
+    payloads: list[SessionInput] = Depends(_ingest_payloads),
+    idempotency_key: str | None = Header(default=None, max_length=64),
+    user: CurrentUser = Depends(current_user),
+    db: Session = Depends(get_tenant_db),
+) -> dict[str, int]:
+    if len(payloads) != 1:
+        raise HTTPException(status_code=422, detail="Send exactly one session; use /log-session/bulk for batches")
+    payload = payloads[0]
+    ensure_same_tenant(user, payload.user_id)
+    if idempotency_key and payload.idempotency_key is None:
+        payload.idempotency_key = idempotency_key
     try:
         session_id = save_session(db, payload)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    _publish_update(db, payload.user_id)
     return {"session_id": session_id}
 
 
+@router.post("/log-session/bulk", openapi_extra=_INGEST_BODY)
+def log_sessions_bulk(
+    payloads: list[SessionInput] = Depends(_ingest_payloads),
+    user: CurrentUser = Depends(current_user),
+    db: Session = Depends(get_tenant_db),
+) -> dict[str, list[int]]:
+    """Save a batch of sessions in order.
+
+    Each session commits on its own, so on a 400 the earlier ones are kept
+    (and pushed to live dashboards); idempotency keys make resending the
+    whole batch safe.
+    """
+    for payload in payloads:
+        ensure_same_tenant(user, payload.user_id)
+    session_ids = []
+    try:
+        for index, payload in enumerate(payloads):
+            try:
+                session_ids.append(save_session(db, payload))
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=f"Session {index}: {exc}") from exc
+    finally:
+        if session_ids:
+            _publish_update(db, payloads[0].user_id)
+    return {"session_ids": session_ids}
+
+
 @router.post("/update-metrics")
-def post_update_metrics(payload: DailyMetricsUpdate, db: Session = Depends(get_db)) -> dict[str, str]:
+def post_update_metrics(payload: DailyMetricsUpdate, user: CurrentUser = Depends(current_user), db: Session = Depends(get_tenant_db)) -> dict[str, str]:
+    ensure_same_tenant(user, payload.user_id)
     try:
         update_metrics(db, payload.user_id, payload.metrics)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    _publish_update(db, payload.user_id)
     return {"status": "updated", "date": str(date.fromisoformat(str(payload.metrics.date)))}
 
 
-@router.get("/next-workout", response_model=TrainingPrescription)
-def next_workout(user_id: int = Query(default=1, gt=0), db: Session = Depends(get_db)) -> TrainingPrescription:
+@router.get("/next-workout", response_model=TrainingPrescription, dependencies=_CONDITIONAL_DAILY)
+def next_workout(
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_tenant_db),
+) -> TrainingPrescription:
     try:
-        profile_data = get_user_profile(db, user_id)
-        recent = get_recent_sessions(db, user_id)
-        prescription = engine.prescribe(profile_data, recent)
-        save_prescription(db, user_id, prescription)
-        return prescription
+        return prescription_for(db, user_id, primary)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
-@router.get("/analytics", response_model=AnalyticsResponse)
-def analytics(user_id: int = Query(default=1, gt=0), exercise: str = Query(default="Squat"), db: Session = Depends(get_db)) -> AnalyticsResponse:
-    recent = get_recent_sessions(db, user_id, limit=12)
-    if len(recent) < 3:
+@router.get("/analytics", response_model=AnalyticsResponse, dependencies=_CONDITIONAL)
+def analytics(
+    exercise: str = Query(default="Squat"),
+    sessions: int = Query(default=12, ge=3, le=200),
+    volume_weeks: int = Query(default=8, ge=1, le=104),
+    e1rm_sessions: int = Query(default=40, ge=1, le=500),
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+) -> AnalyticsResponse:
+    # Volume and e1RM come from the aggregate queries (DuckDB when attached);
+    # the history pass only scores the session means.
+    windows = AnalyticsWindows(sessions=sessions, volume_weeks=0, e1rm_sessions=0)
+    through = get_rollup_watermark(db, user_id)
+    history = iter_session_history(db, user_id, after=through)
+    summary = summarize_history(history, exercise, windows, baseline_for(db, user_id))
+    if through is not None:
+        summary = extend_with_rollups(summary, get_weekly_rollups(db, user_id), exercise, windows)
+    if summary.sessions < 3:
         raise HTTPException(status_code=400, detail="Need at least 3 sessions")
 
-    fatigue = [fatigue_model(ex, m.rpe_session) for m, ex in recent]
-    stimulus = [stimulus_model(ex) for _, ex in recent]
-    readiness = [recovery_model(m) for m, _ in recent]
-    weekly_volume = get_weekly_volume(db, user_id, weeks=8)
-    e1rm_trend = get_e1rm_trend(db, user_id, exercise)
     return AnalyticsResponse(
-        sessions=len(recent),
-        fatigue_mean=float(sum(fatigue) / len(fatigue)),
-        stimulus_mean=float(sum(stimulus) / len(stimulus)),
-        readiness_mean=float(sum(readiness) / len(readiness)),
-        weekly_volume=weekly_volume,
-        e1rm_trend=e1rm_trend,
+        sessions=summary.sessions,
+        fatigue_mean=float(sum(summary.fatigue) / len(summary.fatigue)),
+        stimulus_mean=float(sum(summary.stimulus) / len(summary.stimulus)),
+        readiness_mean=float(sum(summary.readiness) / len(summary.readiness)),
+        weekly_volume=get_weekly_volume(db, user_id, weeks=volume_weeks),
+        e1rm_trend=get_e1rm_trend(db, user_id, exercise, sessions=e1rm_sessions),
     )
 
 
-@router.get("/dashboard", response_model=DashboardResponse)
-def dashboard(user_id: int = Query(default=1, gt=0), db: Session = Depends(get_db)) -> DashboardResponse:
-    profile_data = get_user_profile(db, user_id)
+@router.get("/trends", response_model=list[ExerciseTrend], dependencies=_CONDITIONAL)
+def trends(
+    horizons: list[int] = Query(default=list(TREND_HORIZONS)),
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+) -> list[ExerciseTrend]:
+    """e1RM slope, mean, std and plateau flag of every lift over each session horizon."""
+    if not horizons or any(not 2 <= horizon <= 520 for horizon in horizons):
+        raise HTTPException(status_code=422, detail="Horizons must be between 2 and 520 sessions")
+    horizons = sorted(set(horizons))
+    series = get_e1rm_series(db, user_id)
+    return [
+        ExerciseTrend(
+            exercise=exercise,
+            sessions=len(series[exercise]),
+            latest_e1rm=series[exercise][-1][1],
+            windows=[
+                TrendWindow(
+                    horizon=trend.horizon,
+                    sessions=trend.stats.count,
+                    slope=round(trend.stats.slope, 4),
+                    mean=round(trend.stats.mean, 2),
+                    std=round(trend.stats.std, 4),
+                    plateau=trend.plateau,
+                )
+                for trend in windows
+            ],
+        )
+        for exercise, windows in sorted(lift_trends(series, horizons).items())
+    ]
+
+
+@router.get("/records", response_model=list[PersonalRecord], dependencies=_CONDITIONAL)
+def records(
+    exercise: str | None = Query(default=None, min_length=2, max_length=64),
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+) -> list[PersonalRecord]:
+    return get_personal_records(db, user_id, exercise)
+
+
+@router.get("/workload", response_model=list[MuscleWorkload])
+def workload(user_id: int = Depends(current_user_id), db: Session = Depends(get_read_db)) -> list[MuscleWorkload]:
+    """Acute:chronic workload ratios per muscle group as of today (UTC, as for prescriptions)."""
+    return get_workload(db, user_id, prescription_day())
+
+
+@router.get("/prescriptions/history", response_model=list[PrescriptionHistoryPoint])
+def prescription_history(
+    since: date | None = Query(default=None),
+    until: date | None = Query(default=None),
+    bucket: Literal["week", "month"] = Query(default="week"),
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+) -> list[PrescriptionHistoryPoint]:
+    """Deload frequency and readiness at prescription time per week or month."""
+    return get_prescription_history(db, user_id, since, until, bucket)
+
+
+@router.get("/dashboard", response_model=DashboardResponse, dependencies=_CONDITIONAL_DAILY)
+def dashboard(
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_tenant_db),
+) -> DashboardResponse:
     recent = get_recent_sessions(db, user_id)
     if not recent:
         raise HTTPException(status_code=400, detail="Need at least 1 logged session")
@@ -119,6 +324,84 @@ def dashboard(user_id: int = Query(default=1, gt=0), db: Session = Depends(get_d
     if len(recent) < 5:
         raise HTTPException(status_code=400, detail="Need at least 5 sessions for next workout")
 
-    prescription = engine.prescribe(profile_data, recent)
+    try:
+        prescription = prescription_for(db, user_id, primary)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     summaries = get_recent_session_summaries(db, user_id)
     return DashboardResponse(next_workout=prescription, latest_metrics=latest_metrics, recent_sessions=summaries)
+
+
+@router.get("/sync", response_model=SyncResponse)
+def sync(
+    since: int | None = Query(default=None, ge=0),
+    user_id: int = Depends(current_user_id),
+    db: Session = Depends(get_read_db),
+    primary: Session = Depends(get_tenant_db),
+) -> SyncResponse:
+    """Rows changed since the client's watermark, for its local store to apply."""
+    try:
+        delta = get_sync_delta(db, user_id, since)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    # Sent even without data changes: the prescription is cached per day, since its workload ratio moves daily.
+    try:
+        delta.next_workout = prescription_for(db, user_id, primary)
+    except ValueError:
+        delta.next_workout = None
+    return delta
+
+
+@router.get("/stream")
+async def stream(request: Request, user_id: int = Depends(current_user_id)) -> StreamingResponse:
+    """Server-Sent Events feed of dashboard deltas, emitted only on data changes."""
+
+    async def events():
+        async with bus.subscription(user_id) as queue:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['version']}\nevent: update\ndata: {json.dumps(event['delta'])}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export")
+def export(
+    request: Request,
+    fmt: Literal["csv", "ndjson", "parquet"] = Query(default="ndjson", alias="format"),
+    table: Literal["sessions", "exercise_logs", "prescriptions"] = Query(default="sessions"),
+    user_id: int = Depends(current_user_id),
+) -> StreamingResponse:
+    """Stream one table of the user's full history, gzip-encoded when the client accepts it."""
+    if fmt == "parquet" and not PARQUET_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Parquet export is not installed on this server")
+
+    def chunks():
+        # The session lives as long as the stream, not the request handler.
+        db = shards.read_session(user_id)
+        try:
+            yield from encode_rows(fmt, EXPORT_COLUMNS[table], iter_export_rows(db, user_id, table))
+        finally:
+            db.close()
+
+    media_type, extension = EXPORT_FORMATS[fmt]
+    headers = {
+        "Content-Disposition": f'attachment; filename="gymyo-{user_id}-{table}.{extension}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+    }
+    body = chunks()
+    # Parquet pages are already compressed.
+    if fmt != "parquet" and "gzip" in accepted_encodings(request.headers.get("accept-encoding", "")):
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
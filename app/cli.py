@@ -0,0 +1,236 @@
+"""Operational commands: `python -m app.cli <command>`."""
+
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.db.database import SHARD_URLS, shards
+from app.db.migrations import BACKFILL_BATCH_SIZE, backfill_prescription_rationale
+from app.db.models import User
+from app.core.rollups import rollup_cutoff
+from app.core.workload import TOTAL_GROUP, acwr_flag
+from app.db.repositories import (
+    backfill_training_loads,
+    compact_exercise_logs,
+    create_user,
+    issue_api_token,
+    merge_duplicate_sessions,
+    rebuild_baseline,
+    rebuild_personal_records,
+    rebuild_strength_curves,
+    rollup_sessions_through,
+)
+from app.prescriptions import (
+    PRECOMPUTE_CHUNK_SIZE,
+    PRECOMPUTE_WORKERS,
+    baseline_for,
+    precompute_prescriptions,
+    prescription_day,
+)
+from app.schemas.models import ProfileUpdate
+
+ROLLUP_MIN_AGE_DAYS = int(os.getenv("ROLLUP_MIN_AGE_DAYS", "180"))
+
+
+def _create_user(args: argparse.Namespace) -> None:
+    if SHARD_URLS and args.user_id is None:
+        raise SystemExit("--user-id is required when SHARD_URLS is configured")
+    payload = ProfileUpdate(
+        age=args.age,
+        bodyweight_kg=args.bodyweight_kg,
+        training_age_years=args.training_age_years,
+        goal=args.goal,
+        mrv_baseline_sets=args.mrv_baseline_sets,
+    )
+    db = shards.session(args.user_id or 0)
+    try:
+        user = create_user(db, payload, user_id=args.user_id)
+        token = issue_api_token(db, user.id)
+    finally:
+        db.close()
+    print(f"user_id={user.id} shard={shards.shard_for(user.id)} token={token}")
+
+
+def _issue_token(args: argparse.Namespace) -> None:
+    db = shards.session(args.user_id)
+    try:
+        print(issue_api_token(db, args.user_id))
+    finally:
+        db.close()
+
+
+def _iter_user_ids(user_id: int | None):
+    if user_id is not None:
+        yield user_id
+        return
+    for index in range(len(shards.engines)):
+        db = shards.shard_session(index)
+        try:
+            ids = db.scalars(select(User.id).order_by(User.id)).all()
+        finally:
+            db.close()
+        yield from (uid for uid in ids if shards.shard_for(uid) == index)
+
+
+def _compact_logs(args: argparse.Namespace) -> None:
+    cutoff = date.today() - timedelta(days=args.min_age_days)
+    for user_id in _iter_user_ids(args.user_id):
+        db = shards.session(user_id)
+        try:
+            count = compact_exercise_logs(db, user_id, cutoff)
+        finally:
+            db.close()
+        print(f"user_id={user_id} compacted_rows={count} cutoff={cutoff}")
+
+
+def _rollup_sessions(args: argparse.Namespace) -> None:
+    through = rollup_cutoff(date.today(), args.min_age_days)
+    for user_id in _iter_user_ids(args.user_id):
+        db = shards.session(user_id)
+        try:
+            count = rollup_sessions_through(db, user_id, through, baseline_for(db, user_id), archive=args.archive)
+        finally:
+            db.close()
+        print(f"user_id={user_id} rolled_up_sessions={count} through={through} archived={args.archive}")
+
+
+def _merge_duplicates(args: argparse.Namespace) -> None:
+    for user_id in _iter_user_ids(args.user_id):
+        db = shards.session(user_id)
+        try:
+            removed = merge_duplicate_sessions(db, user_id)
+        finally:
+            db.close()
+        print(f"user_id={user_id} duplicates_removed={removed}")
+
+
+def _rebuild_records(args: argparse.Namespace) -> None:
+    for user_id in _iter_user_ids(args.user_id):
+        db = shards.session(user_id)
+        try:
+            count = rebuild_personal_records(db, user_id)
+        finally:
+            db.close()
+        print(f"user_id={user_id} exercises={count}")
+
+
+def _rebuild_baselines(args: argparse.Namespace) -> None:
+    for user_id in _iter_user_ids(args.user_id):
+        db = shards.session(user_id)
+        try:
+            baseline = rebuild_baseline(db, user_id)
+        finally:
+            db.close()
+        print(f"user_id={user_id} samples={baseline.hrv_rmssd.count}")
+
+
+def _rebuild_strength_curves(args: argparse.Namespace) -> None:
+    for user_id in _iter_user_ids(args.user_id):
+        db = shards.session(user_id)
+        try:
+            count = rebuild_strength_curves(db, user_id)
+        finally:
+            db.close()
+        print(f"user_id={user_id} exercises={count}")
+
+
+def _backfill_workload(args: argparse.Namespace) -> None:
+    today = prescription_day()
+    for user_id in _iter_user_ids(args.user_id):
+        db = shards.session(user_id)
+        try:
+            states = backfill_training_loads(db, user_id)
+        finally:
+            db.close()
+        total = states.get(TOTAL_GROUP)
+        acwr = total.decayed(today).acwr if total else None
+        print(f"user_id={user_id} acwr={acwr} flag={acwr_flag(acwr)}")
+
+
+def _backfill_rationales(args: argparse.Namespace) -> None:
+    for index, shard_engine in enumerate(shards.engines):
+        migrated = backfill_prescription_rationale(shard_engine, batch_size=args.batch_size)
+        print(f"shard={index} migrated_prescriptions={migrated}")
+
+
+def _precompute_prescriptions(args: argparse.Namespace) -> None:
+    report = precompute_prescriptions(chunk_size=args.chunk_size, workers=args.workers)
+    print(" ".join(f"{name}={value}" for name, value in report.as_metrics().items()))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Gymyo maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create-user", help="Create an athlete and print an API token")
+    create.add_argument("--user-id", type=int)
+    create.add_argument("--age", type=int, default=30)
+    create.add_argument("--bodyweight-kg", type=float, default=80.0)
+    create.add_argument("--training-age-years", type=float, default=2.0)
+    create.add_argument("--goal", default="hypertrophy")
+    create.add_argument("--mrv-baseline-sets", type=int, default=14)
+    create.set_defaults(handler=_create_user)
+
+    token = commands.add_parser(
+        "issue-token",
+        help="Rotate and print a user's API token; running workers may accept the old one for "
+        "up to GYMYO_TOKEN_CACHE_TTL_SECONDS (60 s by default)",
+    )
+    token.add_argument("--user-id", type=int, required=True)
+    token.set_defaults(handler=_issue_token)
+
+    compact = commands.add_parser("compact-logs", help="Write old exercise logs to memory-mapped column files")
+    compact.add_argument("--user-id", type=int, help="Only compact this user (default: all users)")
+    compact.add_argument("--min-age-days", type=int, default=28)
+    compact.set_defaults(handler=_compact_logs)
+
+    rollup = commands.add_parser("rollup-sessions", help="Fold old sessions into weekly rollup tables")
+    rollup.add_argument("--user-id", type=int, help="Only roll up this user (default: all users)")
+    rollup.add_argument("--min-age-days", type=int, default=ROLLUP_MIN_AGE_DAYS)
+    rollup.add_argument("--archive", action="store_true", help="Delete the raw sessions once rolled up")
+    rollup.set_defaults(handler=_rollup_sessions)
+
+    merge = commands.add_parser("merge-duplicates", help="Remove duplicated sessions left by client retries")
+    merge.add_argument("--user-id", type=int, help="Only clean this user (default: all users)")
+    merge.set_defaults(handler=_merge_duplicates)
+
+    records = commands.add_parser("rebuild-records", help="Recompute personal records from full history")
+    records.add_argument("--user-id", type=int, help="Only rebuild this user (default: all users)")
+    records.set_defaults(handler=_rebuild_records)
+
+    baselines = commands.add_parser("rebuild-baselines", help="Recompute personal HRV/HR/sleep baselines")
+    baselines.add_argument("--user-id", type=int, help="Only rebuild this user (default: all users)")
+    baselines.set_defaults(handler=_rebuild_baselines)
+
+    curves = commands.add_parser("rebuild-strength-curves", help="Refit per-exercise strength curves from full history")
+    curves.add_argument("--user-id", type=int, help="Only rebuild this user (default: all users)")
+    curves.set_defaults(handler=_rebuild_strength_curves)
+
+    workload = commands.add_parser("backfill-workload", help="Rebuild acute/chronic workloads and print ACWR flags")
+    workload.add_argument("--user-id", type=int, help="Only backfill this user (default: all users)")
+    workload.set_defaults(handler=_backfill_workload)
+
+    rationales = commands.add_parser(
+        "backfill-rationales", help="Move legacy JSON prescription rationales into the typed columns"
+    )
+    rationales.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    rationales.set_defaults(handler=_backfill_rationales)
+
+    precompute = commands.add_parser("precompute-prescriptions", help="Compute next workouts for users with new data")
+    precompute.add_argument("--chunk-size", type=int, default=PRECOMPUTE_CHUNK_SIZE)
+    precompute.add_argument("--workers", type=int, default=PRECOMPUTE_WORKERS)
+    precompute.set_defaults(handler=_precompute_prescriptions)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Validators for conditional GETs on per-user API reads.
+
+Every write bumps `users.data_version`, so (user, data_version) names the
+exact state behind every versioned read endpoint. The ETag is weak because
+the same version serializes differently per endpoint and query; clients
+cache per URL, so a tag only ever meets bodies of its own URL.
+
+There is no Last-Modified/If-Modified-Since pair: HTTP dates have whole
+seconds, and two writes within the same second would validate a stale body.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import date
+
+# Changes every tag at once; set it per deploy when the output of an endpoint changes for the same data.
+ETAG_SALT = os.getenv("GYMYO_ETAG_SALT", "")
+
+
+def data_etag(user_id: int, data_version: int, salt: str = ETAG_SALT, day: date | None = None) -> str:
+    """Tag of (user, data_version), plus `day` for reads that also depend on the date."""
+    suffix = (f".{day:%Y%m%d}" if day else "") + (f".{salt}" if salt else "")
+    return f'W/"{user_id}.{data_version}{suffix}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of `etag` against an If-None-Match list (RFC 9110 13.1.2)."""
+    opaque = etag.removeprefix("W/")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def not_modified(if_none_match: str | None, etag: str) -> bool:
+    """Whether a GET carrying this If-None-Match can be answered with 304."""
+    return bool(if_none_match) and etag_matches(if_none_match, etag)
@@ -0,0 +1,137 @@
+"""Single-pass analytics over a newest-first session history stream."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterable, Sequence
+
+from app.core.baselines import PhysiologicalBaseline
+from app.core.physiology import fatigue_model, infer_muscle_group, recovery_model, stimulus_model
+from app.core.prediction import one_rm_estimator
+from app.core.rollups import WeeklyRollup
+from app.core.strength import StrengthCurve
+from app.schemas.models import ExerciseLog, SessionMetrics
+
+
+@dataclass(frozen=True)
+class AnalyticsWindows:
+    """How much history each analytics output looks at; a zero window skips that output."""
+
+    sessions: int = 12
+    volume_weeks: int = 8
+    e1rm_sessions: int = 40
+
+
+@dataclass
+class AnalyticsSummary:
+    """Aggregates produced by one traversal of the history."""
+
+    sessions: int = 0
+    scanned: int = 0
+    volume_since: date | None = None
+    fatigue: list[float] = field(default_factory=list)
+    stimulus: list[float] = field(default_factory=list)
+    readiness: list[float] = field(default_factory=list)
+    weekly_volume: dict[tuple[date, str], float] = field(default_factory=lambda: defaultdict(float))
+    e1rm_trend: list[tuple[date, float]] = field(default_factory=list)
+
+
+def summarize_history(
+    history: Iterable[tuple[SessionMetrics, Sequence[ExerciseLog]]],
+    exercise: str,
+    windows: AnalyticsWindows = AnalyticsWindows(),
+    baseline: PhysiologicalBaseline | None = None,
+    curve: StrengthCurve | None = None,
+) -> AnalyticsSummary:
+    """Compute all analytics outputs in one pass over sessions ordered newest first.
+
+    Iteration stops as soon as every window is satisfied, so a lazy history
+    source is never read beyond the widest window. e1RM points use the
+    exercise's fitted `curve` when given, otherwise Epley.
+    """
+    summary = AnalyticsSummary()
+    normalized = exercise.lower()
+    estimate = (lambda ex: curve.e1rm_from(ex.load_kg, ex.reps, ex.rir)) if curve is not None else one_rm_estimator
+    volume_since: date | None = None
+    seen = 0
+
+    for metrics, exercises in history:
+        if volume_since is None:
+            volume_since = metrics.date - timedelta(days=metrics.date.weekday(), weeks=windows.volume_weeks - 1)
+        in_volume = metrics.date >= volume_since
+        if seen >= windows.sessions and seen >= windows.e1rm_sessions and not in_volume:
+            break
+
+        if seen < windows.sessions:
+            summary.fatigue.append(fatigue_model(exercises, metrics.rpe_session))
+            summary.stimulus.append(stimulus_model(exercises))
+            summary.readiness.append(recovery_model(metrics, baseline))
+        if in_volume:
+            week_start = metrics.date - timedelta(days=metrics.date.weekday())
+            for ex in exercises:
+                summary.weekly_volume[(week_start, infer_muscle_group(ex.exercise))] += ex.load_kg * ex.reps * ex.sets
+        if seen < windows.e1rm_sessions:
+            for ex in exercises:
+                if ex.exercise.lower() == normalized:
+                    summary.e1rm_trend.append((metrics.date, estimate(ex)))
+        seen += 1
+
+    summary.sessions = min(seen, windows.sessions)
+    summary.scanned = seen
+    summary.volume_since = volume_since
+    summary.fatigue.reverse()
+    summary.stimulus.reverse()
+    summary.readiness.reverse()
+    summary.e1rm_trend.reverse()
+    return summary
+
+
+def extend_with_rollups(
+    summary: AnalyticsSummary,
+    rollups: Iterable[WeeklyRollup],
+    exercise: str,
+    windows: AnalyticsWindows = AnalyticsWindows(),
+) -> AnalyticsSummary:
+    """Fill the windows the raw history left short from weekly rollups ordered newest first.
+
+    Rolled-up weeks are older than every raw session, so their points go in
+    front. A week counts as `sessions` sessions against the session windows and
+    contributes its means (and best e1RM, dated at the week start) once per
+    session it stands for.
+    """
+    normalized = exercise.lower()
+    volume_since = summary.volume_since
+    seen = summary.scanned
+    fatigue: list[float] = []
+    stimulus: list[float] = []
+    readiness: list[float] = []
+    e1rm: list[tuple[date, float]] = []
+
+    for week in rollups:
+        if volume_since is None:
+            volume_since = week.week_start - timedelta(weeks=windows.volume_weeks - 1)
+        in_volume = week.week_start >= volume_since
+        if seen >= windows.sessions and seen >= windows.e1rm_sessions and not in_volume:
+            break
+
+        repeat = max(min(week.sessions, windows.sessions - seen), 0)
+        fatigue.extend([week.fatigue_mean] * repeat)
+        stimulus.extend([week.stimulus_mean] * repeat)
+        readiness.extend([week.readiness_mean] * repeat)
+        if in_volume:
+            for muscle, volume in week.muscle_volume().items():
+                summary.weekly_volume[(week.week_start, muscle)] += volume
+        if seen < windows.e1rm_sessions and normalized in week.exercises:
+            e1rm.append((week.week_start, week.exercises[normalized].best_e1rm))
+        seen += week.sessions
+
+    summary.fatigue[:0] = reversed(fatigue)
+    summary.stimulus[:0] = reversed(stimulus)
+    summary.readiness[:0] = reversed(readiness)
+    summary.e1rm_trend[:0] = reversed(e1rm)
+    summary.sessions = min(seen, windows.sessions)
+    summary.scanned = seen
+    summary.volume_since = volume_since
+    return summary
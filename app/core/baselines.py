@@ -0,0 +1,80 @@
+"""Streaming per-user physiological baselines (Welford mean/variance plus EWMA)."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+from app.schemas.models import SessionMetrics
+
+EWMA_ALPHA = 0.1
+MIN_BASELINE_SAMPLES = 7
+
+
+@dataclass
+class RunningStat:
+    """O(1)-updatable count, mean, sum of squared deviations and EWMA."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    ewma: float | None = None
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+    def push(self, value: float, alpha: float = EWMA_ALPHA) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.ewma = value if self.ewma is None else self.ewma + alpha * (value - self.ewma)
+
+    def remove(self, value: float) -> None:
+        """Inverse of `push` for mean and variance; the EWMA is left as is."""
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        previous_mean = (self.count * self.mean - value) / (self.count - 1)
+        self.m2 = max(self.m2 - (value - previous_mean) * (value - self.mean), 0.0)
+        self.mean = previous_mean
+        self.count -= 1
+
+    def replace(self, old: float, new: float, alpha: float = EWMA_ALPHA) -> None:
+        """Swap an observation; the EWMA shift is exact when `old` was the latest value."""
+        ewma = self.ewma
+        self.remove(old)
+        self.push(new, alpha)
+        self.ewma = new if ewma is None else ewma + alpha * (new - old)
+
+    def zscore(self, value: float, min_std: float) -> float:
+        return (value - self.mean) / max(self.std, min_std)
+
+
+@dataclass
+class PhysiologicalBaseline:
+    """Personal running statistics for readiness-relevant biomarkers."""
+
+    hrv_rmssd: RunningStat = field(default_factory=RunningStat)
+    resting_hr: RunningStat = field(default_factory=RunningStat)
+    sleep_hours: RunningStat = field(default_factory=RunningStat)
+
+    @property
+    def ready(self) -> bool:
+        return min(self.hrv_rmssd.count, self.resting_hr.count, self.sleep_hours.count) >= MIN_BASELINE_SAMPLES
+
+    def push(self, metrics: SessionMetrics) -> None:
+        for name, stat in self.stats():
+            stat.push(float(getattr(metrics, name)))
+
+    def replace(self, old: SessionMetrics, new: SessionMetrics) -> None:
+        for name, stat in self.stats():
+            stat.replace(float(getattr(old, name)), float(getattr(new, name)))
+
+    def stats(self) -> tuple[tuple[str, RunningStat], ...]:
+        return (("hrv_rmssd", self.hrv_rmssd), ("resting_hr", self.resting_hr), ("sleep_hours", self.sleep_hours))
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 from datetime import timedelta
-from typing import Sequence
+from typing import Mapping, Sequence
 
+from app.core.baselines import PhysiologicalBaseline
 from app.core.physiology import (
     fatigue_model,
     mrv_estimator,
@@ -23,6 +24,7 @@ from app.core.progression import (
     plateau_detection,
     volume_progression_algorithm,
 )
+from app.core.strength import StrengthCurve
 from app.schemas.models import ExerciseLog, SessionMetrics, TrainingPrescription, UserProfile
 
 
@@ -33,26 +35,32 @@ class AdaptiveEngine:
         self,
         profile: UserProfile,
         recent_sessions: Sequence[tuple[SessionMetrics, Sequence[ExerciseLog]]],
+        baseline: PhysiologicalBaseline | None = None,
+        acwr: float | None = None,
+        curves: Mapping[str, StrengthCurve] | None = None,
     ) -> TrainingPrescription:
         if len(recent_sessions) < 5:
             raise ValueError("At least 5 recent sessions are required for a prescription")
 
         fatigue_hist = [fatigue_model(exs, m.rpe_session) for m, exs in recent_sessions]
         stimulus_hist = [stimulus_model(exs) for _, exs in recent_sessions]
-        readiness_hist = [recovery_model(m) for m, _ in recent_sessions]
+        readiness_hist = [recovery_model(m, baseline) for m, _ in recent_sessions]
         performance_hist = [adaptation_score_calculator(stimulus_hist[: i + 1], fatigue_hist[: i + 1]) if i >= 2 else 1.0 for i in range(len(fatigue_hist))]
 
         mrv_sets = mrv_estimator(profile, fatigue_hist)
         plateau = plateau_detection(performance_hist)
-        deload = deload_trigger_logic(fatigue_hist, readiness_hist, plateau)
+        deload = deload_trigger_logic(fatigue_hist, readiness_hist, plateau, acwr)
         trend = performance_trend_analyzer(performance_hist)
 
         last_metrics, last_exercises = recent_sessions[-1]
         anchor = max(last_exercises, key=lambda x: x.load_kg)
+        curve = (curves or {}).get(anchor.exercise.lower())
         one_rm = one_rm_estimator(anchor)
 
         next_sets = volume_progression_algorithm(anchor.sets, readiness_hist[-1], mrv_sets)
-        projected_load = next_session_load_predictor(anchor.load_kg, one_rm, anchor.reps, readiness_hist[-1])
+        projected_load = next_session_load_predictor(
+            anchor.load_kg, one_rm, anchor.reps, readiness_hist[-1], curve=curve, target_rir=anchor.rir
+        )
         next_load = load_progression_algorithm(projected_load, readiness_hist[-1], trend, deload)
 
         target_date = last_metrics.date + timedelta(days=2)
@@ -64,6 +72,8 @@ class AdaptiveEngine:
             "adaptation_score": adaptation_score_calculator(stimulus_hist, fatigue_hist),
             "deload": "1" if deload else "0",
         }
+        if acwr is not None:
+            rationale["acwr"] = acwr
 
         return TrainingPrescription(
             target_date=target_date,
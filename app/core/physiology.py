@@ -6,7 +6,9 @@ from typing import Iterable
 
 import numpy as np
 
+from app.core.baselines import PhysiologicalBaseline
 from app.core.exceptions import InsufficientDataError, ValidationError
+from app.core.trends import PrefixStats
 from app.schemas.models import ExerciseLog, SessionMetrics, UserProfile
 
 
@@ -38,11 +40,20 @@ def stimulus_model(exercises: Iterable[ExerciseLog]) -> float:
     return float(np.round(total_stimulus, 4))
 
 
-def recovery_model(metrics: SessionMetrics) -> float:
-    """Convert biofeedback indicators into readiness score [0, 1]."""
-    sleep_score = np.clip(metrics.sleep_hours / 8.0, 0.0, 1.1)
-    hrv_score = np.clip(metrics.hrv_rmssd / 55.0, 0.3, 1.3)
-    hr_penalty = np.clip((metrics.resting_hr - 55) / 30.0, 0.0, 1.0)
+def recovery_model(metrics: SessionMetrics, baseline: PhysiologicalBaseline | None = None) -> float:
+    """Convert biofeedback indicators into readiness score [0, 1].
+
+    With a ready personal `baseline`, sleep, HRV and resting HR are scored by
+    z-score against the athlete's own history instead of population constants.
+    """
+    if baseline is not None and baseline.ready:
+        sleep_score = np.clip(1.0 + 0.1 * baseline.sleep_hours.zscore(metrics.sleep_hours, 0.25), 0.0, 1.1)
+        hrv_score = np.clip(1.0 + 0.15 * baseline.hrv_rmssd.zscore(metrics.hrv_rmssd, 3.0), 0.3, 1.3)
+        hr_penalty = np.clip(0.15 * baseline.resting_hr.zscore(metrics.resting_hr, 1.5), 0.0, 1.0)
+    else:
+        sleep_score = np.clip(metrics.sleep_hours / 8.0, 0.0, 1.1)
+        hrv_score = np.clip(metrics.hrv_rmssd / 55.0, 0.3, 1.3)
+        hr_penalty = np.clip((metrics.resting_hr - 55) / 30.0, 0.0, 1.0)
     soreness_penalty = metrics.soreness / 10.0
     motivation_bonus = metrics.motivation / 10.0
 
@@ -65,12 +76,21 @@ def mrv_estimator(profile: UserProfile, fatigue_history: Iterable[float]) -> int
 
 def performance_trend_analyzer(performance_scores: Iterable[float]) -> float:
     """Return linear trend slope of recent performance."""
-    values = np.array(list(performance_scores), dtype=float)
-    if values.size < 4:
+    stats = PrefixStats(performance_scores)
+    if len(stats) < 4:
         raise InsufficientDataError("Need at least 4 sessions for trend analysis")
-
-    x = np.arange(values.size, dtype=float)
-    x_centered = x - np.mean(x)
-    y_centered = values - np.mean(values)
-    slope = np.sum(x_centered * y_centered) / np.sum(x_centered**2)
-    return float(np.round(slope, 4))
+    return float(np.round(stats.window(0, len(stats)).slope, 4))
+
+
+def infer_muscle_group(exercise_name: str) -> str:
+    """Map an exercise name to a coarse muscle group."""
+    lowered = exercise_name.lower()
+    if any(token in lowered for token in ["squat", "lunge", "leg", "hamstring", "quad", "deadlift"]):
+        return "Lower Body"
+    if any(token in lowered for token in ["row", "pull", "lat", "chin"]):
+        return "Back"
+    if any(token in lowered for token in ["press", "bench", "chest", "dip"]):
+        return "Chest"
+    if any(token in lowered for token in ["curl", "extension", "tricep", "bicep", "shoulder", "raise"]):
+        return "Arms/Shoulders"
+    return "Other"
@@ -7,19 +7,40 @@ from typing import Iterable
 import numpy as np
 
 from app.core.exceptions import InsufficientDataError
+from app.core.strength import StrengthCurve
 from app.schemas.models import ExerciseLog
 
 
 def one_rm_estimator(log: ExerciseLog) -> float:
     """Estimate 1RM using Epley relation adjusted by RIR."""
-    effective_reps = log.reps + max(0.0, log.rir)
-    one_rm = log.load_kg * (1.0 + effective_reps / 30.0)
+    return epley_e1rm(log.load_kg, log.reps, log.rir)
+
+
+def epley_e1rm(load_kg: float, reps: int, rir: float) -> float:
+    """Epley 1RM from raw log columns, avoiding schema construction in bulk scans."""
+    effective_reps = reps + max(0.0, rir)
+    one_rm = load_kg * (1.0 + effective_reps / 30.0)
     return float(np.round(one_rm, 2))
 
 
-def next_session_load_predictor(last_load: float, one_rm: float, target_reps: int, readiness: float) -> float:
-    """Predict session load anchored to %1RM and readiness."""
-    intensity = np.clip(1.0 - target_reps * 0.025, 0.6, 0.9)
+def next_session_load_predictor(
+    last_load: float,
+    one_rm: float,
+    target_reps: int,
+    readiness: float,
+    curve: StrengthCurve | None = None,
+    target_rir: float = 2.0,
+) -> float:
+    """Predict session load anchored to %1RM and readiness.
+
+    With a fitted `curve` the 1RM and the %1RM for `target_reps` at
+    `target_rir` come from the lifter's own strength curve.
+    """
+    if curve is not None:
+        one_rm = curve.e1rm
+        intensity = np.clip(curve.intensity(target_reps, target_rir), 0.5, 0.95)
+    else:
+        intensity = np.clip(1.0 - target_reps * 0.025, 0.6, 0.9)
     readiness_adj = np.clip((readiness - 0.5) * 0.06, -0.03, 0.04)
     base = one_rm * intensity * (1.0 + readiness_adj)
     constrained = np.clip(base, last_load * 0.9, last_load * 1.08)
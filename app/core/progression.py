@@ -7,6 +7,8 @@ from typing import Iterable
 import numpy as np
 
 from app.core.exceptions import InsufficientDataError
+from app.core.trends import PrefixStats
+from app.core.workload import ACWR_HIGH
 
 
 def load_progression_algorithm(last_load: float, readiness: float, trend: float, deload: bool) -> float:
@@ -29,8 +31,13 @@ def volume_progression_algorithm(last_sets: int, readiness: float, mrv_sets: int
     return last_sets
 
 
-def deload_trigger_logic(fatigue_history: Iterable[float], readiness_history: Iterable[float], plateau: bool) -> bool:
-    """Trigger deload from accumulating fatigue and low readiness."""
+def deload_trigger_logic(
+    fatigue_history: Iterable[float],
+    readiness_history: Iterable[float],
+    plateau: bool,
+    acwr: float | None = None,
+) -> bool:
+    """Trigger deload from accumulating fatigue, low readiness or an acute workload spike."""
     fatigue = np.array(list(fatigue_history), dtype=float)
     readiness = np.array(list(readiness_history), dtype=float)
     if fatigue.size < 3 or readiness.size < 3:
@@ -38,16 +45,17 @@ def deload_trigger_logic(fatigue_history: Iterable[float], readiness_history: It
 
     fatigue_flag = np.mean(fatigue[-3:]) > 8.5
     readiness_flag = np.mean(readiness[-3:]) < 0.45
-    return bool(fatigue_flag and readiness_flag or plateau)
+    spike_flag = acwr is not None and acwr > ACWR_HIGH
+    return bool(fatigue_flag and readiness_flag or plateau or spike_flag)
 
 
 def plateau_detection(performance_scores: Iterable[float]) -> bool:
     """Detect plateau when gains flatten and variance collapses."""
-    values = np.array(list(performance_scores), dtype=float)
-    if values.size < 5:
+    values = [float(v) for v in performance_scores]
+    if len(values) < 5:
         raise InsufficientDataError("Need at least 5 sessions for plateau detection")
 
-    diffs = np.diff(values[-5:])
-    low_growth = np.mean(diffs) < 0.15
-    low_variance = np.std(values[-5:]) < 0.75
+    # The mean of consecutive differences telescopes to the end-to-end change.
+    low_growth = (values[-1] - values[-5]) / 4 < 0.15
+    low_variance = PrefixStats(values).last(5).std < 0.75
     return bool(low_growth and low_variance)
@@ -0,0 +1,144 @@
+"""Weekly aggregates that stand in for sessions past the retention age."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterable, Mapping, Sequence
+
+from app.core.baselines import PhysiologicalBaseline
+from app.core.physiology import fatigue_model, infer_muscle_group, recovery_model, stimulus_model
+from app.core.prediction import one_rm_estimator
+from app.core.strength import CurveStats, StrengthCurve, accumulate_curve_stats
+from app.core.workload import LoadState, session_muscle_loads
+from app.schemas.models import ExerciseLog, SessionMetrics
+
+
+@dataclass
+class ExerciseWeek:
+    """One exercise's totals within a week; `exercise` is the lower-cased name."""
+
+    exercise: str
+    muscle: str
+    tonnage: float = 0.0
+    sets: int = 0
+    best_e1rm: float = 0.0
+
+    def merge(self, other: ExerciseWeek) -> None:
+        self.tonnage += other.tonnage
+        self.sets += other.sets
+        self.best_e1rm = max(self.best_e1rm, other.best_e1rm)
+
+
+@dataclass
+class WeeklyRollup:
+    """Session-level sums for one week plus per-exercise totals.
+
+    Sums rather than means are kept so weeks rolled up in several runs
+    (e.g. after a backdated session) merge exactly.
+    """
+
+    week_start: date
+    sessions: int = 0
+    readiness_sum: float = 0.0
+    fatigue_sum: float = 0.0
+    stimulus_sum: float = 0.0
+    exercises: dict[str, ExerciseWeek] = field(default_factory=dict)
+
+    @property
+    def readiness_mean(self) -> float:
+        return self.readiness_sum / self.sessions if self.sessions else 0.0
+
+    @property
+    def fatigue_mean(self) -> float:
+        return self.fatigue_sum / self.sessions if self.sessions else 0.0
+
+    @property
+    def stimulus_mean(self) -> float:
+        return self.stimulus_sum / self.sessions if self.sessions else 0.0
+
+    def muscle_volume(self) -> dict[str, float]:
+        volume: dict[str, float] = {}
+        for week in self.exercises.values():
+            volume[week.muscle] = volume.get(week.muscle, 0.0) + week.tonnage
+        return volume
+
+    def add_session(
+        self,
+        metrics: SessionMetrics,
+        exercises: Sequence[ExerciseLog],
+        baseline: PhysiologicalBaseline | None = None,
+        curves: Mapping[str, StrengthCurve] | None = None,
+    ) -> None:
+        """Fold one session in; best e1RMs use the exercise's fitted curve from `curves` if any, else Epley."""
+        curves = curves or {}
+        self.sessions += 1
+        self.readiness_sum += recovery_model(metrics, baseline)
+        self.fatigue_sum += fatigue_model(exercises, metrics.rpe_session)
+        self.stimulus_sum += stimulus_model(exercises)
+        for ex in exercises:
+            name = ex.exercise.lower()
+            week = self.exercises.setdefault(name, ExerciseWeek(name, infer_muscle_group(ex.exercise)))
+            curve = curves.get(name)
+            e1rm = curve.e1rm_from(ex.load_kg, ex.reps, ex.rir) if curve is not None else one_rm_estimator(ex)
+            week.merge(ExerciseWeek(name, week.muscle, ex.load_kg * ex.reps * ex.sets, ex.sets, e1rm))
+
+    def merge(self, other: WeeklyRollup) -> None:
+        self.sessions += other.sessions
+        self.readiness_sum += other.readiness_sum
+        self.fatigue_sum += other.fatigue_sum
+        self.stimulus_sum += other.stimulus_sum
+        for name, week in other.exercises.items():
+            if name in self.exercises:
+                self.exercises[name].merge(week)
+            else:
+                self.exercises[name] = week
+
+
+@dataclass
+class ArchivedHistory:
+    """What full-history rebuilds need from sessions whose raw rows were archived.
+
+    Baseline, load and curve statistics fold in one session at a time, so a
+    rebuild continues from them over the remaining raw history. `records`
+    holds the personal-record columns per lower-cased exercise, kept by the
+    repository.
+    """
+
+    through: date
+    sessions: int = 0
+    baseline: PhysiologicalBaseline = field(default_factory=PhysiologicalBaseline)
+    loads: dict[str, LoadState] = field(default_factory=dict)
+    curves: dict[str, CurveStats] = field(default_factory=dict)
+    records: dict[str, dict] = field(default_factory=dict)
+
+    def add_session(self, metrics: SessionMetrics, exercises: Sequence[ExerciseLog]) -> None:
+        self.sessions += 1
+        self.baseline.push(metrics)
+        for muscle, load in session_muscle_loads(exercises, metrics.rpe_session).items():
+            self.loads.setdefault(muscle, LoadState()).add(metrics.date, load)
+        accumulate_curve_stats(
+            ((metrics.date, ex.exercise, ex.sets, ex.reps, ex.load_kg, ex.rir) for ex in exercises), self.curves
+        )
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def rollup_cutoff(today: date, min_age_days: int) -> date:
+    """Last day (a Sunday) of the newest week that is entirely older than `min_age_days`."""
+    return week_start(today - timedelta(days=min_age_days)) - timedelta(days=1)
+
+
+def rollup_sessions(
+    history: Iterable[tuple[SessionMetrics, Sequence[ExerciseLog]]],
+    baseline: PhysiologicalBaseline | None = None,
+    curves: Mapping[str, StrengthCurve] | None = None,
+) -> dict[date, WeeklyRollup]:
+    """Aggregate sessions into weekly rollups keyed by week start."""
+    weeks: dict[date, WeeklyRollup] = {}
+    for metrics, exercises in history:
+        start = week_start(metrics.date)
+        weeks.setdefault(start, WeeklyRollup(start)).add_session(metrics, exercises, baseline, curves)
+    return weeks
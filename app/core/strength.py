@@ -0,0 +1,139 @@
+"""Per-exercise strength curves fitted over the full set history.
+
+Each exercise is modelled as 1 / load = a + b * r, where r = reps + RIR is
+the distance to failure; Epley is the special case b = a / 30. Sets enter a
+weighted least-squares fit through five recency-weighted sufficient
+statistics, so a new session folds in with O(1) work and the fit for every
+exercise is one closed-form 2x2 solve done elementwise over arrays.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Mapping
+
+import numpy as np
+
+STRENGTH_HALF_LIFE_DAYS = 42.0
+EPLEY_REPS = 30.0
+# Weight of pseudo-sets at r = 30 that pull the curve shape (b / a) toward Epley.
+# Small, but it decides the shape when every set of an exercise has the same r.
+PRIOR_SETS = 0.1
+
+
+@dataclass
+class CurveStats:
+    """Recency-weighted sums of w, w*r, w*r², w*y and w*r*y with y = 1 / load, as of `as_of`."""
+
+    as_of: date
+    sw: float = 0.0
+    sr: float = 0.0
+    srr: float = 0.0
+    sy: float = 0.0
+    sry: float = 0.0
+    sets: int = 0
+
+    def add(self, day: date, sets: int, reps: int, load_kg: float, rir: float) -> None:
+        """Fold in `sets` sets; later days move `as_of` forward and decay what was there."""
+        if day > self.as_of:
+            self._scale(_decay((day - self.as_of).days))
+            self.as_of = day
+        w = sets * _decay((self.as_of - day).days)
+        r = reps + max(rir, 0.0)
+        y = 1.0 / load_kg
+        self.sw += w
+        self.sr += w * r
+        self.srr += w * r * r
+        self.sy += w * y
+        self.sry += w * r * y
+        self.sets += sets
+
+    def _scale(self, factor: float) -> None:
+        self.sw *= factor
+        self.sr *= factor
+        self.srr *= factor
+        self.sy *= factor
+        self.sry *= factor
+
+
+@dataclass(frozen=True)
+class StrengthCurve:
+    """Fitted 1 / load = intercept + slope * (reps + RIR)."""
+
+    intercept: float
+    slope: float
+    sets: int
+
+    @property
+    def e1rm(self) -> float:
+        return round(1.0 / self.intercept, 2)
+
+    @property
+    def reps_factor(self) -> float:
+        """Fractional load drop per rep of distance to failure (Epley: 1/30)."""
+        return self.slope / self.intercept
+
+    def intensity(self, reps: int, rir: float = 0.0) -> float:
+        """Fraction of e1RM that can be lifted for `reps` leaving `rir` in reserve."""
+        return 1.0 / (1.0 + self.reps_factor * (reps + max(rir, 0.0)))
+
+    def e1rm_from(self, load_kg: float, reps: int, rir: float) -> float:
+        """Single-set e1RM using this lifter's curve shape instead of Epley's."""
+        return round(load_kg / self.intensity(reps, rir), 2)
+
+
+def _decay(days: int) -> float:
+    return 0.5 ** (days / STRENGTH_HALF_LIFE_DAYS)
+
+
+def accumulate_curve_stats(
+    rows: Iterable[tuple[date, str, int, int, float, float]],
+    stats: dict[str, CurveStats] | None = None,
+) -> dict[str, CurveStats]:
+    """One pass over (date, exercise, sets, reps, load_kg, rir) rows, keyed by lower-cased exercise."""
+    stats = {} if stats is None else stats
+    for day, exercise, sets, reps, load_kg, rir in rows:
+        if load_kg <= 0:
+            continue
+        name = exercise.lower()
+        if name not in stats:
+            stats[name] = CurveStats(as_of=day)
+        stats[name].add(day, sets, reps, load_kg, rir)
+    return stats
+
+
+def fit_curves(stats: Mapping[str, CurveStats], prior_sets: float = PRIOR_SETS) -> dict[str, StrengthCurve]:
+    """Fit every exercise at once from its sufficient statistics.
+
+    The prior adds prior_sets * (30 * (b - a / 30))² to the loss, i.e. pseudo-sets
+    pinning the 30-rep point of the curve to Epley's shape. Fits that come out
+    non-physical (a <= 0 or b <= 0) use the Epley shape with the fitted level.
+    """
+    names = [name for name, s in stats.items() if s.sw > 0]
+    if not names:
+        return {}
+    sw = np.array([stats[name].sw for name in names], dtype=float)
+    sr = np.array([stats[name].sr for name in names], dtype=float)
+    srr = np.array([stats[name].srr for name in names], dtype=float)
+    sy = np.array([stats[name].sy for name in names], dtype=float)
+    sry = np.array([stats[name].sry for name in names], dtype=float)
+
+    lam = prior_sets * EPLEY_REPS**2
+    a11 = sw + lam / EPLEY_REPS**2
+    a12 = sr - lam / EPLEY_REPS
+    a22 = srr + lam
+    det = a11 * a22 - a12 * a12
+    intercept = (a22 * sy - a12 * sry) / det
+    slope = (a11 * sry - a12 * sy) / det
+    # Least squares with b fixed to a / 30: a = sum(w u y) / sum(w u²), u = 1 + r / 30.
+    epley = (sy + sry / EPLEY_REPS) / (sw + sr * (2 / EPLEY_REPS) + srr / EPLEY_REPS**2)
+
+    curves = {}
+    for i, name in enumerate(names):
+        a, b = float(intercept[i]), float(slope[i])
+        if not (a > 0 and b > 0):
+            a = float(epley[i])
+            b = a / EPLEY_REPS
+        curves[name] = StrengthCurve(intercept=a, slope=b, sets=stats[name].sets)
+    return curves
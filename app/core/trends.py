@@ -0,0 +1,103 @@
+"""Sliding-window trend statistics from prefix sums.
+
+One linear pass builds cumulative sums of x, y, xy, x² and y² (x is the
+position in the series); after that the least-squares slope, mean and
+standard deviation of any contiguous window cost O(1), so every horizon of
+every lift is answered from the same pass.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Mapping, Sequence
+
+TREND_HORIZONS = (4, 8, 16, 52)
+# A complete window whose e1RM grows by less than this fraction of its mean per session is a plateau.
+PLATEAU_RELATIVE_SLOPE = 0.002
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    """Summary of one window: size, least-squares slope per step, mean and population std."""
+
+    count: int
+    slope: float
+    mean: float
+    std: float
+
+
+class PrefixStats:
+    """Cumulative sums over a series for O(1) window statistics."""
+
+    def __init__(self, values: Iterable[float]) -> None:
+        self._x = array("d", [0.0])
+        self._y = array("d", [0.0])
+        self._xy = array("d", [0.0])
+        self._xx = array("d", [0.0])
+        self._yy = array("d", [0.0])
+        for x, y in enumerate(values):
+            y = float(y)
+            self._x.append(self._x[-1] + x)
+            self._y.append(self._y[-1] + y)
+            self._xy.append(self._xy[-1] + x * y)
+            self._xx.append(self._xx[-1] + x * x)
+            self._yy.append(self._yy[-1] + y * y)
+
+    def __len__(self) -> int:
+        return len(self._y) - 1
+
+    def window(self, start: int, end: int) -> WindowStats:
+        """Statistics of values[start:end]; the window must not be empty."""
+        n = end - start
+        if n <= 0 or start < 0 or end > len(self):
+            raise ValueError("Window must be a non-empty range inside the series")
+        sx = self._x[end] - self._x[start]
+        sy = self._y[end] - self._y[start]
+        sxy = self._xy[end] - self._xy[start]
+        sxx = self._xx[end] - self._xx[start]
+        syy = self._yy[end] - self._yy[start]
+        mean = sy / n
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        slope = cov / var_x if var_x > 0 else 0.0
+        # Cancellation can leave a tiny negative variance for a flat window.
+        std = math.sqrt(max(syy / n - mean * mean, 0.0))
+        return WindowStats(count=n, slope=slope, mean=mean, std=std)
+
+    def last(self, count: int) -> WindowStats:
+        """Statistics of the trailing `count` values (fewer if the series is shorter)."""
+        return self.window(max(len(self) - count, 0), len(self))
+
+
+@dataclass(frozen=True)
+class HorizonTrend:
+    """Trend of one lift over one horizon; `plateau` is None until the window is complete."""
+
+    horizon: int
+    stats: WindowStats
+    plateau: bool | None
+
+
+def lift_trends(
+    series: Mapping[str, Sequence[tuple[date, float]]],
+    horizons: Sequence[int] = TREND_HORIZONS,
+    plateau_slope: float = PLATEAU_RELATIVE_SLOPE,
+) -> dict[str, list[HorizonTrend]]:
+    """Per-lift trends over each horizon from chronological (date, e1RM) series."""
+    result: dict[str, list[HorizonTrend]] = {}
+    for exercise, points in series.items():
+        if len(points) < 2:
+            continue
+        stats = PrefixStats(e1rm for _, e1rm in points)
+        trends = []
+        for horizon in horizons:
+            window = stats.last(horizon)
+            plateau = None
+            if window.count >= horizon:
+                plateau = window.mean <= 0 or window.slope / window.mean < plateau_slope
+            trends.append(HorizonTrend(horizon=horizon, stats=window, plateau=plateau))
+        result[exercise] = trends
+    return result
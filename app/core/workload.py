@@ -0,0 +1,133 @@
+"""Acute:chronic workload ratio from exponentially weighted daily loads."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Mapping
+
+import numpy as np
+
+from app.core.physiology import infer_muscle_group
+from app.schemas.models import ExerciseLog
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+ACWR_HIGH = 1.5
+ACWR_LOW = 0.8
+TOTAL_GROUP = "All"
+
+
+def ewma_lambda(days: int) -> float:
+    return 2.0 / (days + 1.0)
+
+
+ACUTE_LAMBDA = ewma_lambda(ACUTE_DAYS)
+CHRONIC_LAMBDA = ewma_lambda(CHRONIC_DAYS)
+
+
+@dataclass
+class LoadState:
+    """Acute and chronic EWMA loads as of `last_date` (rest days count as zero load)."""
+
+    acute: float = 0.0
+    chronic: float = 0.0
+    last_date: date | None = None
+    first_date: date | None = None
+
+    def add(self, day: date, load: float) -> None:
+        """Fold one day's load in O(1); backdated loads are discounted to `last_date`."""
+        self.first_date = day if self.first_date is None else min(self.first_date, day)
+        if self.last_date is None:
+            self.last_date = day
+        elif day > self.last_date:
+            self.acute, self.chronic = self._decayed_values(day)
+            self.last_date = day
+        lag = (self.last_date - day).days
+        self.acute += ACUTE_LAMBDA * load * (1.0 - ACUTE_LAMBDA) ** lag
+        self.chronic += CHRONIC_LAMBDA * load * (1.0 - CHRONIC_LAMBDA) ** lag
+
+    def decayed(self, day: date) -> LoadState:
+        """State projected forward to `day` assuming no further training."""
+        if self.last_date is None or day <= self.last_date:
+            return LoadState(self.acute, self.chronic, self.last_date, self.first_date)
+        acute, chronic = self._decayed_values(day)
+        return LoadState(acute, chronic, day, self.first_date)
+
+    def merged(self, other: LoadState) -> LoadState:
+        """State with both histories' loads, as of the later of the two dates."""
+        if other.last_date is None:
+            return self.decayed(self.last_date) if self.last_date else LoadState()
+        if self.last_date is None:
+            return other.merged(self)
+        day = max(self.last_date, other.last_date)
+        mine, theirs = self.decayed(day), other.decayed(day)
+        first = min(mine.first_date, theirs.first_date)
+        return LoadState(mine.acute + theirs.acute, mine.chronic + theirs.chronic, day, first)
+
+    @property
+    def acwr(self) -> float | None:
+        """Ratio once a full chronic window has been observed; None before that."""
+        if self.first_date is None or (self.last_date - self.first_date).days < CHRONIC_DAYS:
+            return None
+        if self.chronic <= 1e-9:
+            return None
+        return float(np.round(self.acute / self.chronic, 4))
+
+    def _decayed_values(self, day: date) -> tuple[float, float]:
+        gap = (day - self.last_date).days
+        return self.acute * (1.0 - ACUTE_LAMBDA) ** gap, self.chronic * (1.0 - CHRONIC_LAMBDA) ** gap
+
+
+def session_muscle_loads(exercises: Iterable[ExerciseLog], session_rpe: float) -> dict[str, float]:
+    """Split the `fatigue_model` workload of a session by muscle group, plus a total."""
+    loads: dict[str, float] = defaultdict(float)
+    for ex in exercises:
+        effort_factor = np.clip((5.0 - ex.rir) / 5.0, 0.2, 1.0)
+        load = ex.load_kg * ex.reps * ex.sets * effort_factor / 1000.0 * (session_rpe / 10.0)
+        loads[infer_muscle_group(ex.exercise)] += load
+        loads[TOTAL_GROUP] += load
+    return dict(loads)
+
+
+def backfill_load_states(history: Iterable[tuple[date, Mapping[str, float]]]) -> dict[str, LoadState]:
+    """Closed-form EWMA states over a full history of (date, muscle loads).
+
+    Each state is a discounted sum of loads, so every muscle group reduces to
+    one weighted dot product rather than a day-by-day recurrence.
+    """
+    days_by_group: dict[str, list[int]] = defaultdict(list)
+    loads_by_group: dict[str, list[float]] = defaultdict(list)
+    last_day = 0
+    for day, loads in history:
+        ordinal = day.toordinal()
+        last_day = max(last_day, ordinal)
+        for group, load in loads.items():
+            days_by_group[group].append(ordinal)
+            loads_by_group[group].append(load)
+
+    states: dict[str, LoadState] = {}
+    for group, days in days_by_group.items():
+        lags = last_day - np.array(days, dtype=float)
+        loads = np.array(loads_by_group[group], dtype=float)
+        acute_weights = np.power(1.0 - ACUTE_LAMBDA, lags)
+        chronic_weights = np.power(1.0 - CHRONIC_LAMBDA, lags)
+        states[group] = LoadState(
+            acute=float(ACUTE_LAMBDA * np.sum(loads * acute_weights)),
+            chronic=float(CHRONIC_LAMBDA * np.sum(loads * chronic_weights)),
+            last_date=date.fromordinal(last_day),
+            first_date=date.fromordinal(min(days)),
+        )
+    return states
+
+
+def acwr_flag(acwr: float | None) -> str:
+    """Classify a ratio into the conventional injury-risk zones."""
+    if acwr is None:
+        return "insufficient"
+    if acwr > ACWR_HIGH:
+        return "high"
+    if acwr < ACWR_LOW:
+        return "low"
+    return "optimal"
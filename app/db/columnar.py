@@ -0,0 +1,212 @@
+"""Memory-mapped columnar store for compacted exercise-log history.
+
+Each user gets a directory of per-month partitions holding one fixed-width
+column file per field. Readers map the files and cast them to typed
+`memoryview`s, so analytics scan only the columns they need without copying
+or hydrating ORM objects. Rows not yet compacted (the "tail") stay in the
+database and are described by the manifest watermarks.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import shutil
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+COLUMNAR_DIR = Path(os.getenv("COLUMNAR_DIR", "var/columnar"))
+
+# Column name -> array typecode. Dates are stored as proleptic ordinals.
+COLUMNS = {
+    "session_id": "q",
+    "day": "i",
+    "exercise_id": "i",
+    "sets": "i",
+    "reps": "i",
+    "load_kg": "d",
+    "rir": "d",
+}
+
+LogRow = tuple[int, date, str, int, int, float, float]
+"""(session_id, session_date, exercise, sets, reps, load_kg, rir)."""
+
+
+@dataclass
+class Manifest:
+    """Compaction watermarks and partition index for one user."""
+
+    cutoff: date | None = None
+    max_session_id: int = 0
+    exercises: list[str] = field(default_factory=list)
+    months: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class MonthColumns:
+    """Zero-copy typed views over one month partition."""
+
+    session_id: memoryview
+    day: memoryview
+    exercise_id: memoryview
+    sets: memoryview
+    reps: memoryview
+    load_kg: memoryview
+    rir: memoryview
+    maps: list[mmap.mmap] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def close(self) -> None:
+        """Release the views, then unmap the files."""
+        for name in COLUMNS:
+            getattr(self, name).release()
+        for mapped in self.maps:
+            mapped.close()
+
+
+class ColumnStore:
+    """Reads and writes per-user, per-month column partitions."""
+
+    def __init__(self, root: Path = COLUMNAR_DIR) -> None:
+        self.root = root
+
+    def user_dir(self, user_id: int) -> Path:
+        return self.root / f"user={user_id}"
+
+    def manifest(self, user_id: int) -> Manifest:
+        path = self.user_dir(user_id) / "manifest.json"
+        if not path.exists():
+            return Manifest()
+        raw = json.loads(path.read_text())
+        return Manifest(
+            cutoff=date.fromisoformat(raw["cutoff"]) if raw["cutoff"] else None,
+            max_session_id=raw["max_session_id"],
+            exercises=raw["exercises"],
+            months=raw["months"],
+        )
+
+    def month(self, user_id: int, directory: str) -> MonthColumns:
+        """Map one partition; the caller must `close()` it."""
+        base = self.user_dir(user_id) / directory
+        views: dict[str, memoryview] = {}
+        maps: list[mmap.mmap] = []
+        for name, code in COLUMNS.items():
+            views[name], mapped = _map_column(base / name, code)
+            if mapped is not None:
+                maps.append(mapped)
+        return MonthColumns(**views, maps=maps)
+
+    def iter_rows(self, user_id: int, since: date | None = None, manifest: Manifest | None = None) -> Iterator[LogRow]:
+        """Yield compacted rows in chronological month order, optionally from `since`."""
+        manifest = manifest or self.manifest(user_id)
+        min_day = since.toordinal() if since else None
+        since_month = since.strftime("%Y-%m") if since else ""
+        for month_key in sorted(manifest.months):
+            if month_key < since_month:
+                continue
+            cols = self.month(user_id, manifest.months[month_key])
+            try:
+                for i in range(len(cols)):
+                    day = cols.day[i]
+                    if min_day is not None and day < min_day:
+                        continue
+                    yield (
+                        cols.session_id[i],
+                        date.fromordinal(day),
+                        manifest.exercises[cols.exercise_id[i]],
+                        cols.sets[i],
+                        cols.reps[i],
+                        cols.load_kg[i],
+                        cols.rir[i],
+                    )
+            finally:
+                # Also runs when the consumer stops early and the generator is closed.
+                cols.close()
+
+    def append(self, user_id: int, rows: Iterable[LogRow], cutoff: date, max_session_id: int) -> int:
+        """Merge newly compacted rows into their month partitions and advance watermarks.
+
+        Affected months are rewritten into a fresh versioned directory and the
+        manifest is swapped atomically, so concurrent readers never observe a
+        partially written partition.
+        """
+        manifest = self.manifest(user_id)
+        exercise_ids = {name: idx for idx, name in enumerate(manifest.exercises)}
+        by_month: dict[str, dict[str, array]] = defaultdict(lambda: {name: array(code) for name, code in COLUMNS.items()})
+        count = 0
+        for session_id, session_date, exercise, sets, reps, load_kg, rir in rows:
+            if exercise not in exercise_ids:
+                exercise_ids[exercise] = len(manifest.exercises)
+                manifest.exercises.append(exercise)
+            cols = by_month[session_date.strftime("%Y-%m")]
+            cols["session_id"].append(session_id)
+            cols["day"].append(session_date.toordinal())
+            cols["exercise_id"].append(exercise_ids[exercise])
+            cols["sets"].append(sets)
+            cols["reps"].append(reps)
+            cols["load_kg"].append(load_kg)
+            cols["rir"].append(rir)
+            count += 1
+
+        user_dir = self.user_dir(user_id)
+        user_dir.mkdir(parents=True, exist_ok=True)
+        retired: list[str] = []
+        for month_key, new_cols in by_month.items():
+            previous = manifest.months.get(month_key)
+            version = int(previous.rsplit(".v", 1)[1]) + 1 if previous else 1
+            target = user_dir / f"{month_key}.v{version}"
+            target.mkdir(exist_ok=True)
+            for name, code in COLUMNS.items():
+                merged = array(code)
+                if previous:
+                    merged.frombytes((user_dir / previous / name).read_bytes())
+                merged.extend(new_cols[name])
+                (target / name).write_bytes(merged.tobytes())
+            manifest.months[month_key] = target.name
+            if previous:
+                retired.append(previous)
+
+        manifest.cutoff = cutoff
+        manifest.max_session_id = max(manifest.max_session_id, max_session_id)
+        self._write_manifest(user_id, manifest)
+        for directory in retired:
+            shutil.rmtree(user_dir / directory, ignore_errors=True)
+        return count
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's compacted files so the database becomes authoritative again."""
+        shutil.rmtree(self.user_dir(user_id), ignore_errors=True)
+
+    def _write_manifest(self, user_id: int, manifest: Manifest) -> None:
+        path = self.user_dir(user_id) / "manifest.json"
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "cutoff": manifest.cutoff.isoformat() if manifest.cutoff else None,
+                    "max_session_id": manifest.max_session_id,
+                    "exercises": manifest.exercises,
+                    "months": manifest.months,
+                }
+            )
+        )
+        os.replace(tmp, path)
+
+
+def _map_column(path: Path, typecode: str) -> tuple[memoryview, mmap.mmap | None]:
+    size = path.stat().st_size
+    if size == 0:
+        return memoryview(array(typecode)), None
+    with path.open("rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode), mapped
+
+
+column_store = ColumnStore()
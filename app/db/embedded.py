@@ -0,0 +1,120 @@
+"""Optional DuckDB scans over the embedded SQLite database.
+
+In single-node mode the transactional tables live in one SQLite file. With
+`GYMYO_DUCKDB=1` and the `duckdb` package installed, the aggregations behind
+weekly volume and e1RM trends attach that file read-only through DuckDB's
+sqlite extension and run on its vectorized engine; SQLite keeps every write.
+Only the un-compacted tail is scanned here, the columnar store is read as
+before. Without DuckDB the same queries run on the session's own database.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import threading
+from datetime import date
+
+from sqlalchemy import Engine
+
+logger = logging.getLogger(__name__)
+
+DUCKDB_ENABLED = os.getenv("GYMYO_DUCKDB", "0") == "1"
+DUCKDB_AVAILABLE = importlib.util.find_spec("duckdb") is not None
+DUCKDB_THREADS = int(os.getenv("GYMYO_DUCKDB_THREADS", "2"))
+
+_WEEKLY_TONNAGE = """
+SELECT date_trunc('week', CAST(s.session_date AS DATE)) AS week_start,
+       l.exercise,
+       SUM(l.load_kg * l.reps * l.sets) AS tonnage
+FROM gymyo.sessions AS s
+JOIN gymyo.exercise_logs AS l ON l.session_id = s.id
+WHERE s.user_id = $user_id
+  AND CAST(s.session_date AS DATE) >= $since
+  AND ($cutoff IS NULL OR CAST(s.session_date AS DATE) > $cutoff OR s.id > $max_session_id)
+GROUP BY 1, 2
+"""
+
+_EXERCISE_SETS = """
+SELECT s.id, CAST(s.session_date AS DATE), l.exercise, l.sets, l.reps, l.load_kg, l.rir
+FROM gymyo.sessions AS s
+JOIN gymyo.exercise_logs AS l ON l.session_id = s.id
+WHERE s.user_id = $user_id
+  AND lower(l.exercise) = $exercise
+  AND ($since IS NULL OR CAST(s.session_date AS DATE) >= $since)
+  AND ($cutoff IS NULL OR CAST(s.session_date AS DATE) > $cutoff OR s.id > $max_session_id)
+ORDER BY 2, 1
+"""
+
+
+class DuckDBAnalytics:
+    """One in-memory DuckDB instance with the SQLite file attached read-only.
+
+    Each query runs on its own cursor, so request threads can share it.
+    """
+
+    def __init__(self, sqlite_path: str, threads: int = DUCKDB_THREADS) -> None:
+        import duckdb
+
+        self._conn = duckdb.connect(":memory:", config={"threads": threads})
+        try:
+            self._conn.execute("LOAD sqlite")
+        except duckdb.Error:
+            # First use on this machine: fetch the extension (needs network once).
+            self._conn.execute("INSTALL sqlite")
+            self._conn.execute("LOAD sqlite")
+        quoted = sqlite_path.replace("'", "''")
+        self._conn.execute(f"ATTACH '{quoted}' AS gymyo (TYPE sqlite, READ_ONLY)")
+
+    def weekly_tonnage(
+        self, user_id: int, since: date, cutoff: date | None, max_session_id: int
+    ) -> list[tuple[date, str, float]]:
+        """(week_start, exercise, tonnage) for uncompacted sessions on or after `since`."""
+        params = {"user_id": user_id, "since": since, "cutoff": cutoff, "max_session_id": max_session_id}
+        return self._fetch(_WEEKLY_TONNAGE, params)
+
+    def exercise_sets(
+        self, user_id: int, exercise: str, since: date | None, cutoff: date | None, max_session_id: int
+    ) -> list[tuple[int, date, str, int, int, float, float]]:
+        """Uncompacted log rows of one lower-cased exercise, in `_history_rows` order."""
+        params = {
+            "user_id": user_id,
+            "exercise": exercise,
+            "since": since,
+            "cutoff": cutoff,
+            "max_session_id": max_session_id,
+        }
+        return self._fetch(_EXERCISE_SETS, params)
+
+    def _fetch(self, sql: str, params: dict) -> list[tuple]:
+        cursor = self._conn.cursor()
+        try:
+            return [tuple(row) for row in cursor.execute(sql, params).fetchall()]
+        finally:
+            cursor.close()
+
+
+_instances: dict[str, DuckDBAnalytics | None] = {}
+_lock = threading.Lock()
+
+
+def duckdb_for(bind: Engine) -> DuckDBAnalytics | None:
+    """The DuckDB instance over `bind`'s SQLite file, or None to query `bind` directly.
+
+    If DuckDB cannot attach the file (e.g. the sqlite extension is missing
+    offline), that database stays on the SQLite path for the process lifetime.
+    """
+    if not (DUCKDB_ENABLED and DUCKDB_AVAILABLE) or bind.dialect.name != "sqlite":
+        return None
+    path = bind.url.database
+    if not path or path == ":memory:" or bind.get_execution_options().get("schema_translate_map"):
+        return None
+    with _lock:
+        if path not in _instances:
+            try:
+                _instances[path] = DuckDBAnalytics(path)
+            except Exception as exc:
+                logger.warning("DuckDB analytics disabled for %s: %s", path, exc)
+                _instances[path] = None
+        return _instances[path]
@@ -0,0 +1,84 @@
+"""Additive schema upgrades applied at startup."""
+
+from __future__ import annotations
+
+from sqlalchemy import Connection, Engine, Text, bindparam, cast, inspect, select, text, update
+from sqlalchemy.schema import CreateColumn
+
+from app.db.database import Base
+from app.db.models import Prescription
+from app.db.rationale import TYPED_FIELDS, split_rationale
+
+BACKFILL_BATCH_SIZE = 1000
+# Indexes made redundant by later ones, dropped where an older schema still has them.
+RETIRED_INDEXES = {
+    # Covered by uq_exercise_logs_session_exercise, which leads with session_id.
+    "exercise_logs": ("ix_exercise_logs_session_id",),
+    # Covered by uq_prescriptions_user_version_day.
+    "prescriptions": ("ix_prescriptions_user_version",),
+}
+
+
+def upgrade_schema(bind: Engine) -> None:
+    """Create missing tables, then add columns and indexes introduced later.
+
+    Only additive changes are handled, so new columns on existing tables must
+    be nullable or carry a `server_default`. Data backfills are separate CLI
+    commands, so a large backfill never delays startup.
+    """
+    Base.metadata.create_all(bind=bind)
+    schema = bind.get_execution_options().get("schema_translate_map", {}).get(None)
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            qualified = f"{schema}.{table.name}" if schema else table.name
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name, schema=schema)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                    conn.execute(text(f"ALTER TABLE {qualified} ADD COLUMN {ddl}"))
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name, schema=schema)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+            for name in RETIRED_INDEXES.get(table.name, ()):
+                if name in existing_indexes:
+                    conn.execute(text(f"DROP INDEX {schema}.{name}" if schema else f"DROP INDEX {name}"))
+
+
+def backfill_prescription_rationale(bind: Engine, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Move legacy JSON rationales into the typed columns, one committed batch at a time.
+
+    Migrated rows have their JSON emptied, which is what marks them as done,
+    so rerunning (or resuming after a failure) never rewrites them.
+    """
+    table = Prescription.__table__
+    promoted = {name: bindparam(f"new_{name}") for name in (*TYPED_FIELDS, "rationale_extra")}
+    stmt = update(table).where(table.c.id == bindparam("row_id")).values({**promoted, "rationale": {}})
+    migrated = 0
+    last_id = 0
+    while True:
+        with bind.begin() as conn:
+            rows = _legacy_rationales(conn, last_id, batch_size)
+            if not rows:
+                return migrated
+            params = []
+            for row_id, rationale in rows:
+                typed, extra = split_rationale(rationale or {})
+                values = {**typed, "rationale_extra": extra}
+                params.append({"row_id": row_id, **{f"new_{name}": value for name, value in values.items()}})
+            conn.execute(stmt, params)
+        migrated += len(rows)
+        last_id = rows[-1][0]
+
+
+def _legacy_rationales(conn: Connection, after_id: int, limit: int) -> list[tuple[int, dict]]:
+    table = Prescription.__table__
+    stmt = (
+        select(table.c.id, table.c.rationale)
+        .where(cast(table.c.rationale, Text) != "{}", table.c.id > after_id)
+        .order_by(table.c.id)
+        .limit(limit)
+    )
+    return [tuple(row) for row in conn.execute(stmt)]
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import JSON, Boolean, Date, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import JSON, Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.database import Base
@@ -21,6 +21,18 @@ class User(Base):
     training_age_years: Mapped[float] = mapped_column(Float, nullable=False)
     goal: Mapped[str] = mapped_column(String(32), nullable=False)
     mrv_baseline_sets: Mapped[int] = mapped_column(Integer, nullable=False)
+    api_key_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, unique=True, index=True)
+    # Bumped on every write to the user's training data; derived caches key on it.
+    data_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    data_changed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Delta sync: the data_version at which the profile itself last changed.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Sessions up to this date (and id) are represented by the weekly rollup tables.
+    rolled_up_through: Mapped[date | None] = mapped_column(Date, nullable=True)
+    rollup_max_session_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # data_version at which precompute last found too little history; skipped until the next write.
+    prescription_skipped_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     sessions: Mapped[list[Session]] = relationship(back_populates="user", cascade="all, delete-orphan")
 
@@ -29,11 +41,20 @@ class Session(Base):
     """Training session root table."""
 
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_user_date", "user_id", "session_date"),
+        Index("uq_sessions_user_idempotency", "user_id", "idempotency_key", unique=True),
+        Index("ix_sessions_user_version", "user_id", "version"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     session_date: Mapped[date] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    idempotency_key: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    # Owner's data_version when this session, its logs or its metrics last changed.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     user: Mapped[User] = relationship(back_populates="sessions")
     exercise_logs: Mapped[list[ExerciseLogDB]] = relationship(back_populates="session", cascade="all, delete-orphan")
@@ -44,6 +65,7 @@ class ExerciseLogDB(Base):
     """Exercise execution details per session."""
 
     __tablename__ = "exercise_logs"
+    __table_args__ = (Index("uq_exercise_logs_session_exercise", "session_id", "exercise", unique=True),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
@@ -70,6 +92,8 @@ class Metric(Base):
     motivation: Mapped[float] = mapped_column(Float, nullable=False)
     rpe_session: Mapped[float] = mapped_column(Float, nullable=False)
     duration_min: Mapped[int] = mapped_column(Integer, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     session: Mapped[Session] = relationship(back_populates="metrics")
 
@@ -78,6 +102,13 @@ class Prescription(Base):
     """Generated prescription records for traceability."""
 
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        Index("ix_prescriptions_user_date", "user_id", "target_date"),
+        # One cached prescription per data version and day, even with several workers computing it.
+        Index("uq_prescriptions_user_version_day", "user_id", "data_version", "computed_on", unique=True),
+        Index("ix_prescriptions_user_deload_date", "user_id", "deload", "target_date"),
+        Index("ix_prescriptions_user_readiness", "user_id", "readiness"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -87,4 +118,140 @@ class Prescription(Base):
     reps: Mapped[int] = mapped_column(Integer, nullable=False)
     load_kg: Mapped[float] = mapped_column(Float, nullable=False)
     deload: Mapped[bool] = mapped_column(Boolean, nullable=False)
-    rationale: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # Legacy free-form rationale; emptied once promoted to the typed columns below.
+    rationale: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    readiness: Mapped[float | None] = mapped_column(Float, nullable=True)
+    fatigue: Mapped[float | None] = mapped_column(Float, nullable=True)
+    trend: Mapped[float | None] = mapped_column(Float, nullable=True)
+    mrv_sets: Mapped[float | None] = mapped_column(Float, nullable=True)
+    adaptation_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    acwr: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Remaining rationale keys, packed by `app.db.rationale.encode_extra`.
+    rationale_extra: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    data_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Day the prescription was computed for (its ACWR is projected to it); NULL on older rows.
+    computed_on: Mapped[date | None] = mapped_column(Date, nullable=True)
+    created_at: Mapped[datetime | None] = mapped_column(DateTime, default=datetime.utcnow, nullable=True)
+
+
+class SyncTombstoneDB(Base):
+    """Deleted rows, kept so delta sync can tell clients to drop them."""
+
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (Index("ix_sync_tombstones_user_version", "user_id", "version"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entity: Mapped[str] = mapped_column(String(32), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class PersonalRecordDB(Base):
+    """Best e1RM, heaviest load and rep PRs per user and exercise, maintained on ingest."""
+
+    __tablename__ = "personal_records"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    exercise: Mapped[str] = mapped_column(String(64), primary_key=True)
+    display_name: Mapped[str] = mapped_column(String(64), nullable=False)
+    best_e1rm: Mapped[float] = mapped_column(Float, nullable=False)
+    best_e1rm_date: Mapped[date] = mapped_column(Date, nullable=False)
+    heaviest_load_kg: Mapped[float] = mapped_column(Float, nullable=False)
+    heaviest_load_reps: Mapped[int] = mapped_column(Integer, nullable=False)
+    heaviest_load_date: Mapped[date] = mapped_column(Date, nullable=False)
+    most_reps: Mapped[int] = mapped_column(Integer, nullable=False)
+    most_reps_load_kg: Mapped[float] = mapped_column(Float, nullable=False)
+    most_reps_date: Mapped[date] = mapped_column(Date, nullable=False)
+
+
+class PhysiologicalBaselineDB(Base):
+    """Per-user running mean/variance (Welford) and EWMA of readiness biomarkers."""
+
+    __tablename__ = "physiological_baselines"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    hrv_rmssd_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    hrv_rmssd_mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    hrv_rmssd_m2: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    hrv_rmssd_ewma: Mapped[float | None] = mapped_column(Float, nullable=True)
+    resting_hr_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    resting_hr_mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    resting_hr_m2: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    resting_hr_ewma: Mapped[float | None] = mapped_column(Float, nullable=True)
+    sleep_hours_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sleep_hours_mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sleep_hours_m2: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sleep_hours_ewma: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class TrainingLoadDB(Base):
+    """Rolling acute/chronic EWMA workload per user and muscle group."""
+
+    __tablename__ = "training_loads"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    muscle: Mapped[str] = mapped_column(String(32), primary_key=True)
+    acute: Mapped[float] = mapped_column(Float, nullable=False)
+    chronic: Mapped[float] = mapped_column(Float, nullable=False)
+    last_date: Mapped[date] = mapped_column(Date, nullable=False)
+    first_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+
+
+class WeeklyRollupDB(Base):
+    """Per-week session sums for sessions older than the rollup watermark."""
+
+    __tablename__ = "weekly_rollups"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    sessions: Mapped[int] = mapped_column(Integer, nullable=False)
+    readiness_sum: Mapped[float] = mapped_column(Float, nullable=False)
+    fatigue_sum: Mapped[float] = mapped_column(Float, nullable=False)
+    stimulus_sum: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class WeeklyExerciseRollupDB(Base):
+    """Per-week, per-exercise tonnage, sets and best e1RM; grouped by muscle for volume."""
+
+    __tablename__ = "weekly_exercise_rollups"
+    __table_args__ = (Index("ix_weekly_exercise_rollups_user_muscle_week", "user_id", "muscle", "week_start"),)
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    exercise: Mapped[str] = mapped_column(String(64), primary_key=True)
+    muscle: Mapped[str] = mapped_column(String(32), nullable=False)
+    tonnage: Mapped[float] = mapped_column(Float, nullable=False)
+    sets: Mapped[int] = mapped_column(Integer, nullable=False)
+    best_e1rm: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class ArchivedHistoryDB(Base):
+    """Derived state of the sessions deleted by `rollup-sessions --archive`, for rebuilds to start from."""
+
+    __tablename__ = "archived_history"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # Weeks up to this date may have lost raw sessions, so their rollups can no longer be recomputed.
+    through: Mapped[date] = mapped_column(Date, nullable=False)
+    sessions: Mapped[int] = mapped_column(Integer, nullable=False)
+    state: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+
+class StrengthCurveDB(Base):
+    """Cached per-exercise strength-curve statistics and fitted coefficients."""
+
+    __tablename__ = "strength_curves"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    exercise: Mapped[str] = mapped_column(String(64), primary_key=True)
+    as_of: Mapped[date] = mapped_column(Date, nullable=False)
+    sw: Mapped[float] = mapped_column(Float, nullable=False)
+    sr: Mapped[float] = mapped_column(Float, nullable=False)
+    srr: Mapped[float] = mapped_column(Float, nullable=False)
+    sy: Mapped[float] = mapped_column(Float, nullable=False)
+    sry: Mapped[float] = mapped_column(Float, nullable=False)
+    sets: Mapped[int] = mapped_column(Integer, nullable=False)
+    intercept: Mapped[float] = mapped_column(Float, nullable=False)
+    slope: Mapped[float] = mapped_column(Float, nullable=False)
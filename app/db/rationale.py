@@ -0,0 +1,109 @@
+"""Split prescription rationales into typed columns plus a compact binary remainder.
+
+The engine's well-known rationale fields live in typed `prescriptions`
+columns so history analytics never decode JSON. Any other key is packed
+with a small tagged struct encoding: one byte per tag, length-prefixed
+UTF-8 keys and native 8-byte numbers, with JSON only for nested values.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any
+
+TYPED_FIELDS = ("readiness", "fatigue", "trend", "mrv_sets", "adaptation_score", "acwr")
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<BH")
+_KEY = struct.Struct("<B")
+_FLOAT = struct.Struct("<d")
+_INT = struct.Struct("<q")
+_LENGTH = struct.Struct("<I")
+
+
+def split_rationale(rationale: dict[str, Any]) -> tuple[dict[str, float | None], bytes | None]:
+    """Typed column values and the encoded remainder; `deload` is dropped (it has its own column)."""
+    typed = {name: _as_float(rationale.get(name)) for name in TYPED_FIELDS}
+    extra = {key: value for key, value in rationale.items() if key not in TYPED_FIELDS and key != "deload"}
+    return typed, encode_extra(extra)
+
+
+def join_rationale(typed: dict[str, float | None], deload: bool, extra: bytes | None) -> dict[str, Any]:
+    """Rebuild the rationale dict the engine produced, in its original key order."""
+    rationale: dict[str, Any] = {}
+    for name in TYPED_FIELDS:
+        if name == "acwr":
+            continue
+        if typed.get(name) is not None:
+            rationale[name] = typed[name]
+    rationale["deload"] = "1" if deload else "0"
+    if typed.get("acwr") is not None:
+        rationale["acwr"] = typed["acwr"]
+    rationale.update(decode_extra(extra))
+    return rationale
+
+
+def encode_extra(values: dict[str, Any]) -> bytes | None:
+    if not values:
+        return None
+    parts = [_HEADER.pack(FORMAT_VERSION, len(values))]
+    for key, value in values.items():
+        encoded_key = key.encode("utf-8")
+        parts.append(_KEY.pack(len(encoded_key)))
+        parts.append(encoded_key)
+        if isinstance(value, bool):
+            parts.append(b"t" if value else b"f")
+        elif isinstance(value, int):
+            parts.append(b"q" + _INT.pack(value))
+        elif isinstance(value, float):
+            parts.append(b"d" + _FLOAT.pack(value))
+        elif value is None:
+            parts.append(b"n")
+        else:
+            tag, payload = (b"s", value.encode("utf-8")) if isinstance(value, str) else (b"j", json.dumps(value).encode())
+            parts.append(tag + _LENGTH.pack(len(payload)) + payload)
+    return b"".join(parts)
+
+
+def decode_extra(data: bytes | None) -> dict[str, Any]:
+    if not data:
+        return {}
+    version, count = _HEADER.unpack_from(data, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported rationale encoding version {version}")
+    offset = _HEADER.size
+    values: dict[str, Any] = {}
+    for _ in range(count):
+        (key_length,) = _KEY.unpack_from(data, offset)
+        offset += _KEY.size
+        key = data[offset : offset + key_length].decode("utf-8")
+        offset += key_length
+        tag = data[offset : offset + 1]
+        offset += 1
+        if tag in (b"t", b"f"):
+            values[key] = tag == b"t"
+        elif tag == b"n":
+            values[key] = None
+        elif tag == b"q":
+            (values[key],) = _INT.unpack_from(data, offset)
+            offset += _INT.size
+        elif tag == b"d":
+            (values[key],) = _FLOAT.unpack_from(data, offset)
+            offset += _FLOAT.size
+        else:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            payload = data[offset : offset + length].decode("utf-8")
+            offset += length
+            values[key] = payload if tag == b"s" else json.loads(payload)
+    return values
+
+
+def _as_float(value: Any) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
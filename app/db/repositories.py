@@ -2,28 +2,70 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import secrets
+import time
 from collections import defaultdict
-from collections.abc import Sequence
-from datetime import timedelta
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from datetime import date, datetime, timedelta
+from itertools import chain, groupby
 
-from sqlalchemy import select
+from sqlalchemy import Select, case, column, delete, func, insert, literal, or_, select, true, update, values
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
-from app.core.prediction import one_rm_estimator
-from app.db.models import ExerciseLogDB, Metric, Prescription, Session as SessionDB, User
+from app.core.baselines import PhysiologicalBaseline
+from app.core.physiology import infer_muscle_group
+from app.core.prediction import epley_e1rm
+from app.core.rollups import ArchivedHistory, ExerciseWeek, WeeklyRollup, rollup_sessions
+from app.core.strength import CurveStats, StrengthCurve, accumulate_curve_stats, fit_curves
+from app.core.workload import TOTAL_GROUP, LoadState, acwr_flag, backfill_load_states, session_muscle_loads
+from app.db.columnar import ColumnStore, LogRow, Manifest, column_store
+from app.db.database import derived_write
+from app.db.embedded import duckdb_for
+from app.db.models import (
+    ArchivedHistoryDB,
+    ExerciseLogDB,
+    Metric,
+    PersonalRecordDB,
+    PhysiologicalBaselineDB,
+    Prescription,
+    Session as SessionDB,
+    StrengthCurveDB,
+    SyncTombstoneDB,
+    TrainingLoadDB,
+    User,
+    WeeklyExerciseRollupDB,
+    WeeklyRollupDB,
+)
+from app.db.rationale import TYPED_FIELDS, decode_extra, join_rationale, split_rationale
 from app.schemas.models import (
     E1RMPoint,
     ExerciseLog,
+    MuscleWorkload,
+    PersonalRecord,
+    PrescriptionHistoryPoint,
     ProfileUpdate,
     SessionInput,
     SessionMetrics,
     SessionSummary,
+    SyncResponse,
+    SyncSession,
     TrainingPrescription,
     UserProfile,
     WeeklyVolumePoint,
 )
 
 DEFAULT_USER_ID = 1
+METRIC_FIELDS = ("sleep_hours", "resting_hr", "hrv_rmssd", "soreness", "motivation", "rpe_session", "duration_min")
+LOG_FIELDS = ("exercise", "sets", "reps", "load_kg", "rir")
+# Keyless sessions with identical content are treated as retries only within this window.
+FINGERPRINT_WINDOW_SECONDS = int(os.getenv("FINGERPRINT_WINDOW_SECONDS", "600"))
+# "personal" scores readiness against each athlete's own running baselines.
+READINESS_MODE = os.getenv("GYMYO_READINESS_MODE", "population")
 
 
 def get_or_create_default_user(db: Session) -> User:
@@ -44,6 +86,43 @@ def get_or_create_default_user(db: Session) -> User:
     return user
 
 
+def create_user(db: Session, payload: ProfileUpdate, user_id: int | None = None) -> User:
+    """Insert a new athlete; `user_id` is required when tenants are sharded."""
+    user = User(
+        id=user_id,
+        age=payload.age,
+        bodyweight_kg=payload.bodyweight_kg,
+        training_age_years=payload.training_age_years,
+        goal=payload.goal,
+        mrv_baseline_sets=payload.mrv_baseline_sets,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def issue_api_token(db: Session, user_id: int) -> str:
+    """Rotate the user's API token and return it; only its hash is stored."""
+    user = db.get(User, user_id)
+    if user is None:
+        raise ValueError(f"User {user_id} not found")
+    # The user id prefix lets the API pick the tenant's shard before any lookup.
+    token = f"{user_id}.{secrets.token_urlsafe(32)}"
+    user.api_key_hash = hash_api_token(token)
+    db.commit()
+    return token
+
+
+def hash_api_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def verify_api_token(db: Session, user_id: int, token: str) -> bool:
+    stmt = select(User.id).where(User.id == user_id, User.api_key_hash == hash_api_token(token))
+    return db.scalar(stmt) is not None
+
+
 def get_user_profile(db: Session, user_id: int) -> UserProfile:
     user = db.get(User, user_id)
     if user is None:
@@ -69,44 +148,328 @@ def update_user_profile(db: Session, user_id: int, payload: ProfileUpdate) -> Us
     user.training_age_years = payload.training_age_years
     user.goal = payload.goal
     user.mrv_baseline_sets = payload.mrv_baseline_sets
+    user.version = _bump_data_version(db, user_id)
+    user.updated_at = datetime.utcnow()
     db.commit()
     return get_user_profile(db, user_id)
 
 
 def save_session(db: Session, payload: SessionInput) -> int:
-    if db.get(User, payload.user_id) is None:
-        raise ValueError(f"User {payload.user_id} not found")
+    """Upsert a session with its metrics and exercise logs.
 
-    session = SessionDB(user_id=payload.user_id, session_date=payload.metrics.date)
-    db.add(session)
-    db.flush()
+    Retries carrying the same idempotency key (or, without one, the same
+    content within `FINGERPRINT_WINDOW_SECONDS`) resolve to the original
+    session instead of inserting a duplicate.
+    """
+    key = payload.idempotency_key or _fingerprint_key(db, payload)
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            row = db.execute(_pg_session_upsert(payload, key)).one()
+            session_id, previous = row[0], _metrics_from_row(row[1:-1])
+            previous_logs = [ExerciseLog(**dict(zip(LOG_FIELDS, log))) for log in row[-1] or []]
+        else:
+            session_id, previous, previous_logs = _upsert_session_rows(db, payload, key)
+        if previous is not None and session_id <= column_store.manifest(payload.user_id).max_session_id:
+            # A retry rewrote an already compacted session; fall back to the database.
+            column_store.invalidate(payload.user_id)
+        # Derived rows are read and created only after the version bump, whose
+        # user-row lock serializes this user's writers until commit.
+        _stamp_session(db, session_id, _bump_data_version(db, payload.user_id))
+        if previous is None:
+            _update_baseline(db, payload.user_id, lambda baseline: baseline.push(payload.metrics))
+            _apply_training_loads(
+                db,
+                payload.user_id,
+                [(payload.metrics.date, session_muscle_loads(payload.exercises, payload.metrics.rpe_session))],
+            )
+            _merge_personal_records(
+                db,
+                payload.user_id,
+                [(payload.metrics.date, ex.exercise, ex.reps, ex.load_kg, ex.rir) for ex in payload.exercises],
+            )
+            _fold_strength_curves(
+                db,
+                payload.user_id,
+                [(payload.metrics.date, ex.exercise, ex.sets, ex.reps, ex.load_kg, ex.rir) for ex in payload.exercises],
+            )
+        else:
+            refold = _rolled_up_weeks(db, payload.user_id, session_id, [previous.date, payload.metrics.date])
+            _update_baseline(db, payload.user_id, lambda baseline: baseline.replace(previous, payload.metrics))
+            _apply_training_loads(
+                db,
+                payload.user_id,
+                [
+                    (previous.date, _negated(session_muscle_loads(previous_logs, previous.rpe_session))),
+                    (payload.metrics.date, session_muscle_loads(payload.exercises, payload.metrics.rpe_session)),
+                ],
+            )
+            # A corrected retry can lower or drop a record, which a max-only merge cannot undo.
+            touched = {ex.exercise.lower() for ex in chain(payload.exercises, previous_logs)}
+            _recompute_personal_records(db, payload.user_id, touched)
+            _fold_strength_curves(
+                db,
+                payload.user_id,
+                [(payload.metrics.date, ex.exercise, ex.sets, ex.reps, ex.load_kg, ex.rir) for ex in payload.exercises],
+                retracted=[(previous.date, ex.exercise, ex.sets, ex.reps, ex.load_kg, ex.rir) for ex in previous_logs],
+            )
+            _refold_weeks(db, payload.user_id, refold)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        if db.get(User, payload.user_id) is None:
+            raise ValueError(f"User {payload.user_id} not found") from None
+        raise
+    except ValueError:
+        db.rollback()
+        raise
+    return session_id
 
-    metric = Metric(
-        session_id=session.id,
-        sleep_hours=payload.metrics.sleep_hours,
-        resting_hr=payload.metrics.resting_hr,
-        hrv_rmssd=payload.metrics.hrv_rmssd,
-        soreness=payload.metrics.soreness,
-        motivation=payload.metrics.motivation,
-        rpe_session=payload.metrics.rpe_session,
-        duration_min=payload.metrics.duration_min,
-    )
-    db.add(metric)
 
-    for ex in payload.exercises:
-        db.add(
-            ExerciseLogDB(
-                session_id=session.id,
-                exercise=ex.exercise,
-                sets=ex.sets,
-                reps=ex.reps,
-                load_kg=ex.load_kg,
-                rir=ex.rir,
-            )
+def merge_duplicate_sessions(db: Session, user_id: int, batch_size: int = 500) -> int:
+    """Delete sessions whose content duplicates an earlier one and key the survivors.
+
+    Rows are streamed in id order, so the earliest copy of each session is kept.
+    Returns the number of duplicate sessions removed.
+    """
+    stmt = (
+        select(
+            SessionDB.id,
+            SessionDB.session_date,
+            SessionDB.idempotency_key,
+            *(getattr(Metric, name) for name in METRIC_FIELDS),
+            ExerciseLogDB.exercise,
+            ExerciseLogDB.sets,
+            ExerciseLogDB.reps,
+            ExerciseLogDB.load_kg,
+            ExerciseLogDB.rir,
         )
+        .join(Metric, Metric.session_id == SessionDB.id)
+        .join(ExerciseLogDB, ExerciseLogDB.session_id == SessionDB.id)
+        .where(SessionDB.user_id == user_id)
+        .order_by(SessionDB.id)
+        .execution_options(yield_per=batch_size)
+    )
 
+    through, max_rolled_up_id, archived_through = _rollup_bounds(db, user_id)
+    survivors: dict[str, tuple[int, str | None]] = {}
+    duplicates: list[int] = []
+    refold: set[date] = set()
+    metric_end = 3 + len(METRIC_FIELDS)
+    for session_id, rows in groupby(db.execute(stmt), key=lambda row: row[0]):
+        rows = list(rows)
+        session_date, existing_key = _as_date(rows[0][1]), rows[0][2]
+        fingerprint = session_fingerprint(user_id, session_date, rows[0][3:metric_end], [row[metric_end:] for row in rows])
+        if fingerprint not in survivors:
+            survivors[fingerprint] = (session_id, existing_key)
+            continue
+        if through is not None and session_id <= max_rolled_up_id and session_date <= through:
+            week = session_date - timedelta(days=session_date.weekday())
+            if archived_through is not None and week <= archived_through:
+                # Counted in a week whose rollup can no longer be recomputed; keep it.
+                continue
+            refold.add(week)
+        duplicates.append(session_id)
+
+    for start in range(0, len(duplicates), batch_size):
+        chunk = duplicates[start : start + batch_size]
+        db.execute(delete(ExerciseLogDB).where(ExerciseLogDB.session_id.in_(chunk)))
+        db.execute(delete(Metric).where(Metric.session_id.in_(chunk)))
+        db.execute(delete(SessionDB).where(SessionDB.id.in_(chunk)))
+
+    _refold_weeks(db, user_id, refold)
+    unkeyed = [{"id": sid, "idempotency_key": fp} for fp, (sid, key) in survivors.items() if key is None]
+    if unkeyed:
+        db.execute(update(SessionDB), unkeyed)
+    if duplicates:
+        version = _bump_data_version(db, user_id)
+        db.execute(
+            insert(SyncTombstoneDB),
+            [{"user_id": user_id, "entity": "session", "entity_id": sid, "version": version} for sid in duplicates],
+        )
     db.commit()
-    return session.id
+    if duplicates:
+        column_store.invalidate(user_id)
+        rebuild_baseline(db, user_id)
+        backfill_training_loads(db, user_id)
+        rebuild_strength_curves(db, user_id)
+    return len(duplicates)
+
+
+def session_fingerprint(user_id: int, session_date: date, metric_values: Sequence[float], logs: Iterable[Sequence]) -> str:
+    """Content hash of a session; `logs` rows are (exercise, sets, reps, load_kg, rir)."""
+    canonical = [
+        user_id,
+        session_date.isoformat(),
+        [float(v) for v in metric_values],
+        sorted([log[0].lower(), *(float(v) for v in log[1:])] for log in logs),
+    ]
+    digest = hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode()).hexdigest()
+    return f"fp:{digest}"
+
+
+def _payload_fingerprint(payload: SessionInput) -> str:
+    return session_fingerprint(
+        payload.user_id,
+        payload.metrics.date,
+        [getattr(payload.metrics, name) for name in METRIC_FIELDS],
+        [(ex.exercise, ex.sets, ex.reps, ex.load_kg, ex.rir) for ex in payload.exercises],
+    )
+
+
+def _fingerprint_key(db: Session, payload: SessionInput, now: float | None = None) -> str:
+    """Content key for a keyless payload, scoped to a time bucket.
+
+    A retry reuses the key of a matching session from the current or the
+    previous bucket; the same content logged later gets a new session.
+    """
+    fingerprint = _payload_fingerprint(payload)
+    bucket = int((time.time() if now is None else now) // FINGERPRINT_WINDOW_SECONDS)
+    keys = [f"{fingerprint}:{bucket}", f"{fingerprint}:{bucket - 1}"]
+    existing = db.scalar(
+        select(SessionDB.idempotency_key)
+        .where(SessionDB.user_id == payload.user_id, SessionDB.idempotency_key.in_(keys))
+        .order_by(SessionDB.id.desc())
+        .limit(1)
+    )
+    return existing or keys[0]
+
+
+def _metric_values(metrics: SessionMetrics) -> dict[str, float]:
+    return {name: getattr(metrics, name) for name in METRIC_FIELDS}
+
+
+def _log_values(payload: SessionInput) -> list[dict]:
+    return [
+        {"exercise": ex.exercise, "sets": ex.sets, "reps": ex.reps, "load_kg": ex.load_kg, "rir": ex.rir}
+        for ex in payload.exercises
+    ]
+
+
+def _session_insert(insert, payload: SessionInput, key: str):
+    # Defaults are spelled out: SQLAlchemy cannot render column defaults inside a PostgreSQL CTE.
+    stmt = insert(SessionDB).values(
+        user_id=payload.user_id,
+        session_date=payload.metrics.date,
+        idempotency_key=key,
+        created_at=datetime.utcnow(),
+        version=0,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[SessionDB.user_id, SessionDB.idempotency_key],
+        set_={"session_date": stmt.excluded.session_date},
+    ).returning(SessionDB.id)
+
+
+def _pg_session_upsert(payload: SessionInput, key: str) -> Select:
+    """Single-statement upsert of session, metrics and logs via data-modifying CTEs.
+
+    The result row is the session id, the metrics stored before this
+    statement (all NULL for a first insert) and the previous logs as a JSON
+    array of `LOG_FIELDS` rows, since every CTE reads the pre-statement snapshot.
+    """
+    previous = _previous_metrics_stmt(payload.user_id, key).cte("previous_metrics")
+    previous_logs = _previous_logs_stmt(payload.user_id, key).subquery("previous_logs")
+    previous_logs_json = (
+        select(func.json_agg(func.json_build_array(*(previous_logs.c[name] for name in LOG_FIELDS))))
+        .scalar_subquery()
+    )
+    session_cte = _session_insert(postgresql.insert, payload, key).cte("upserted_session")
+
+    metric_values = _metric_values(payload.metrics)
+    metric_stmt = postgresql.insert(Metric).from_select(
+        ["session_id", *metric_values],
+        select(session_cte.c.id, *(literal(v, Metric.__table__.c[name].type) for name, v in metric_values.items())),
+        include_defaults=False,
+    )
+    metric_cte = metric_stmt.on_conflict_do_update(
+        index_elements=[Metric.session_id],
+        set_={name: metric_stmt.excluded[name] for name in metric_values},
+    ).cte("upserted_metrics")
+
+    log_rows = _log_values(payload)
+    incoming = values(
+        *(column(name, ExerciseLogDB.__table__.c[name].type) for name in LOG_FIELDS),
+        name="incoming_logs",
+    ).data([tuple(row[name] for name in LOG_FIELDS) for row in log_rows])
+    logs_stmt = postgresql.insert(ExerciseLogDB).from_select(
+        ["session_id", *LOG_FIELDS],
+        select(session_cte.c.id, *(incoming.c[name] for name in LOG_FIELDS)).select_from(session_cte).join(incoming, true()),
+    )
+    logs_cte = logs_stmt.on_conflict_do_update(
+        index_elements=[ExerciseLogDB.session_id, ExerciseLogDB.exercise],
+        set_={name: logs_stmt.excluded[name] for name in LOG_FIELDS[1:]},
+    ).cte("upserted_logs")
+
+    prune_cte = (
+        delete(ExerciseLogDB)
+        .where(
+            ExerciseLogDB.session_id == select(session_cte.c.id).scalar_subquery(),
+            ExerciseLogDB.exercise.not_in([row["exercise"] for row in log_rows]),
+        )
+        .cte("pruned_logs")
+    )
+    return (
+        select(session_cte.c.id, *(previous.c[name] for name in ("session_date", *METRIC_FIELDS)), previous_logs_json)
+        .select_from(session_cte.outerjoin(previous, true()))
+        .add_cte(metric_cte, logs_cte, prune_cte)
+    )
+
+
+def _previous_metrics_stmt(user_id: int, key: str) -> Select:
+    return (
+        select(SessionDB.session_date, *(getattr(Metric, name) for name in METRIC_FIELDS))
+        .join(Metric, Metric.session_id == SessionDB.id)
+        .where(SessionDB.user_id == user_id, SessionDB.idempotency_key == key)
+    )
+
+
+def _previous_logs_stmt(user_id: int, key: str) -> Select:
+    return (
+        select(*(getattr(ExerciseLogDB, name) for name in LOG_FIELDS))
+        .join(SessionDB, SessionDB.id == ExerciseLogDB.session_id)
+        .where(SessionDB.user_id == user_id, SessionDB.idempotency_key == key)
+    )
+
+
+def _metrics_from_row(row: Sequence) -> SessionMetrics | None:
+    if row[0] is None:
+        return None
+    return SessionMetrics(date=row[0], **dict(zip(METRIC_FIELDS, row[1:])))
+
+
+def _upsert_session_rows(
+    db: Session, payload: SessionInput, key: str
+) -> tuple[int, SessionMetrics | None, list[ExerciseLog]]:
+    """Statement-per-table upsert for SQLite, which lacks data-modifying CTEs."""
+    insert = _dialect_insert(db)
+    previous_row = db.execute(_previous_metrics_stmt(payload.user_id, key)).first()
+    previous = _metrics_from_row(previous_row) if previous_row is not None else None
+    previous_logs = []
+    if previous is not None:
+        previous_logs = [
+            ExerciseLog(**dict(zip(LOG_FIELDS, row))) for row in db.execute(_previous_logs_stmt(payload.user_id, key))
+        ]
+    session_id = db.execute(_session_insert(insert, payload, key)).scalar_one()
+
+    metric_values = _metric_values(payload.metrics)
+    metric_stmt = insert(Metric).values(session_id=session_id, **metric_values)
+    db.execute(metric_stmt.on_conflict_do_update(index_elements=[Metric.session_id], set_=metric_values))
+
+    log_rows = _log_values(payload)
+    logs_stmt = insert(ExerciseLogDB).values([{"session_id": session_id, **row} for row in log_rows])
+    db.execute(
+        logs_stmt.on_conflict_do_update(
+            index_elements=[ExerciseLogDB.session_id, ExerciseLogDB.exercise],
+            set_={name: logs_stmt.excluded[name] for name in LOG_FIELDS[1:]},
+        )
+    )
+    db.execute(
+        delete(ExerciseLogDB).where(
+            ExerciseLogDB.session_id == session_id,
+            ExerciseLogDB.exercise.not_in([row["exercise"] for row in log_rows]),
+        )
+    )
+    return session_id, previous, previous_logs
 
 
 def get_recent_sessions(db: Session, user_id: int, limit: int = 8) -> Sequence[tuple[SessionMetrics, list[ExerciseLog]]]:
@@ -146,6 +509,50 @@ def get_recent_sessions(db: Session, user_id: int, limit: int = 8) -> Sequence[t
     return sessions
 
 
+def iter_session_history(
+    db: Session, user_id: int, batch_size: int = 64, after: date | None = None
+) -> Iterator[tuple[SessionMetrics, list[ExerciseLog]]]:
+    """Stream sessions newest first from one joined cursor.
+
+    Rows are fetched in `batch_size` chunks, so a consumer that stops early
+    never pulls older history from the database. With `after` only sessions
+    dated later are read, e.g. those not yet rolled up.
+    """
+    stmt = _session_history_stmt(user_id).order_by(SessionDB.session_date.desc(), SessionDB.id.desc())
+    if after is not None:
+        stmt = stmt.where(SessionDB.session_date > after)
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    try:
+        for _, metrics, exercises in _group_session_rows(result):
+            yield metrics, exercises
+    finally:
+        result.close()
+
+
+def _session_history_stmt(user_id: int) -> Select:
+    return (
+        select(
+            SessionDB.id,
+            SessionDB.session_date,
+            *(getattr(Metric, name) for name in METRIC_FIELDS),
+            *(getattr(ExerciseLogDB, name) for name in LOG_FIELDS),
+        )
+        .join(Metric, Metric.session_id == SessionDB.id)
+        .join(ExerciseLogDB, ExerciseLogDB.session_id == SessionDB.id)
+        .where(SessionDB.user_id == user_id)
+    )
+
+
+def _group_session_rows(rows: Iterable[Sequence]) -> Iterator[tuple[int, SessionMetrics, list[ExerciseLog]]]:
+    """Fold `_session_history_stmt` rows, ordered by session, into (id, metrics, exercises)."""
+    metric_end = 2 + len(METRIC_FIELDS)
+    for session_id, group in groupby(rows, key=lambda row: row[0]):
+        group = list(group)
+        metrics = SessionMetrics(date=group[0][1], **dict(zip(METRIC_FIELDS, group[0][2:metric_end])))
+        exercises = [ExerciseLog(**dict(zip(LOG_FIELDS, row[metric_end:]))) for row in group]
+        yield session_id, metrics, exercises
+
+
 def get_latest_metrics(db: Session, user_id: int) -> SessionMetrics | None:
     """Fetch latest metrics for dashboard card."""
     stmt = (
@@ -182,6 +589,25 @@ def update_metrics(db: Session, user_id: int, metrics: SessionMetrics) -> None:
     if session is None or session.metrics is None:
         raise ValueError("Session metrics not found")
 
+    previous = SessionMetrics(date=session.session_date, **{name: getattr(session.metrics, name) for name in METRIC_FIELDS})
+    version = _bump_data_version(db, user_id)
+    try:
+        refold = _rolled_up_weeks(db, user_id, session.id, [metrics.date])
+    except ValueError:
+        db.rollback()
+        raise
+    _update_baseline(db, user_id, lambda baseline: baseline.replace(previous, metrics))
+    if metrics.rpe_session != previous.rpe_session:
+        # Session loads scale with the session RPE.
+        exercises = [ExerciseLog(**{name: getattr(ex, name) for name in LOG_FIELDS}) for ex in session.exercise_logs]
+        _apply_training_loads(
+            db,
+            user_id,
+            [
+                (previous.date, _negated(session_muscle_loads(exercises, previous.rpe_session))),
+                (metrics.date, session_muscle_loads(exercises, metrics.rpe_session)),
+            ],
+        )
     session.metrics.sleep_hours = metrics.sleep_hours
     session.metrics.resting_hr = metrics.resting_hr
     session.metrics.hrv_rmssd = metrics.hrv_rmssd
@@ -189,6 +615,9 @@ def update_metrics(db: Session, user_id: int, metrics: SessionMetrics) -> None:
     session.metrics.motivation = metrics.motivation
     session.metrics.rpe_session = metrics.rpe_session
     session.metrics.duration_min = metrics.duration_min
+    session.version = session.metrics.version = version
+    session.updated_at = session.metrics.updated_at = datetime.utcnow()
+    _refold_weeks(db, user_id, refold)
     db.commit()
 
 
@@ -218,15 +647,35 @@ def get_recent_session_summaries(db: Session, user_id: int, limit: int = 5) -> l
 
 
 def get_weekly_volume(db: Session, user_id: int, weeks: int = 8) -> list[WeeklyVolumePoint]:
-    """Aggregate weekly volume by coarse muscle mapping from exercise name."""
-    sessions = get_recent_sessions(db, user_id, limit=weeks * 4)
+    """Aggregate weekly volume by coarse muscle mapping from exercise name.
+
+    Weeks up to the rollup watermark come from `weekly_exercise_rollups`,
+    later ones from raw exercise logs.
+    """
+    through = get_rollup_watermark(db, user_id)
+    latest = db.scalar(select(func.max(SessionDB.session_date)).where(SessionDB.user_id == user_id))
+    if latest is None or (through is not None and latest <= through):
+        latest = through
+    if latest is None:
+        return []
+    since = latest - timedelta(days=latest.weekday(), weeks=weeks - 1)
     buckets: dict[tuple, float] = defaultdict(float)
 
-    for metrics, exercises in sessions:
-        week_start = metrics.date - timedelta(days=metrics.date.weekday())
-        for ex in exercises:
-            muscle = _infer_muscle_group(ex.exercise)
-            buckets[(week_start, muscle)] += ex.load_kg * ex.reps * ex.sets
+    if through is not None and since <= through:
+        stmt = (
+            select(WeeklyExerciseRollupDB.week_start, WeeklyExerciseRollupDB.muscle, func.sum(WeeklyExerciseRollupDB.tonnage))
+            .where(WeeklyExerciseRollupDB.user_id == user_id, WeeklyExerciseRollupDB.week_start >= since)
+            .group_by(WeeklyExerciseRollupDB.week_start, WeeklyExerciseRollupDB.muscle)
+        )
+        for week_start, muscle, tonnage in db.execute(stmt):
+            buckets[(_as_date(week_start), muscle)] += tonnage
+    raw_since = since if through is None else max(since, through + timedelta(days=1))
+    manifest = column_store.manifest(user_id)
+    for _, session_date, exercise, sets, reps, load_kg, _ in column_store.iter_rows(user_id, raw_since, manifest):
+        week_start = session_date - timedelta(days=session_date.weekday())
+        buckets[(week_start, infer_muscle_group(exercise))] += load_kg * reps * sets
+    for week_start, exercise, tonnage in _tail_weekly_tonnage(db, user_id, raw_since, manifest):
+        buckets[(week_start, infer_muscle_group(exercise))] += tonnage
 
     points = [
         WeeklyVolumePoint(week_start=week, muscle=muscle, volume=round(volume, 2))
@@ -235,43 +684,1111 @@ def get_weekly_volume(db: Session, user_id: int, weeks: int = 8) -> list[WeeklyV
     return points
 
 
-def get_e1rm_trend(db: Session, user_id: int, exercise: str) -> list[E1RMPoint]:
-    """Return chronological e1RM estimates for selected exercise."""
-    sessions = get_recent_sessions(db, user_id, limit=40)
-    trend: list[E1RMPoint] = []
+def get_e1rm_trend(db: Session, user_id: int, exercise: str, sessions: int = 40) -> list[E1RMPoint]:
+    """Return chronological e1RM estimates for selected exercise over the last `sessions` sessions.
+
+    Each set is scored with the lifter's fitted strength curve when one is
+    cached, otherwise with Epley. When fewer raw sessions remain after the rollup watermark, older weeks
+    contribute their best e1RM dated at the week start, each counting as the
+    sessions it rolled up.
+    """
+    through = get_rollup_watermark(db, user_id)
+    recent = select(SessionDB.session_date).where(SessionDB.user_id == user_id)
+    if through is not None:
+        recent = recent.where(SessionDB.session_date > through)
+    since = db.scalar(recent.order_by(SessionDB.session_date.desc()).offset(sessions - 1).limit(1))
+    raw_since = since or (through + timedelta(days=1) if through is not None else None)
     normalized = exercise.lower()
-    for metrics, exercises in sessions:
-        for ex in exercises:
-            if ex.exercise.lower() == normalized:
-                trend.append(E1RMPoint(date=metrics.date, exercise=exercise, e1rm=one_rm_estimator(ex)))
-    return trend
-
-
-def save_prescription(db: Session, user_id: int, prescription: TrainingPrescription) -> int:
-    row = Prescription(
-        user_id=user_id,
-        target_date=prescription.target_date,
-        exercise=prescription.exercise,
-        sets=prescription.sets,
-        reps=prescription.reps,
-        load_kg=prescription.load_kg,
-        deload=prescription.deload,
-        rationale=prescription.rationale,
-    )
-    db.add(row)
+    curve = get_strength_curves(db, user_id, [normalized]).get(normalized)
+    estimate = curve.e1rm_from if curve is not None else epley_e1rm
+    manifest = column_store.manifest(user_id)
+    compacted = (row for row in column_store.iter_rows(user_id, raw_since, manifest) if row[2].lower() == normalized)
+    rows = chain(compacted, _tail_exercise_rows(db, user_id, normalized, raw_since, manifest))
+    points = sorted(
+        (session_date, session_id, estimate(load_kg, reps, rir))
+        for session_id, session_date, _, _, reps, load_kg, rir in rows
+    )
+    trend = [E1RMPoint(date=session_date, exercise=exercise, e1rm=e1rm) for session_date, _, e1rm in points]
+    if since is not None or through is None:
+        return trend
+
+    remaining = sessions - db.scalar(select(func.count()).select_from(recent.subquery()))
+    older: list[E1RMPoint] = []
+    for week in get_weekly_rollups(db, user_id):
+        if remaining <= 0:
+            break
+        if normalized in week.exercises:
+            older.append(E1RMPoint(date=week.week_start, exercise=exercise, e1rm=week.exercises[normalized].best_e1rm))
+        remaining -= week.sessions
+    return older[::-1] + trend
+
+
+def get_e1rm_series(db: Session, user_id: int) -> dict[str, list[tuple[date, float]]]:
+    """Best e1RM per session for every lift, oldest first, keyed by the latest spelling.
+
+    Sets are scored with each lift's fitted strength curve when one is
+    cached, otherwise with Epley. Weeks before the rollup watermark
+    contribute one point each (their best e1RM at the week start), as in
+    `get_e1rm_trend`.
+    """
+    through = get_rollup_watermark(db, user_id)
+    curves = get_strength_curves(db, user_id)
+    names: dict[str, str] = {}
+    series: dict[str, list[tuple[date, float]]] = defaultdict(list)
+    if through is not None:
+        for week in reversed(get_weekly_rollups(db, user_id)):
+            for normalized, totals in week.exercises.items():
+                names.setdefault(normalized, normalized)
+                series[normalized].append((week.week_start, totals.best_e1rm))
+    raw_since = through + timedelta(days=1) if through is not None else None
+    best: dict[tuple[int, str], tuple[date, float]] = {}
+    for session_id, session_date, exercise, _, reps, load_kg, rir in _history_rows(db, user_id, raw_since):
+        normalized = exercise.lower()
+        names[normalized] = exercise
+        curve = curves.get(normalized)
+        e1rm = curve.e1rm_from(load_kg, reps, rir) if curve is not None else epley_e1rm(load_kg, reps, rir)
+        key = (session_id, normalized)
+        if key not in best or e1rm > best[key][1]:
+            best[key] = (session_date, e1rm)
+    for (session_id, normalized), (session_date, e1rm) in sorted(best.items(), key=lambda item: (item[1][0], item[0][0])):
+        series[normalized].append((session_date, e1rm))
+    return {names[normalized]: points for normalized, points in series.items()}
+
+
+def get_rollup_watermark(db: Session, user_id: int) -> date | None:
+    """Last date whose sessions are represented by weekly rollups, if any."""
+    through = db.scalar(select(User.rolled_up_through).where(User.id == user_id))
+    return _as_date(through) if through is not None else None
+
+
+def get_weekly_rollups(db: Session, user_id: int, since: date | None = None) -> list[WeeklyRollup]:
+    """Weekly rollups newest first, with their per-exercise totals."""
+    weeks_stmt = select(WeeklyRollupDB).where(WeeklyRollupDB.user_id == user_id)
+    exercises_stmt = select(WeeklyExerciseRollupDB).where(WeeklyExerciseRollupDB.user_id == user_id)
+    if since is not None:
+        weeks_stmt = weeks_stmt.where(WeeklyRollupDB.week_start >= since)
+        exercises_stmt = exercises_stmt.where(WeeklyExerciseRollupDB.week_start >= since)
+    weeks = {
+        _as_date(row.week_start): WeeklyRollup(
+            week_start=_as_date(row.week_start),
+            sessions=row.sessions,
+            readiness_sum=row.readiness_sum,
+            fatigue_sum=row.fatigue_sum,
+            stimulus_sum=row.stimulus_sum,
+        )
+        for row in db.scalars(weeks_stmt)
+    }
+    for row in db.scalars(exercises_stmt):
+        week = weeks.get(_as_date(row.week_start))
+        if week is not None:
+            week.exercises[row.exercise] = ExerciseWeek(row.exercise, row.muscle, row.tonnage, row.sets, row.best_e1rm)
+    return [weeks[start] for start in sorted(weeks, reverse=True)]
+
+
+def rollup_sessions_through(
+    db: Session,
+    user_id: int,
+    through: date,
+    baseline: PhysiologicalBaseline | None = None,
+    archive: bool = False,
+    batch_size: int = 500,
+) -> int:
+    """Fold sessions dated up to `through` into the weekly rollup tables.
+
+    Only sessions not folded by an earlier run are read: those after the
+    previous watermark, plus backdated ones inserted since (id above the
+    previous max). Writes to a rolled-up session re-aggregate its week. With
+    `archive` the folded raw sessions, metrics and logs are deleted, after
+    their baseline, load, record and curve contributions are added to the
+    user's `archived_history` for rebuilds to start from; their weeks then
+    reject further changes. Export exercise logs with `compact-logs` first to
+    keep their detail. Returns the number of sessions folded.
+    """
+    user = db.get(User, user_id)
+    if user is None:
+        raise ValueError("User not found")
+    previous = _as_date(user.rolled_up_through) if user.rolled_up_through is not None else None
+    if previous is not None:
+        through = max(through, previous)
+    max_session_id = db.scalar(select(func.max(SessionDB.id)).where(SessionDB.user_id == user_id)) or 0
+    stmt = _session_history_stmt(user_id).where(SessionDB.session_date <= through, SessionDB.id <= max_session_id)
+    if previous is not None:
+        stmt = stmt.where(or_(SessionDB.session_date > previous, SessionDB.id > user.rollup_max_session_id))
+    rows = db.execute(stmt.order_by(SessionDB.id).execution_options(yield_per=batch_size))
+
+    folded: list[int] = []
+    archived = (_archived_history(db, user_id) or ArchivedHistory(through)) if archive else None
+
+    def history() -> Iterator[tuple[SessionMetrics, list[ExerciseLog]]]:
+        for session_id, metrics, exercises in _group_session_rows(rows):
+            folded.append(session_id)
+            if archived is not None:
+                archived.add_session(metrics, exercises)
+                _best_records(
+                    user_id,
+                    [(session_id, metrics.date, ex.exercise, ex.sets, ex.reps, ex.load_kg, ex.rir) for ex in exercises],
+                    archived.records,
+                )
+            yield metrics, exercises
+
+    for week in rollup_sessions(history(), baseline, get_strength_curves(db, user_id)).values():
+        _merge_weekly_rollup(db, user_id, week)
+
+    user.rolled_up_through = through
+    user.rollup_max_session_id = max(max_session_id, user.rollup_max_session_id)
+    if archived is not None:
+        archived.through = through
+        _store_archived_history(db, user_id, archived)
+        for start in range(0, len(folded), batch_size):
+            chunk = folded[start : start + batch_size]
+            db.execute(delete(ExerciseLogDB).where(ExerciseLogDB.session_id.in_(chunk)))
+            db.execute(delete(Metric).where(Metric.session_id.in_(chunk)))
+            db.execute(delete(SessionDB).where(SessionDB.id.in_(chunk)))
+    # Readers switch these weeks to rollups, so derived caches must not outlive the move.
+    _bump_data_version(db, user_id)
     db.commit()
-    db.refresh(row)
-    return row.id
-
-
-def _infer_muscle_group(exercise_name: str) -> str:
-    lowered = exercise_name.lower()
-    if any(token in lowered for token in ["squat", "lunge", "leg", "hamstring", "quad", "deadlift"]):
-        return "Lower Body"
-    if any(token in lowered for token in ["row", "pull", "lat", "chin"]):
-        return "Back"
-    if any(token in lowered for token in ["press", "bench", "chest", "dip"]):
-        return "Chest"
-    if any(token in lowered for token in ["curl", "extension", "tricep", "bicep", "shoulder", "raise"]):
-        return "Arms/Shoulders"
-    return "Other"
+    return len(folded)
+
+
+def _merge_weekly_rollup(db: Session, user_id: int, week: WeeklyRollup) -> None:
+    row = db.get(WeeklyRollupDB, (user_id, week.week_start))
+    if row is None:
+        db.add(
+            WeeklyRollupDB(
+                user_id=user_id,
+                week_start=week.week_start,
+                sessions=week.sessions,
+                readiness_sum=week.readiness_sum,
+                fatigue_sum=week.fatigue_sum,
+                stimulus_sum=week.stimulus_sum,
+            )
+        )
+    else:
+        row.sessions += week.sessions
+        row.readiness_sum += week.readiness_sum
+        row.fatigue_sum += week.fatigue_sum
+        row.stimulus_sum += week.stimulus_sum
+    for name, totals in week.exercises.items():
+        ex_row = db.get(WeeklyExerciseRollupDB, (user_id, week.week_start, name))
+        if ex_row is None:
+            db.add(
+                WeeklyExerciseRollupDB(
+                    user_id=user_id,
+                    week_start=week.week_start,
+                    exercise=name,
+                    muscle=totals.muscle,
+                    tonnage=totals.tonnage,
+                    sets=totals.sets,
+                    best_e1rm=totals.best_e1rm,
+                )
+            )
+        else:
+            ex_row.tonnage += totals.tonnage
+            ex_row.sets += totals.sets
+            ex_row.best_e1rm = max(ex_row.best_e1rm, totals.best_e1rm)
+
+
+def _rollup_bounds(db: Session, user_id: int) -> tuple[date | None, int, date | None]:
+    """(rollup watermark, max rolled-up session id, archive watermark) of a user."""
+    through, max_session_id, archived_through = db.execute(
+        select(User.rolled_up_through, User.rollup_max_session_id, ArchivedHistoryDB.through)
+        .outerjoin(ArchivedHistoryDB, ArchivedHistoryDB.user_id == User.id)
+        .where(User.id == user_id)
+    ).one()
+    return (
+        _as_date(through) if through is not None else None,
+        max_session_id,
+        _as_date(archived_through) if archived_through is not None else None,
+    )
+
+
+def _rolled_up_weeks(db: Session, user_id: int, session_id: int, days: Iterable[date]) -> set[date]:
+    """Starts of the rolled-up weeks a change to `session_id` on `days` must re-aggregate.
+
+    A session is rolled up once both its id and date are within the
+    watermarks. Raises ValueError when a week may hold archived sessions,
+    since its rollup can no longer be recomputed from raw rows.
+    """
+    through, max_session_id, archived_through = _rollup_bounds(db, user_id)
+    if through is None or session_id > max_session_id:
+        return set()
+    weeks = {day - timedelta(days=day.weekday()) for day in days if day <= through}
+    if archived_through is not None and any(week <= archived_through for week in weeks):
+        raise ValueError(f"Session {session_id} falls in an archived week and can no longer be changed")
+    return weeks
+
+
+def _refold_weeks(db: Session, user_id: int, weeks: set[date]) -> None:
+    """Recompute the rollups of `weeks` from their rolled-up raw sessions; caller commits."""
+    if not weeks:
+        return
+    through, max_session_id, _ = _rollup_bounds(db, user_id)
+    db.flush()
+    db.execute(
+        delete(WeeklyExerciseRollupDB).where(
+            WeeklyExerciseRollupDB.user_id == user_id, WeeklyExerciseRollupDB.week_start.in_(weeks)
+        )
+    )
+    db.execute(delete(WeeklyRollupDB).where(WeeklyRollupDB.user_id == user_id, WeeklyRollupDB.week_start.in_(weeks)))
+    stmt = _session_history_stmt(user_id).where(
+        or_(*(SessionDB.session_date.between(week, week + timedelta(days=6)) for week in weeks)),
+        SessionDB.session_date <= through,
+        SessionDB.id <= max_session_id,
+    )
+    history = (
+        (metrics, exercises) for _, metrics, exercises in _group_session_rows(db.execute(stmt.order_by(SessionDB.id)))
+    )
+    for week in rollup_sessions(history, baseline_for(db, user_id), get_strength_curves(db, user_id)).values():
+        _merge_weekly_rollup(db, user_id, week)
+
+
+def _archived_history(db: Session, user_id: int) -> ArchivedHistory | None:
+    row = db.get(ArchivedHistoryDB, user_id)
+    if row is None:
+        return None
+    state = row.state
+    history = ArchivedHistory(through=_as_date(row.through), sessions=row.sessions)
+    for name, stat in history.baseline.stats():
+        stat.count, stat.mean, stat.m2, stat.ewma = state["baseline"][name]
+    history.loads = {
+        muscle: LoadState(acute, chronic, date.fromisoformat(last), date.fromisoformat(first))
+        for muscle, (acute, chronic, last, first) in state["loads"].items()
+    }
+    history.curves = {
+        name: CurveStats(date.fromisoformat(as_of), *sums) for name, (as_of, *sums) in state["curves"].items()
+    }
+    history.records = {
+        name: {key: date.fromisoformat(value) if key.endswith("_date") else value for key, value in record.items()}
+        for name, record in state["records"].items()
+    }
+    return history
+
+
+def _store_archived_history(db: Session, user_id: int, history: ArchivedHistory) -> None:
+    state = {
+        "baseline": {name: [stat.count, stat.mean, stat.m2, stat.ewma] for name, stat in history.baseline.stats()},
+        "loads": {
+            muscle: [load.acute, load.chronic, load.last_date.isoformat(), load.first_date.isoformat()]
+            for muscle, load in history.loads.items()
+        },
+        "curves": {
+            name: [stats.as_of.isoformat(), stats.sw, stats.sr, stats.srr, stats.sy, stats.sry, stats.sets]
+            for name, stats in history.curves.items()
+        },
+        "records": {
+            name: {key: value.isoformat() if key.endswith("_date") else value for key, value in record.items()}
+            for name, record in history.records.items()
+        },
+    }
+    row = db.get(ArchivedHistoryDB, user_id)
+    if row is None:
+        db.add(ArchivedHistoryDB(user_id=user_id, through=history.through, sessions=history.sessions, state=state))
+    else:
+        row.through, row.sessions, row.state = history.through, history.sessions, state
+
+
+def _rebuild_rows(db: Session, user_id: int, archived: ArchivedHistory | None) -> Iterable[LogRow]:
+    """Log rows a full rebuild folds in on top of `archived`, oldest first.
+
+    With archived history only the database is read: the columnar files can
+    still hold archived sessions, which `archived` already counts.
+    """
+    if archived is None:
+        return _history_rows(db, user_id)
+    return db.execute(_log_rows_stmt(user_id).order_by(SessionDB.session_date, SessionDB.id)).tuples()
+
+
+def compact_exercise_logs(db: Session, user_id: int, cutoff: date, store: ColumnStore = column_store) -> int:
+    """Move exercise logs dated up to `cutoff` into the user's columnar files.
+
+    Returns the number of newly compacted rows. Sessions inserted afterwards,
+    including backdated ones, stay in the database tail until the next run.
+    """
+    manifest = store.manifest(user_id)
+    if manifest.cutoff is not None:
+        cutoff = max(cutoff, manifest.cutoff)
+    max_session_id = db.scalar(select(func.max(SessionDB.id)).where(SessionDB.user_id == user_id)) or 0
+    stmt = _log_rows_stmt(user_id).where(SessionDB.id <= max_session_id, SessionDB.session_date <= cutoff)
+    stmt = _exclude_compacted(stmt, manifest)
+    rows = db.execute(stmt.order_by(SessionDB.session_date, SessionDB.id)).tuples()
+    return store.append(user_id, rows, cutoff, max_session_id)
+
+
+def _log_rows_stmt(user_id: int) -> Select:
+    return (
+        select(
+            SessionDB.id,
+            SessionDB.session_date,
+            ExerciseLogDB.exercise,
+            ExerciseLogDB.sets,
+            ExerciseLogDB.reps,
+            ExerciseLogDB.load_kg,
+            ExerciseLogDB.rir,
+        )
+        .join(ExerciseLogDB, ExerciseLogDB.session_id == SessionDB.id)
+        .where(SessionDB.user_id == user_id)
+    )
+
+
+def _exclude_compacted(stmt: Select, manifest: Manifest) -> Select:
+    if manifest.cutoff is None:
+        return stmt
+    return stmt.where(or_(SessionDB.session_date > manifest.cutoff, SessionDB.id > manifest.max_session_id))
+
+
+def _history_rows(
+    db: Session, user_id: int, since: date | None = None, batch_size: int | None = None
+) -> Iterator[LogRow]:
+    """Yield exercise-log rows from compacted files, then the un-compacted database tail.
+
+    With `batch_size` the tail is read through a server-side cursor.
+    """
+    manifest = column_store.manifest(user_id)
+    yield from column_store.iter_rows(user_id, since, manifest)
+    stmt = _exclude_compacted(_log_rows_stmt(user_id), manifest)
+    if since is not None:
+        stmt = stmt.where(SessionDB.session_date >= since)
+    stmt = stmt.order_by(SessionDB.session_date, SessionDB.id)
+    if batch_size is not None:
+        stmt = stmt.execution_options(stream_results=True, yield_per=batch_size)
+    yield from db.execute(stmt).tuples()
+
+
+def _tail_weekly_tonnage(db: Session, user_id: int, since: date, manifest: Manifest) -> Iterator[tuple[date, str, float]]:
+    """(week_start, exercise, tonnage) of un-compacted sessions, summed by the database (or DuckDB)."""
+    analytics = duckdb_for(db.get_bind())
+    if analytics is not None:
+        rows = analytics.weekly_tonnage(user_id, since, manifest.cutoff, manifest.max_session_id)
+    else:
+        week = _period_start(db, SessionDB.session_date, "week").label("week_start")
+        stmt = (
+            select(week, ExerciseLogDB.exercise, func.sum(ExerciseLogDB.load_kg * ExerciseLogDB.reps * ExerciseLogDB.sets))
+            .join(ExerciseLogDB, ExerciseLogDB.session_id == SessionDB.id)
+            .where(SessionDB.user_id == user_id, SessionDB.session_date >= since)
+            .group_by(week, ExerciseLogDB.exercise)
+        )
+        rows = db.execute(_exclude_compacted(stmt, manifest)).tuples()
+    for week_start, exercise, tonnage in rows:
+        yield _as_date(week_start), exercise, float(tonnage)
+
+
+def _tail_exercise_rows(
+    db: Session, user_id: int, normalized: str, since: date | None, manifest: Manifest
+) -> Iterable[LogRow]:
+    """Un-compacted log rows of one exercise (matched case-insensitively), without reading other lifts."""
+    analytics = duckdb_for(db.get_bind())
+    if analytics is not None:
+        return analytics.exercise_sets(user_id, normalized, since, manifest.cutoff, manifest.max_session_id)
+    names = select(ExerciseLogDB.exercise).join(SessionDB, ExerciseLogDB.session_id == SessionDB.id)
+    names = names.where(SessionDB.user_id == user_id).distinct()
+    if since is not None:
+        names = names.where(SessionDB.session_date >= since)
+    # Python's lower() rather than SQL's, which on SQLite only folds ASCII.
+    spellings = [name for name in db.scalars(names) if name.lower() == normalized]
+    if not spellings:
+        return []
+    stmt = _exclude_compacted(_log_rows_stmt(user_id), manifest).where(ExerciseLogDB.exercise.in_(spellings))
+    if since is not None:
+        stmt = stmt.where(SessionDB.session_date >= since)
+    return db.execute(stmt.order_by(SessionDB.session_date, SessionDB.id)).tuples()
+
+
+EXPORT_COLUMNS: dict[str, tuple[tuple[str, str], ...]] = {
+    "sessions": (
+        ("session_id", "int"),
+        ("date", "date"),
+        ("created_at", "datetime"),
+        ("idempotency_key", "str"),
+        ("sleep_hours", "float"),
+        ("resting_hr", "int"),
+        ("hrv_rmssd", "float"),
+        ("soreness", "float"),
+        ("motivation", "float"),
+        ("rpe_session", "float"),
+        ("duration_min", "int"),
+    ),
+    "exercise_logs": (
+        ("session_id", "int"),
+        ("date", "date"),
+        ("exercise", "str"),
+        ("sets", "int"),
+        ("reps", "int"),
+        ("load_kg", "float"),
+        ("rir", "float"),
+    ),
+    "prescriptions": (
+        ("prescription_id", "int"),
+        ("target_date", "date"),
+        ("created_at", "datetime"),
+        ("exercise", "str"),
+        ("sets", "int"),
+        ("reps", "int"),
+        ("load_kg", "float"),
+        ("deload", "bool"),
+        ("readiness", "float"),
+        ("fatigue", "float"),
+        ("trend", "float"),
+        ("mrv_sets", "float"),
+        ("adaptation_score", "float"),
+        ("acwr", "float"),
+        ("rationale_extra", "json"),
+        ("data_version", "int"),
+    ),
+}
+"""Column (name, kind) layout of each exportable table, matching `iter_export_rows`."""
+
+
+def iter_export_rows(db: Session, user_id: int, table: str, batch_size: int = 1000) -> Iterator[Sequence]:
+    """Stream every row of one export table oldest first through a server-side cursor."""
+    if table == "exercise_logs":
+        yield from _history_rows(db, user_id, batch_size=batch_size)
+    elif table == "sessions":
+        stmt = (
+            select(
+                SessionDB.id,
+                SessionDB.session_date,
+                SessionDB.created_at,
+                SessionDB.idempotency_key,
+                *(getattr(Metric, name) for name in METRIC_FIELDS),
+            )
+            .outerjoin(Metric, Metric.session_id == SessionDB.id)
+            .where(SessionDB.user_id == user_id)
+            .order_by(SessionDB.session_date, SessionDB.id)
+        )
+        yield from _stream_rows(db, stmt, batch_size)
+    elif table == "prescriptions":
+        stmt = (
+            select(
+                Prescription.id,
+                Prescription.target_date,
+                Prescription.created_at,
+                Prescription.exercise,
+                Prescription.sets,
+                Prescription.reps,
+                Prescription.load_kg,
+                Prescription.deload,
+                *(getattr(Prescription, name) for name in TYPED_FIELDS),
+                Prescription.rationale_extra,
+                Prescription.data_version,
+            )
+            .where(Prescription.user_id == user_id)
+            .order_by(Prescription.id)
+        )
+        for *leading, extra, data_version in _stream_rows(db, stmt, batch_size):
+            yield (*leading, decode_extra(extra), data_version)
+    else:
+        raise ValueError(f"Unknown export table: {table}")
+
+
+def _stream_rows(db: Session, stmt: Select, batch_size: int) -> Iterator[Sequence]:
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        yield from result.tuples()
+    finally:
+        result.close()
+
+
+def get_personal_records(db: Session, user_id: int, exercise: str | None = None) -> list[PersonalRecord]:
+    """Read maintained PRs; a single exercise is a primary-key lookup."""
+    if exercise is not None:
+        row = db.get(PersonalRecordDB, (user_id, exercise.lower()))
+        rows = [row] if row is not None else []
+    else:
+        rows = db.scalars(
+            select(PersonalRecordDB).where(PersonalRecordDB.user_id == user_id).order_by(PersonalRecordDB.exercise)
+        ).all()
+    return [
+        PersonalRecord(
+            exercise=row.display_name,
+            best_e1rm=row.best_e1rm,
+            best_e1rm_date=row.best_e1rm_date,
+            heaviest_load_kg=row.heaviest_load_kg,
+            heaviest_load_reps=row.heaviest_load_reps,
+            heaviest_load_date=row.heaviest_load_date,
+            most_reps=row.most_reps,
+            most_reps_load_kg=row.most_reps_load_kg,
+            most_reps_date=row.most_reps_date,
+        )
+        for row in rows
+    ]
+
+
+def rebuild_personal_records(db: Session, user_id: int) -> int:
+    """Recompute a user's PRs from full history (archived and raw) in one streaming pass."""
+    archived = _archived_history(db, user_id)
+    best = _best_records(user_id, _rebuild_rows(db, user_id, archived), archived.records if archived else None)
+    db.execute(delete(PersonalRecordDB).where(PersonalRecordDB.user_id == user_id))
+    if best:
+        db.execute(PersonalRecordDB.__table__.insert(), list(best.values()))
+    # /records is served with the user's data-version ETag.
+    _bump_data_version(db, user_id)
+    db.commit()
+    return len(best)
+
+
+def _recompute_personal_records(db: Session, user_id: int, exercises: set[str]) -> None:
+    """Recompute the PRs of lower-cased `exercises` from history; caller commits."""
+    archived = _archived_history(db, user_id)
+    seed = {name: record for name, record in archived.records.items() if name in exercises} if archived else None
+    rows = (row for row in _rebuild_rows(db, user_id, archived) if row[2].lower() in exercises)
+    best = _best_records(user_id, rows, seed)
+    db.execute(
+        delete(PersonalRecordDB).where(PersonalRecordDB.user_id == user_id, PersonalRecordDB.exercise.in_(exercises))
+    )
+    if best:
+        db.execute(PersonalRecordDB.__table__.insert(), list(best.values()))
+
+
+def _best_records(user_id: int, rows: Iterable[LogRow], best: dict[str, dict] | None = None) -> dict[str, dict]:
+    """Record columns per lower-cased exercise over oldest-first log rows; ties keep the earlier date.
+
+    Rows are folded into `best` in place when given.
+    """
+    best = {} if best is None else best
+    for _, session_date, exercise, _, reps, load_kg, rir in rows:
+        candidate = _record_values(user_id, session_date, exercise, reps, load_kg, rir)
+        current = best.get(candidate["exercise"])
+        if current is None:
+            best[candidate["exercise"]] = candidate
+            continue
+        for value_key, fields in _RECORD_GROUPS.items():
+            if candidate[value_key] > current[value_key]:
+                current.update({name: candidate[name] for name in fields})
+    return best
+
+
+# Record value -> columns that move together when that value improves.
+_RECORD_GROUPS = {
+    "best_e1rm": ("best_e1rm", "best_e1rm_date"),
+    "heaviest_load_kg": ("heaviest_load_kg", "heaviest_load_reps", "heaviest_load_date"),
+    "most_reps": ("most_reps", "most_reps_load_kg", "most_reps_date"),
+}
+
+
+def _record_values(user_id: int, session_date: date, exercise: str, reps: int, load_kg: float, rir: float) -> dict:
+    return {
+        "user_id": user_id,
+        "exercise": exercise.lower(),
+        "display_name": exercise,
+        "best_e1rm": epley_e1rm(load_kg, reps, rir),
+        "best_e1rm_date": session_date,
+        "heaviest_load_kg": load_kg,
+        "heaviest_load_reps": reps,
+        "heaviest_load_date": session_date,
+        "most_reps": reps,
+        "most_reps_load_kg": load_kg,
+        "most_reps_date": session_date,
+    }
+
+
+def _merge_personal_records(db: Session, user_id: int, logs: Sequence[tuple[date, str, int, float, float]]) -> None:
+    """Fold new (date, exercise, reps, load_kg, rir) logs into PRs with one upsert; ties keep the earlier date."""
+    if not logs:
+        return
+    db.execute(_record_upsert(_dialect_insert(db), user_id, logs))
+
+
+def _record_upsert(insert, user_id: int, logs: Sequence[tuple[date, str, int, float, float]]):
+    stmt = insert(PersonalRecordDB).values([_record_values(user_id, *log) for log in logs])
+    set_ = {}
+    for value_key, fields in _RECORD_GROUPS.items():
+        improved = stmt.excluded[value_key] > getattr(PersonalRecordDB, value_key)
+        for name in fields:
+            set_[name] = case((improved, stmt.excluded[name]), else_=getattr(PersonalRecordDB, name))
+    return stmt.on_conflict_do_update(index_elements=[PersonalRecordDB.user_id, PersonalRecordDB.exercise], set_=set_)
+
+
+def _dialect_insert(db: Session):
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def get_strength_curves(db: Session, user_id: int, exercises: Sequence[str] | None = None) -> dict[str, StrengthCurve]:
+    """Cached strength curves keyed by lower-cased exercise, optionally only `exercises`."""
+    stmt = select(StrengthCurveDB).where(StrengthCurveDB.user_id == user_id)
+    if exercises is not None:
+        stmt = stmt.where(StrengthCurveDB.exercise.in_(list(exercises)))
+    return {
+        row.exercise: StrengthCurve(intercept=row.intercept, slope=row.slope, sets=row.sets) for row in db.scalars(stmt)
+    }
+
+
+def rebuild_strength_curves(db: Session, user_id: int) -> int:
+    """Refit every exercise's strength curve from full history (archived and raw) in one streaming pass."""
+    archived = _archived_history(db, user_id)
+    rows = (
+        (session_date, exercise, sets, reps, load_kg, rir)
+        for _, session_date, exercise, sets, reps, load_kg, rir in _rebuild_rows(db, user_id, archived)
+    )
+    stats = accumulate_curve_stats(rows, archived.curves if archived else None)
+    curves = fit_curves(stats)
+    db.execute(delete(StrengthCurveDB).where(StrengthCurveDB.user_id == user_id))
+    if curves:
+        db.execute(
+            StrengthCurveDB.__table__.insert(),
+            [_strength_curve_values(user_id, name, stats[name], curve) for name, curve in curves.items()],
+        )
+    # Prescriptions and e1RM reads use the curves, so their cached versions go stale too.
+    _bump_data_version(db, user_id)
+    db.commit()
+    return len(curves)
+
+
+def _fold_strength_curves(
+    db: Session,
+    user_id: int,
+    logs: Sequence[tuple[date, str, int, int, float, float]],
+    retracted: Sequence[tuple[date, str, int, int, float, float]] = (),
+) -> None:
+    """Add new (date, exercise, sets, reps, load_kg, rir) logs to the cached statistics and refit those exercises.
+
+    `retracted` logs (a corrected retry's previous ones) are taken out first:
+    the statistics are sums, so folding a log in with negated sets removes it.
+    """
+    names = {log[1].lower() for log in chain(logs, retracted)}
+    rows = {
+        row.exercise: row
+        for row in db.scalars(
+            select(StrengthCurveDB).where(StrengthCurveDB.user_id == user_id, StrengthCurveDB.exercise.in_(names))
+        )
+    }
+    stats = {
+        name: CurveStats(
+            as_of=_as_date(row.as_of), sw=row.sw, sr=row.sr, srr=row.srr, sy=row.sy, sry=row.sry, sets=row.sets
+        )
+        for name, row in rows.items()
+    }
+    # Only logs already folded into a cached row can be taken out of it.
+    accumulate_curve_stats((log[:2] + (-log[2],) + log[3:] for log in retracted if log[1].lower() in stats), stats)
+    accumulate_curve_stats(logs, stats)
+    curves = fit_curves(stats)
+    for name, curve_stats in stats.items():
+        row = rows.get(name)
+        if curve_stats.sets <= 0 or name not in curves:
+            if row is not None:
+                db.delete(row)
+            continue
+        values = _strength_curve_values(user_id, name, curve_stats, curves[name])
+        if row is None:
+            db.add(StrengthCurveDB(**values))
+        else:
+            for key, value in values.items():
+                setattr(row, key, value)
+
+
+def _strength_curve_values(user_id: int, exercise: str, stats: CurveStats, curve: StrengthCurve) -> dict:
+    return {
+        "user_id": user_id,
+        "exercise": exercise,
+        "as_of": stats.as_of,
+        "sw": stats.sw,
+        "sr": stats.sr,
+        "srr": stats.srr,
+        "sy": stats.sy,
+        "sry": stats.sry,
+        "sets": stats.sets,
+        "intercept": curve.intercept,
+        "slope": curve.slope,
+    }
+
+
+def get_baseline(db: Session, user_id: int) -> PhysiologicalBaseline:
+    """Load the user's running biomarker statistics (empty if none yet)."""
+    return _baseline_from_row(db.get(PhysiologicalBaselineDB, user_id))
+
+
+def baseline_for(db: Session, user_id: int) -> PhysiologicalBaseline | None:
+    """The baseline readiness is scored against, or None in population mode."""
+    return get_baseline(db, user_id) if READINESS_MODE == "personal" else None
+
+
+def rebuild_baseline(db: Session, user_id: int) -> PhysiologicalBaseline:
+    """Recompute baseline statistics from the user's full metric history, archived sessions first."""
+    stmt = (
+        select(SessionDB.session_date, *(getattr(Metric, name) for name in METRIC_FIELDS))
+        .join(Metric, Metric.session_id == SessionDB.id)
+        .where(SessionDB.user_id == user_id)
+        .order_by(SessionDB.session_date, SessionDB.id)
+        .execution_options(yield_per=500)
+    )
+    archived = _archived_history(db, user_id)
+    baseline = archived.baseline if archived else PhysiologicalBaseline()
+    for row in db.execute(stmt):
+        baseline.push(_metrics_from_row(row))
+    _store_baseline(db, user_id, baseline, db.get(PhysiologicalBaselineDB, user_id))
+    # Readiness in prescriptions and analytics is scored against the baseline.
+    _bump_data_version(db, user_id)
+    db.commit()
+    return baseline
+
+
+def _update_baseline(db: Session, user_id: int, mutate: Callable[[PhysiologicalBaseline], None]) -> None:
+    """Apply an O(1) change to the baseline row; caller holds the user row lock and commits.
+
+    Take that lock with `_bump_data_version` first: locking the baseline row
+    itself cannot stop two writers from both inserting a missing one.
+    """
+    row = db.get(PhysiologicalBaselineDB, user_id)
+    baseline = _baseline_from_row(row)
+    mutate(baseline)
+    _store_baseline(db, user_id, baseline, row)
+
+
+def _baseline_from_row(row: PhysiologicalBaselineDB | None) -> PhysiologicalBaseline:
+    baseline = PhysiologicalBaseline()
+    if row is None:
+        return baseline
+    for name, stat in baseline.stats():
+        stat.count = getattr(row, f"{name}_count")
+        stat.mean = getattr(row, f"{name}_mean")
+        stat.m2 = getattr(row, f"{name}_m2")
+        stat.ewma = getattr(row, f"{name}_ewma")
+    return baseline
+
+
+def _store_baseline(
+    db: Session, user_id: int, baseline: PhysiologicalBaseline, row: PhysiologicalBaselineDB | None
+) -> None:
+    if row is None:
+        row = PhysiologicalBaselineDB(user_id=user_id)
+        db.add(row)
+    for name, stat in baseline.stats():
+        setattr(row, f"{name}_count", stat.count)
+        setattr(row, f"{name}_mean", stat.mean)
+        setattr(row, f"{name}_m2", stat.m2)
+        setattr(row, f"{name}_ewma", stat.ewma)
+
+
+def get_load_states(db: Session, user_id: int) -> dict[str, LoadState]:
+    rows = db.scalars(select(TrainingLoadDB).where(TrainingLoadDB.user_id == user_id)).all()
+    return {row.muscle: LoadState(row.acute, row.chronic, row.last_date, row.first_date) for row in rows}
+
+
+def get_acwr(db: Session, user_id: int, as_of: date | None = None) -> float | None:
+    """Whole-body acute:chronic ratio, projected to `as_of` when given."""
+    row = db.get(TrainingLoadDB, (user_id, TOTAL_GROUP))
+    if row is None:
+        return None
+    state = LoadState(row.acute, row.chronic, row.last_date, row.first_date)
+    return (state.decayed(as_of) if as_of else state).acwr
+
+
+def get_workload(db: Session, user_id: int, as_of: date) -> list[MuscleWorkload]:
+    result = []
+    for muscle, state in sorted(get_load_states(db, user_id).items()):
+        current = state.decayed(as_of)
+        result.append(
+            MuscleWorkload(
+                muscle=muscle,
+                acute=round(current.acute, 4),
+                chronic=round(current.chronic, 4),
+                acwr=current.acwr,
+                flag=acwr_flag(current.acwr),
+            )
+        )
+    return result
+
+
+def backfill_training_loads(db: Session, user_id: int) -> dict[str, LoadState]:
+    """Rebuild a user's rolling loads from full history using the closed-form EWMA.
+
+    Loads of archived sessions are added from their saved states.
+    """
+    states = backfill_load_states(
+        (metrics.date, session_muscle_loads(exercises, metrics.rpe_session))
+        for metrics, exercises in iter_session_history(db, user_id, batch_size=500)
+    )
+    archived = _archived_history(db, user_id)
+    for muscle, state in (archived.loads if archived else {}).items():
+        states[muscle] = state.merged(states[muscle]) if muscle in states else state
+    db.execute(delete(TrainingLoadDB).where(TrainingLoadDB.user_id == user_id))
+    if states:
+        db.execute(
+            TrainingLoadDB.__table__.insert(),
+            [
+                {
+                    "user_id": user_id,
+                    "muscle": muscle,
+                    "acute": state.acute,
+                    "chronic": state.chronic,
+                    "last_date": state.last_date,
+                    "first_date": state.first_date,
+                }
+                for muscle, state in states.items()
+            ],
+        )
+    # Prescriptions read the ACWR from these states.
+    _bump_data_version(db, user_id)
+    db.commit()
+    return states
+
+
+def _apply_training_loads(db: Session, user_id: int, sessions: Sequence[tuple[date, dict[str, float]]]) -> None:
+    """Fold (date, per-muscle loads) entries into the rolling states; caller holds the user row lock and commits.
+
+    The states are linear in the loads, so an edited session is applied as
+    its old loads negated followed by its new ones.
+    """
+    muscles = {muscle for _, loads in sessions for muscle in loads}
+    rows = {
+        row.muscle: row
+        for row in db.scalars(
+            select(TrainingLoadDB).where(TrainingLoadDB.user_id == user_id, TrainingLoadDB.muscle.in_(muscles))
+        )
+    }
+    for session_date, loads in sessions:
+        for muscle, load in loads.items():
+            row = rows.get(muscle)
+            state = LoadState(row.acute, row.chronic, row.last_date, row.first_date) if row else LoadState()
+            state.add(session_date, load)
+            if row is None:
+                row = rows[muscle] = TrainingLoadDB(user_id=user_id, muscle=muscle)
+                db.add(row)
+            row.acute, row.chronic = state.acute, state.chronic
+            row.last_date, row.first_date = state.last_date, state.first_date
+
+
+def _negated(loads: dict[str, float]) -> dict[str, float]:
+    return {muscle: -load for muscle, load in loads.items()}
+
+
+def save_prescription(
+    db: Session,
+    user_id: int,
+    prescription: TrainingPrescription,
+    data_version: int | None = None,
+    computed_on: date | None = None,
+) -> int:
+    """Store a prescription computed from `data_version` for `computed_on` and return its id.
+
+    If another worker already stored one for the same user, version and day,
+    that row is kept and its id returned.
+    """
+    stmt = _prescription_insert(_dialect_insert(db), user_id, prescription, data_version, computed_on)
+    with derived_write(db):
+        prescription_id = db.scalar(stmt)
+        if prescription_id is None:
+            prescription_id = db.scalar(
+                select(Prescription.id).where(
+                    Prescription.user_id == user_id,
+                    Prescription.data_version == data_version,
+                    Prescription.computed_on == computed_on,
+                )
+            )
+        db.commit()
+    return prescription_id
+
+
+def _prescription_insert(
+    insert, user_id: int, prescription: TrainingPrescription, data_version: int | None, computed_on: date | None
+):
+    typed, extra = split_rationale(prescription.rationale)
+    values = {
+        "user_id": user_id,
+        "target_date": prescription.target_date,
+        "exercise": prescription.exercise,
+        "sets": prescription.sets,
+        "reps": prescription.reps,
+        "load_kg": prescription.load_kg,
+        "deload": prescription.deload,
+        "rationale": {},
+        "rationale_extra": extra,
+        "data_version": data_version,
+        "computed_on": computed_on,
+        **typed,
+    }
+    stmt = insert(Prescription).values(values)
+    return stmt.on_conflict_do_nothing(
+        index_elements=[Prescription.user_id, Prescription.data_version, Prescription.computed_on]
+    ).returning(Prescription.id)
+
+
+def get_data_version(db: Session, user_id: int) -> tuple[int, datetime | None] | None:
+    """Current (data_version, data_changed_at) for a user, or None if unknown."""
+    row = db.execute(select(User.data_version, User.data_changed_at).where(User.id == user_id)).first()
+    return tuple(row) if row is not None else None
+
+
+def get_cached_prescription(db: Session, user_id: int, data_version: int, day: date) -> TrainingPrescription | None:
+    """The prescription computed from exactly this data version for `day`, if any."""
+    row = db.scalars(
+        select(Prescription).where(
+            Prescription.user_id == user_id, Prescription.data_version == data_version, Prescription.computed_on == day
+        )
+    ).first()
+    if row is None:
+        return None
+    return TrainingPrescription(
+        target_date=row.target_date,
+        exercise=row.exercise,
+        sets=row.sets,
+        reps=row.reps,
+        load_kg=row.load_kg,
+        deload=row.deload,
+        rationale=_row_rationale(row),
+    )
+
+
+def get_prescription_history(
+    db: Session, user_id: int, since: date | None = None, until: date | None = None, bucket: str = "week"
+) -> list[PrescriptionHistoryPoint]:
+    """Deload frequency and rationale averages per week or month, aggregated in SQL."""
+    period = _period_start(db, Prescription.target_date, bucket).label("period")
+    stmt = (
+        select(
+            period,
+            func.count(),
+            func.sum(case((Prescription.deload, 1), else_=0)),
+            func.count(func.distinct(case((Prescription.deload, Prescription.target_date)))),
+            func.avg(Prescription.readiness),
+            func.min(Prescription.readiness),
+            func.avg(Prescription.fatigue),
+            func.avg(Prescription.acwr),
+        )
+        .where(Prescription.user_id == user_id)
+        .group_by(period)
+        .order_by(period)
+    )
+    if since is not None:
+        stmt = stmt.where(Prescription.target_date >= since)
+    if until is not None:
+        stmt = stmt.where(Prescription.target_date <= until)
+    return [
+        PrescriptionHistoryPoint(
+            period_start=_as_date(start),
+            prescriptions=count,
+            deloads=deloads or 0,
+            deload_days=deload_days or 0,
+            deload_rate=round((deloads or 0) / count, 4),
+            avg_readiness=_round_or_none(avg_readiness),
+            min_readiness=_round_or_none(min_readiness),
+            avg_fatigue=_round_or_none(avg_fatigue),
+            avg_acwr=_round_or_none(avg_acwr),
+        )
+        for start, count, deloads, deload_days, avg_readiness, min_readiness, avg_fatigue, avg_acwr in db.execute(stmt)
+    ]
+
+
+def _period_start(db: Session, column, bucket: str):
+    if bucket not in ("week", "month"):
+        raise ValueError(f"Unknown bucket: {bucket}")
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(bucket, column)
+    if bucket == "week":
+        return func.date(column, "-6 days", "weekday 1")
+    return func.date(column, "start of month")
+
+
+def _as_date(value: date | datetime | str) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _round_or_none(value: float | None) -> float | None:
+    return round(float(value), 4) if value is not None else None
+
+
+def _row_rationale(row: Prescription) -> dict:
+    # Rows written before the typed columns existed keep their JSON until backfilled.
+    if row.readiness is None and row.rationale:
+        return row.rationale
+    typed = {name: getattr(row, name) for name in TYPED_FIELDS}
+    return join_rationale(typed, row.deload, row.rationale_extra)
+
+
+def get_sync_delta(db: Session, user_id: int, since: int | None, initial_sessions: int = 60) -> SyncResponse:
+    """Profile and sessions changed after watermark `since`, plus deleted session ids.
+
+    Watermarks are the user's `data_version`. Rows are bounded by the version
+    read first, so a write committing mid-request is picked up by the next
+    sync rather than skipped. Without a usable `since` the response is a
+    snapshot of the `initial_sessions` most recent sessions.
+    """
+    version = get_data_version(db, user_id)
+    if version is None:
+        raise ValueError(f"User {user_id} not found")
+    watermark = version[0]
+    full = since is None or since > watermark
+    response = SyncResponse(watermark=watermark, full=full)
+    if not full and since == watermark:
+        return response
+
+    stmt = (
+        select(SessionDB)
+        .where(SessionDB.user_id == user_id)
+        .options(joinedload(SessionDB.metrics), joinedload(SessionDB.exercise_logs))
+    )
+    if full:
+        stmt = stmt.order_by(SessionDB.session_date.desc(), SessionDB.id.desc()).limit(initial_sessions)
+    else:
+        stmt = stmt.where(SessionDB.version > since, SessionDB.version <= watermark).order_by(
+            SessionDB.session_date, SessionDB.id
+        )
+    rows = db.scalars(stmt).unique().all()
+    if full:
+        rows = rows[::-1]
+    response.sessions = [
+        SyncSession(
+            session_id=row.id,
+            version=row.version,
+            metrics=SessionMetrics(date=row.session_date, **{name: getattr(row.metrics, name) for name in METRIC_FIELDS})
+            if row.metrics is not None
+            else None,
+            exercises=[ExerciseLog(**{name: getattr(ex, name) for name in LOG_FIELDS}) for ex in row.exercise_logs],
+        )
+        for row in rows
+    ]
+
+    user = db.get(User, user_id)
+    if full or user.version > since:
+        response.profile = get_user_profile(db, user_id)
+    if not full:
+        response.deleted_sessions = list(
+            db.scalars(
+                select(SyncTombstoneDB.entity_id).where(
+                    SyncTombstoneDB.user_id == user_id,
+                    SyncTombstoneDB.entity == "session",
+                    SyncTombstoneDB.version > since,
+                    SyncTombstoneDB.version <= watermark,
+                )
+            )
+        )
+    return response
+
+
+def get_stale_prescription_users(db: Session, day: date) -> list[tuple[int, int, datetime | None]]:
+    """(user_id, data_version, data_changed_at) for users without a prescription at their current version for `day`.
+
+    Users skipped at their current version (see `mark_prescription_skipped`) are left out.
+    """
+    fresh = select(Prescription.id).where(
+        Prescription.user_id == User.id, Prescription.data_version == User.data_version, Prescription.computed_on == day
+    )
+    skipped = User.prescription_skipped_version.is_not(None) & (User.prescription_skipped_version == User.data_version)
+    stmt = select(User.id, User.data_version, User.data_changed_at).where(~fresh.exists(), ~skipped).order_by(User.id)
+    return [tuple(row) for row in db.execute(stmt)]
+
+
+def mark_prescription_skipped(db: Session, user_id: int, data_version: int) -> None:
+    """Record that `data_version` had too little history for a prescription; the next write clears it."""
+    with derived_write(db):
+        db.execute(update(User).where(User.id == user_id).values(prescription_skipped_version=data_version))
+        db.commit()
+
+
+def _bump_data_version(db: Session, user_id: int) -> int:
+    """Advance the user's data version; the row lock orders concurrent writers until commit."""
+    return db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1, data_changed_at=datetime.utcnow())
+        .returning(User.data_version)
+    ).scalar_one()
+
+
+def _stamp_session(db: Session, session_id: int, version: int) -> None:
+    now = datetime.utcnow()
+    db.execute(update(SessionDB).where(SessionDB.id == session_id).values(version=version, updated_at=now))
+    db.execute(update(Metric).where(Metric.session_id == session_id).values(version=version, updated_at=now))
@@ -0,0 +1,183 @@
+"""In-process pub/sub for pushing per-user dashboard deltas to SSE streams."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+EVENT_BROKER_URL = os.getenv("EVENT_BROKER_URL", "")
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+
+
+class Broker(Protocol):
+    """Transport used to fan out user events, possibly across processes."""
+
+    remote: bool
+
+    def publish(self, user_id: int, payload: dict[str, Any]) -> None: ...
+
+    def watch(self, user_id: int) -> None:
+        """This process gained its first subscriber for `user_id`."""
+
+    def unwatch(self, user_id: int) -> None:
+        """This process lost its last subscriber for `user_id`."""
+
+    def has_subscribers(self, user_id: int) -> bool:
+        """Whether any process is subscribed to `user_id`."""
+
+
+class LocalBroker:
+    """Default broker delivering straight to subscribers of this process."""
+
+    remote = False
+
+    def __init__(self, bus: EventBus) -> None:
+        self._bus = bus
+
+    def publish(self, user_id: int, payload: dict[str, Any]) -> None:
+        self._bus.deliver(user_id, payload)
+
+    def watch(self, user_id: int) -> None:
+        pass
+
+    def unwatch(self, user_id: int) -> None:
+        pass
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return False
+
+
+class RedisBroker:
+    """Broker backed by a local Redis pub/sub, for multi-worker deployments.
+
+    Each worker subscribes only to the channels of users it streams to, so
+    `PUBSUB NUMSUB` tells writers whether anyone is listening at all.
+    """
+
+    remote = True
+    channel_prefix = "gymyo:user:"
+
+    def __init__(self, bus: EventBus, url: str) -> None:
+        import redis
+
+        self._bus = bus
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._thread = self._pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+
+    def publish(self, user_id: int, payload: dict[str, Any]) -> None:
+        self._client.publish(self._channel(user_id), json.dumps(payload))
+
+    def watch(self, user_id: int) -> None:
+        self._pubsub.subscribe(**{self._channel(user_id): self._on_message})
+
+    def unwatch(self, user_id: int) -> None:
+        self._pubsub.unsubscribe(self._channel(user_id))
+
+    def has_subscribers(self, user_id: int) -> bool:
+        [(_, count)] = self._client.pubsub_numsub(self._channel(user_id))
+        return count > 0
+
+    def _channel(self, user_id: int) -> str:
+        return f"{self.channel_prefix}{user_id}"
+
+    def _on_message(self, message: dict[str, Any]) -> None:
+        channel = message["channel"].decode() if isinstance(message["channel"], bytes) else message["channel"]
+        user_id = int(channel.removeprefix(self.channel_prefix))
+        self._bus.deliver(user_id, json.loads(message["data"]))
+
+
+class EventBus:
+    """Tracks SSE subscribers and publishes only the fields that changed."""
+
+    def __init__(self, broker_url: str = "") -> None:
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, set[_Subscriber]] = defaultdict(set)
+        self._snapshots: dict[int, dict[str, Any]] = {}
+        self._versions: dict[int, int] = defaultdict(int)
+        self.broker: Broker = RedisBroker(self, broker_url) if broker_url else LocalBroker(self)
+
+    def wants_updates(self, user_id: int) -> bool:
+        """Whether publishing for this user can reach any subscriber."""
+        if self._subscribers.get(user_id):
+            return True
+        return self.broker.remote and self.broker.has_subscribers(user_id)
+
+    def publish(self, user_id: int, snapshot: dict[str, Any]) -> dict[str, Any] | None:
+        """Publish the keys of `snapshot` that differ from what subscribers last received.
+
+        Only a worker streaming to the user sees every delta, so elsewhere
+        the whole snapshot is sent rather than diffed against a stale copy.
+        """
+        with self._lock:
+            if user_id not in self._subscribers:
+                delta = dict(snapshot)
+            else:
+                previous = self._snapshots.get(user_id, {})
+                delta = {key: value for key, value in snapshot.items() if previous.get(key, ...) != value}
+                if not delta:
+                    return None
+                self._snapshots[user_id] = {**previous, **delta}
+        self.broker.publish(user_id, delta)
+        return delta
+
+    def deliver(self, user_id: int, delta: dict[str, Any]) -> None:
+        """Hand a delta to every local subscriber of `user_id`."""
+        with self._lock:
+            if user_id not in self._subscribers:
+                return
+            self._snapshots[user_id] = {**self._snapshots.get(user_id, {}), **delta}
+            self._versions[user_id] += 1
+            event = {"version": self._versions[user_id], "delta": delta}
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(_offer, subscriber.queue, event)
+
+    @asynccontextmanager
+    async def subscription(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Register a queue receiving `{"version", "delta"}` events for a user."""
+        subscriber = _Subscriber(asyncio.get_running_loop(), asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            first = not self._subscribers[user_id]
+            self._subscribers[user_id].add(subscriber)
+        if first:
+            self.broker.watch(user_id)
+        try:
+            yield subscriber.queue
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(subscriber)
+                last = not self._subscribers[user_id]
+                if last:
+                    del self._subscribers[user_id]
+                    self._snapshots.pop(user_id, None)
+                    self._versions.pop(user_id, None)
+            if last:
+                self.broker.unwatch(user_id)
+
+
+def _offer(queue: asyncio.Queue, event: dict[str, Any]) -> None:
+    # Slow consumers get their pending deltas folded into one event rather than block writers.
+    if queue.full():
+        merged: dict[str, Any] = {}
+        while not queue.empty():
+            merged.update(queue.get_nowait()["delta"])
+        merged.update(event["delta"])
+        event = {"version": event["version"], "delta": merged}
+    queue.put_nowait(event)
+
+
+bus = EventBus(EVENT_BROKER_URL)
@@ -0,0 +1,167 @@
+"""Chunked encoders for streaming data exports (CSV, NDJSON, Parquet).
+
+Encoders consume a lazy row iterator and yield byte chunks of roughly
+`chunk_bytes`, so memory stays bounded by one chunk (or one Parquet row
+group) however long the history is.
+"""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import io
+import json
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date, datetime
+from itertools import islice
+from typing import Any
+
+Column = tuple[str, str]
+"""(name, kind) where kind is one of int, float, str, bool, date, datetime, json."""
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+CHUNK_BYTES = 64 * 1024
+PARQUET_ROW_GROUP = 10_000
+
+
+def encode_rows(
+    fmt: str, columns: Sequence[Column], rows: Iterable[Sequence[Any]], chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[bytes]:
+    if fmt == "csv":
+        return encode_csv(columns, rows, chunk_bytes)
+    if fmt == "ndjson":
+        return encode_ndjson(columns, rows, chunk_bytes)
+    if fmt == "parquet":
+        return encode_parquet(columns, rows)
+    raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def encode_csv(columns: Sequence[Column], rows: Iterable[Sequence[Any]], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(name for name, _ in columns)
+    kinds = [kind for _, kind in columns]
+    for row in rows:
+        writer.writerow(_text_value(value, kind) for value, kind in zip(row, kinds))
+        if buffer.tell() >= chunk_bytes:
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+def encode_ndjson(
+    columns: Sequence[Column], rows: Iterable[Sequence[Any]], chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    for row in rows:
+        record = {name: _json_value(value) for (name, _), value in zip(columns, row)}
+        buffer.write(json.dumps(record, separators=(",", ":")))
+        buffer.write("\n")
+        if buffer.tell() >= chunk_bytes:
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+def encode_parquet(
+    columns: Sequence[Column], rows: Iterable[Sequence[Any]], row_group: int = PARQUET_ROW_GROUP
+) -> Iterator[bytes]:
+    """Write one Parquet row group per `row_group` rows, yielding bytes as they are produced."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet export requires the 'export' extra (pyarrow)") from exc
+
+    types = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "str": pa.string(),
+        "bool": pa.bool_(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us"),
+        "json": pa.string(),
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    rows = iter(rows)
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        while batch := list(islice(rows, row_group)):
+            arrays = [
+                pa.array([_parquet_value(row[i], kind) for row in batch], type=types[kind])
+                for i, (_, kind) in enumerate(columns)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            if chunk := sink.drain():
+                yield chunk
+    if chunk := sink.drain():
+        yield chunk
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands accumulated bytes back on `drain`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _text_value(value: Any, kind: str) -> Any:
+    if value is None:
+        return ""
+    if kind in ("date", "datetime"):
+        return value.isoformat()
+    if kind == "json":
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _parquet_value(value: Any, kind: str) -> Any:
+    if value is not None and kind == "json":
+        return json.dumps(value, separators=(",", ":"))
+    return value
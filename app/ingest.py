@@ -0,0 +1,281 @@
+"""Compact binary session ingest (`application/vnd.gymyo.sessions`).
+
+Layout, little-endian, version 1:
+
+    header     4s B B I H I I   magic b"GYMS", version, flags (0), user_id,
+                                name count, session count, exercise count
+    names      name count x (u8 length, UTF-8 bytes)
+    sessions   session count x (i32 date ordinal, f64 sleep_hours, u16 resting_hr,
+               f64 hrv_rmssd, f64 soreness, f64 motivation, f64 rpe_session,
+               u16 duration_min, u16 exercise count, u8 idempotency key length)
+    keys       concatenated UTF-8 idempotency keys (length 0 means none)
+    exercises  exercise count x (u16 name index, u8 sets, u8 reps, f64 load_kg, f64 rir)
+
+Sessions and exercises are fixed-width records, so decoding is a
+`struct.iter_unpack` per block straight into typed column arrays, and
+validation runs per column instead of per object. JSON bodies go through
+`sessions_from_json`, which builds the same `SessionInput`s through the
+schema constructors.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+
+from app.schemas.models import ExerciseLog, SessionInput, SessionMetrics
+
+CONTENT_TYPE = "application/vnd.gymyo.sessions"
+MAGIC = b"GYMS"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBIHII")
+_SESSION = struct.Struct("<idHddddHHB")
+_EXERCISE = struct.Struct("<HBBdd")
+
+SESSION_COLUMNS = (
+    ("day", "i"),
+    ("sleep_hours", "d"),
+    ("resting_hr", "H"),
+    ("hrv_rmssd", "d"),
+    ("soreness", "d"),
+    ("motivation", "d"),
+    ("rpe_session", "d"),
+    ("duration_min", "H"),
+    ("exercise_count", "H"),
+    ("key_length", "B"),
+)
+EXERCISE_COLUMNS = (("name_id", "H"), ("sets", "B"), ("reps", "B"), ("load_kg", "d"), ("rir", "d"))
+
+# Mirrors the Field constraints of SessionMetrics and ExerciseLog: (low, low inclusive, high, high inclusive).
+BOUNDS = {
+    "sleep_hours": (0, True, 16, True),
+    "resting_hr": (30, True, 120, True),
+    "hrv_rmssd": (5, True, 250, True),
+    "soreness": (0, True, 10, True),
+    "motivation": (0, True, 10, True),
+    "rpe_session": (1, True, 10, True),
+    "duration_min": (10, True, 300, True),
+    "sets": (1, True, 20, True),
+    "reps": (1, True, 30, True),
+    "load_kg": (0, False, 600, False),
+    "rir": (0, True, 6, True),
+}
+NAME_LENGTH = (2, 64)
+IDEMPOTENCY_KEY_LENGTH = (1, 64)
+
+
+class IngestError(ValueError):
+    """Malformed binary payload or a value outside the schema constraints."""
+
+
+@dataclass
+class SessionBatch:
+    """Decoded sessions for one user as column arrays."""
+
+    user_id: int
+    names: list[str]
+    sessions: dict[str, array]
+    exercises: dict[str, array]
+    exercise_start: array
+    idempotency_keys: list[str | None]
+
+    def __len__(self) -> int:
+        return len(self.idempotency_keys)
+
+    def to_inputs(self) -> list[SessionInput]:
+        """Build `SessionInput`s without re-validating (the columns already were)."""
+        s, e = self.sessions, self.exercises
+        inputs = []
+        for i in range(len(self)):
+            metrics = SessionMetrics.model_construct(
+                date=date.fromordinal(s["day"][i]),
+                sleep_hours=s["sleep_hours"][i],
+                resting_hr=s["resting_hr"][i],
+                hrv_rmssd=s["hrv_rmssd"][i],
+                soreness=s["soreness"][i],
+                motivation=s["motivation"][i],
+                rpe_session=s["rpe_session"][i],
+                duration_min=s["duration_min"][i],
+            )
+            exercises = [
+                ExerciseLog.model_construct(
+                    exercise=self.names[e["name_id"][j]],
+                    sets=e["sets"][j],
+                    reps=e["reps"][j],
+                    load_kg=e["load_kg"][j],
+                    rir=e["rir"][j],
+                )
+                for j in range(self.exercise_start[i], self.exercise_start[i + 1])
+            ]
+            inputs.append(
+                SessionInput.model_construct(
+                    user_id=self.user_id,
+                    metrics=metrics,
+                    exercises=exercises,
+                    idempotency_key=self.idempotency_keys[i],
+                )
+            )
+        return inputs
+
+
+def encode_sessions(sessions: Sequence[SessionInput]) -> bytes:
+    """Serialize sessions of a single user; the reference encoder for clients and tests."""
+    if not sessions:
+        raise IngestError("At least one session is required")
+    user_id = sessions[0].user_id
+    name_ids: dict[str, int] = {}
+    session_blocks, key_blocks, exercise_blocks = [], [], []
+    for payload in sessions:
+        if payload.user_id != user_id:
+            raise IngestError("All sessions in a batch must belong to one user")
+        m = payload.metrics
+        key = (payload.idempotency_key or "").encode("utf-8")
+        session_blocks.append(
+            _SESSION.pack(
+                m.date.toordinal(),
+                m.sleep_hours,
+                m.resting_hr,
+                m.hrv_rmssd,
+                m.soreness,
+                m.motivation,
+                m.rpe_session,
+                m.duration_min,
+                len(payload.exercises),
+                len(key),
+            )
+        )
+        key_blocks.append(key)
+        for ex in payload.exercises:
+            name_id = name_ids.setdefault(ex.exercise, len(name_ids))
+            exercise_blocks.append(_EXERCISE.pack(name_id, ex.sets, ex.reps, ex.load_kg, ex.rir))
+    names = b"".join(bytes([len(encoded)]) + encoded for encoded in (name.encode("utf-8") for name in name_ids))
+    header = _HEADER.pack(MAGIC, VERSION, 0, user_id, len(name_ids), len(session_blocks), len(exercise_blocks))
+    return b"".join([header, names, *session_blocks, *key_blocks, *exercise_blocks])
+
+
+def decode_sessions(data: bytes) -> SessionBatch:
+    """Decode and validate a payload; raises `IngestError` with the first violation."""
+    view = memoryview(data)
+    if len(view) < _HEADER.size:
+        raise IngestError("Truncated header")
+    magic, version, _, user_id, name_count, session_count, exercise_count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC or version != VERSION:
+        raise IngestError("Unsupported session encoding")
+    if user_id <= 0:
+        raise IngestError("Field 'user_id' must be > 0")
+    if session_count == 0:
+        raise IngestError("At least one session is required")
+
+    offset = _HEADER.size
+    names = []
+    for _ in range(name_count):
+        if offset >= len(view) or offset + 1 + view[offset] > len(view):
+            raise IngestError("Truncated name table")
+        length = view[offset]
+        name = _text(view[offset + 1 : offset + 1 + length])
+        if not NAME_LENGTH[0] <= len(name) <= NAME_LENGTH[1]:
+            raise IngestError(f"Field 'exercise' length must be between {NAME_LENGTH[0]} and {NAME_LENGTH[1]}")
+        names.append(name)
+        offset += 1 + length
+
+    sessions, offset = _unpack_block(view, offset, _SESSION, session_count, SESSION_COLUMNS, "sessions")
+    key_lengths = sessions.pop("key_length")
+    if offset + sum(key_lengths) > len(view):
+        raise IngestError("Truncated idempotency keys")
+    keys: list[str | None] = []
+    for length in key_lengths:
+        key = _text(view[offset : offset + length]) if length else None
+        if key is not None and len(key) > IDEMPOTENCY_KEY_LENGTH[1]:
+            raise IngestError(
+                f"Idempotency key length must be between {IDEMPOTENCY_KEY_LENGTH[0]} and {IDEMPOTENCY_KEY_LENGTH[1]}"
+            )
+        keys.append(key)
+        offset += length
+    exercises, offset = _unpack_block(view, offset, _EXERCISE, exercise_count, EXERCISE_COLUMNS, "exercises")
+    if offset != len(view):
+        raise IngestError("Unexpected trailing bytes")
+
+    counts = sessions.pop("exercise_count")
+    if sum(counts) != exercise_count:
+        raise IngestError("Exercise counts do not match the exercise block")
+    exercise_start = array("I", [0])
+    for count in counts:
+        if count == 0:
+            raise IngestError("Each session needs at least one exercise")
+        exercise_start.append(exercise_start[-1] + count)
+
+    if any(not 1 <= day <= date.max.toordinal() for day in sessions["day"]):
+        raise IngestError("Field 'date' is not a valid date")
+    for columns in (sessions, exercises):
+        for name, column in columns.items():
+            if name in BOUNDS:
+                _check_bounds(name, column)
+    if any(name_id >= name_count for name_id in exercises["name_id"]):
+        raise IngestError("Exercise name index out of range")
+    _check_unique_exercises(names, exercises["name_id"], exercise_start)
+    return SessionBatch(user_id, names, sessions, exercises, exercise_start, keys)
+
+
+def sessions_from_json(body: bytes, many: bool = False) -> list[SessionInput]:
+    """Parse one JSON session, or a JSON array of them with `many`, validating every field."""
+    try:
+        raw = json.loads(body)
+    except ValueError as exc:
+        raise IngestError("Body is not valid JSON") from exc
+    if many and not isinstance(raw, list):
+        raise IngestError("Expected a JSON array of sessions")
+    try:
+        return [_session_from_json(item) for item in (raw if many else [raw])]
+    except KeyError as exc:
+        raise IngestError(f"Field {exc} is required") from exc
+    except (TypeError, ValueError) as exc:
+        raise IngestError(str(exc)) from exc
+
+
+def _session_from_json(raw: dict) -> SessionInput:
+    if not (isinstance(raw, dict) and isinstance(raw.get("metrics"), dict) and isinstance(raw.get("exercises"), list)):
+        raise IngestError("Each session needs a 'metrics' object and an 'exercises' array")
+    metrics = raw["metrics"]
+    return SessionInput(
+        **{key: raw[key] for key in ("user_id", "idempotency_key") if key in raw},
+        metrics=SessionMetrics(**{**metrics, "date": date.fromisoformat(metrics["date"])}),
+        exercises=[ExerciseLog(**exercise) for exercise in raw["exercises"]],
+    )
+
+
+def _unpack_block(
+    view: memoryview, offset: int, record: struct.Struct, count: int, columns: tuple[tuple[str, str], ...], label: str
+) -> tuple[dict[str, array], int]:
+    end = offset + record.size * count
+    if end > len(view):
+        raise IngestError(f"Truncated {label} block")
+    fields = zip(*record.iter_unpack(view[offset:end])) if count else [()] * len(columns)
+    return {name: array(code, values) for (name, code), values in zip(columns, fields)}, end
+
+
+def _text(raw: memoryview) -> str:
+    try:
+        return bytes(raw).decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise IngestError("Invalid UTF-8 text") from exc
+
+
+def _check_bounds(name: str, column: array) -> None:
+    low, low_inclusive, high, high_inclusive = BOUNDS[name]
+    # Written so that NaN fails every comparison and is rejected too.
+    for value in column:
+        if not ((value >= low if low_inclusive else value > low) and (value <= high if high_inclusive else value < high)):
+            raise IngestError(f"Field '{name}' must be within [{low}, {high}], got {value}")
+
+
+def _check_unique_exercises(names: list[str], name_ids: array, exercise_start: array) -> None:
+    folded = [name.lower() for name in names]
+    for i in range(len(exercise_start) - 1):
+        session_names = [folded[name_ids[j]] for j in range(exercise_start[i], exercise_start[i + 1])]
+        if len(set(session_names)) != len(session_names):
+            raise IngestError("Exercise names must be unique per session")
@@ -4,31 +4,66 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
 
+from app.api.admin import router as admin_router
+from app.api.dependencies import AUTH_REQUIRED
 from app.api.routes import router
-from app.db.database import Base, engine
+from app.db.database import shards
+from app.db.migrations import upgrade_schema
+from app.db.repositories import DEFAULT_USER_ID, get_or_create_default_user
+from app.prescriptions import PRECOMPUTE_INTERVAL_SECONDS, PrecomputeScheduler
+from app.profiling import PROFILE_ALLOCATIONS, profiler
+from app.static import SpaBundle
 
 app = FastAPI(title="Gymyo Adaptive Training API", version="0.2.0")
 app.include_router(router, prefix="/api")
+app.include_router(admin_router, prefix="/api/admin")
+precompute_scheduler: PrecomputeScheduler | None = None
 
 
 @app.on_event("startup")
 def startup() -> None:
-    """Initialize schema."""
-    Base.metadata.create_all(bind=engine)
+    """Initialize schema on every shard and start scheduled precomputation."""
+    global precompute_scheduler
+    for shard_engine in shards.engines:
+        upgrade_schema(shard_engine)
+    if not AUTH_REQUIRED:
+        db = shards.session(DEFAULT_USER_ID)
+        try:
+            get_or_create_default_user(db)
+        finally:
+            db.close()
+    if PRECOMPUTE_INTERVAL_SECONDS > 0:
+        precompute_scheduler = PrecomputeScheduler(PRECOMPUTE_INTERVAL_SECONDS)
+        precompute_scheduler.start()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    """Stop background prescription precomputation."""
+    if precompute_scheduler is not None:
+        precompute_scheduler.stop()
+
+
+if PROFILE_ALLOCATIONS:
+    profiler.start()
+
+    @app.middleware("http")
+    async def profile_allocations(request: Request, call_next):
+        """Attribute tracemalloc figures to each API route."""
+        if not request.url.path.startswith("/api/") or request.url.path.startswith("/api/admin/"):
+            return await call_next(request)
+        with profiler.measure(f"{request.method} {request.url.path}"):
+            return await call_next(request)
 
 
 WEB_DIST = Path(__file__).resolve().parents[1] / "web" / "dist"
-if WEB_DIST.exists():
-    app.mount("/assets", StaticFiles(directory=WEB_DIST / "assets"), name="assets")
+if (WEB_DIST / "index.html").is_file():
+    spa = SpaBundle.load(WEB_DIST)
 
-    @app.get("/{full_path:path}")
-    def serve_spa(full_path: str) -> FileResponse:
+    @app.get("/{full_path:path}", include_in_schema=False)
+    def serve_spa(full_path: str, request: Request) -> Response:
         """Serve built single-page app in production."""
-        requested = WEB_DIST / full_path
-        if full_path and requested.exists() and requested.is_file():
-            return FileResponse(requested)
-        return FileResponse(WEB_DIST / "index.html")
+        return spa.response(full_path, request.headers)
@@ -0,0 +1,208 @@
+"""Prescription computation, version-keyed caching and scheduled precomputation."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.engine import AdaptiveEngine
+from app.core.exceptions import InsufficientDataError
+from app.db.database import shards
+from app.db.repositories import (
+    baseline_for,
+    get_acwr,
+    get_cached_prescription,
+    get_data_version,
+    get_recent_sessions,
+    get_stale_prescription_users,
+    get_strength_curves,
+    get_user_profile,
+    mark_prescription_skipped,
+    save_prescription,
+)
+from app.schemas.models import TrainingPrescription
+from app.singleflight import flight
+
+logger = logging.getLogger(__name__)
+
+PRECOMPUTE_INTERVAL_SECONDS = float(os.getenv("PRECOMPUTE_INTERVAL_SECONDS", "0"))
+PRECOMPUTE_CHUNK_SIZE = int(os.getenv("PRECOMPUTE_CHUNK_SIZE", "100"))
+PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", "4"))
+
+engine = AdaptiveEngine()
+_prescription_flight = flight("prescription")
+
+
+def prescription_day() -> date:
+    """Day prescriptions are computed for (UTC); cached ones are keyed by it."""
+    return datetime.utcnow().date()
+
+
+def compute_prescription(db: Session, user_id: int, as_of: date | None = None) -> TrainingPrescription:
+    """Run the engine on the user's recent history; raises ValueError if data is insufficient.
+
+    The workload ratio is projected to `as_of` (default today), so rest days
+    since the last session count.
+    """
+    profile = get_user_profile(db, user_id)
+    recent = get_recent_sessions(db, user_id)
+    curves = get_strength_curves(db, user_id)
+    acwr = get_acwr(db, user_id, as_of or prescription_day())
+    return engine.prescribe(profile, recent, baseline_for(db, user_id), acwr, curves)
+
+
+def prescription_for(db: Session, user_id: int, primary: Session | None = None) -> TrainingPrescription:
+    """Serve the prescription for the user's current data version and today, computing it on a miss.
+
+    `db` may be a replica session; a freshly computed prescription is saved
+    through `primary` (default `db`). Concurrent misses in this process for
+    the same user, version and day share a single computation and save; other
+    workers may compute it too, but only one row per key is stored.
+    """
+    version = get_data_version(db, user_id)
+    if version is None:
+        raise ValueError(f"User {user_id} not found")
+    data_version, _ = version
+    day = prescription_day()
+    cached = get_cached_prescription(db, user_id, data_version, day)
+    if cached is not None:
+        return cached
+    return _refresh_prescription(db, user_id, data_version, day, primary)
+
+
+def _refresh_prescription(
+    db: Session, user_id: int, data_version: int, day: date, primary: Session | None = None
+) -> TrainingPrescription:
+    def compute_and_save() -> TrainingPrescription:
+        prescription = compute_prescription(db, user_id, day)
+        save_prescription(primary or db, user_id, prescription, data_version, day)
+        return prescription
+
+    return _prescription_flight.do((user_id, data_version, day), compute_and_save)
+
+
+@dataclass
+class PrecomputeReport:
+    """Throughput and lag of one precomputation run."""
+
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    duration_s: float = 0.0
+    lags_s: list[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        return self.processed / self.duration_s if self.duration_s > 0 else 0.0
+
+    @property
+    def max_lag_s(self) -> float:
+        return max(self.lags_s, default=0.0)
+
+    @property
+    def mean_lag_s(self) -> float:
+        return sum(self.lags_s) / len(self.lags_s) if self.lags_s else 0.0
+
+    def merge(self, other: PrecomputeReport) -> None:
+        self.processed += other.processed
+        self.skipped += other.skipped
+        self.failed += other.failed
+        self.lags_s.extend(other.lags_s)
+
+    def as_metrics(self) -> dict[str, float]:
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "duration_s": round(self.duration_s, 3),
+            "throughput_per_s": round(self.throughput, 2),
+            "max_lag_s": round(self.max_lag_s, 3),
+            "mean_lag_s": round(self.mean_lag_s, 3),
+        }
+
+
+def _precompute_chunk(chunk: list[tuple[int, int, datetime | None]]) -> PrecomputeReport:
+    report = PrecomputeReport()
+    day = prescription_day()
+    for user_id, data_version, changed_at in chunk:
+        db = shards.session(user_id)
+        try:
+            _refresh_prescription(db, user_id, data_version, day)
+        except (ValueError, InsufficientDataError):
+            # Not enough history yet; the next write bumps the version past the mark and retries.
+            report.skipped += 1
+            db.rollback()
+            mark_prescription_skipped(db, user_id, data_version)
+        except Exception:
+            logger.exception("Prescription precompute failed for user %s", user_id)
+            report.failed += 1
+            db.rollback()
+        else:
+            report.processed += 1
+            if changed_at is not None:
+                # Users due only because the day changed have been stale since midnight.
+                stale_since = max(changed_at, datetime.combine(day, datetime.min.time()))
+                report.lags_s.append((datetime.utcnow() - stale_since).total_seconds())
+        finally:
+            db.close()
+    return report
+
+
+def precompute_prescriptions(
+    chunk_size: int = PRECOMPUTE_CHUNK_SIZE, workers: int = PRECOMPUTE_WORKERS
+) -> PrecomputeReport:
+    """Compute prescriptions for every user whose data changed since their last one, or not yet today.
+
+    Stale users are split into chunks that worker threads process in parallel,
+    each with its own shard-bound session.
+    """
+    started = time.perf_counter()
+    stale: list[tuple[int, int, datetime | None]] = []
+    for index in range(len(shards.engines)):
+        db = shards.shard_session(index)
+        try:
+            rows = get_stale_prescription_users(db, prescription_day())
+            stale.extend(row for row in rows if shards.shard_for(row[0]) == index)
+        finally:
+            db.close()
+
+    chunks = [stale[i : i + chunk_size] for i in range(0, len(stale), chunk_size)]
+    report = PrecomputeReport()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for chunk_report in pool.map(_precompute_chunk, chunks):
+            report.merge(chunk_report)
+    report.duration_s = time.perf_counter() - started
+    logger.info("prescription precompute %s", report.as_metrics())
+    return report
+
+
+class PrecomputeScheduler:
+    """Background thread running `precompute_prescriptions` on a fixed interval."""
+
+    def __init__(self, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self.last_report: PrecomputeReport | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="prescription-precompute", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self.interval_s)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.last_report = precompute_prescriptions()
+            except Exception:
+                logger.exception("Prescription precompute run failed")
+            self._stop.wait(self.interval_s)
@@ -0,0 +1,156 @@
+"""Opt-in allocation profiling with tracemalloc.
+
+With `GYMYO_PROFILE_ALLOCATIONS=1` every request is measured: net bytes
+still allocated when it finishes, the peak above its starting point and,
+on sampled requests, the number of memory blocks it left allocated. Tracing is
+process-wide, so figures are exact only when requests do not overlap
+(e.g. one worker under a sequential load generator).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+PROFILE_ALLOCATIONS = os.getenv("GYMYO_PROFILE_ALLOCATIONS", "0") == "1"
+TRACEMALLOC_FRAMES = int(os.getenv("GYMYO_TRACEMALLOC_FRAMES", "10"))
+# Block counts need two snapshots, so only every Nth request per route pays for them.
+SNAPSHOT_EVERY = int(os.getenv("GYMYO_PROFILE_SNAPSHOT_EVERY", "10"))
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+@dataclass
+class RouteAllocations:
+    """Accumulated allocation figures for one route."""
+
+    requests: int = 0
+    net_bytes: int = 0
+    peak_bytes: int = 0
+    max_peak_bytes: int = 0
+    sampled: int = 0
+    retained_blocks: int = 0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "mean_net_bytes": round(self.net_bytes / self.requests) if self.requests else 0,
+            "mean_peak_bytes": round(self.peak_bytes / self.requests) if self.requests else 0,
+            "max_peak_bytes": self.max_peak_bytes,
+            "mean_retained_blocks": round(self.retained_blocks / self.sampled) if self.sampled else None,
+        }
+
+
+class AllocationProfiler:
+    """Per-route tracemalloc accounting plus process-wide top allocation sites."""
+
+    def __init__(self, frames: int = TRACEMALLOC_FRAMES, snapshot_every: int = SNAPSHOT_EVERY) -> None:
+        self.frames = frames
+        self.snapshot_every = max(snapshot_every, 1)
+        self.routes: dict[str, RouteAllocations] = {}
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._owns_tracing = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        """Stop tracing if `start` turned it on; tracing started elsewhere (e.g. `-X tracemalloc`) keeps running."""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        self._baseline = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.routes.clear()
+        if self.enabled:
+            self._baseline = self._snapshot()
+
+    @contextmanager
+    def measure(self, route: str) -> Iterator[None]:
+        """Record allocations made inside the block under `route`."""
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            stats = self.routes.setdefault(route, RouteAllocations())
+            sample = stats.requests % self.snapshot_every == 0
+            stats.requests += 1
+        before = self._snapshot() if sample else None
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            retained = None
+            if before is not None:
+                diff = self._snapshot().compare_to(before, "lineno")
+                retained = sum(max(stat.count_diff, 0) for stat in diff)
+            peak_bytes = max(peak - start, 0)
+            with self._lock:
+                stats.net_bytes += current - start
+                stats.peak_bytes += peak_bytes
+                stats.max_peak_bytes = max(stats.max_peak_bytes, peak_bytes)
+                if retained is not None:
+                    stats.sampled += 1
+                    stats.retained_blocks += retained
+
+    def top_sites(self, limit: int = 20, key_type: str = "lineno") -> list[dict[str, object]]:
+        """Largest live allocation sites right now."""
+        if not self.enabled:
+            return []
+        return [_site(stat.traceback, stat.size, stat.count) for stat in self._snapshot().statistics(key_type)[:limit]]
+
+    def growth(self, limit: int = 20, key_type: str = "lineno") -> list[dict[str, object]]:
+        """Sites whose live memory grew most since profiling started or was reset."""
+        if not self.enabled or self._baseline is None:
+            return []
+        diff = self._snapshot().compare_to(self._baseline, key_type)
+        return [
+            {**_site(stat.traceback, stat.size_diff, stat.count_diff), "total_bytes": stat.size}
+            for stat in diff[:limit]
+            if stat.size_diff > 0
+        ]
+
+    def report(self, limit: int = 20) -> dict[str, object]:
+        traced, peak = tracemalloc.get_traced_memory() if self.enabled else (0, 0)
+        with self._lock:
+            routes = {route: stats.as_dict() for route, stats in sorted(self.routes.items())}
+        return {
+            "enabled": self.enabled,
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "routes": routes,
+            "top_sites": self.top_sites(limit),
+            "growth": self.growth(limit),
+        }
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+
+def _site(traceback: tracemalloc.Traceback, size: int, count: int) -> dict[str, object]:
+    frame = traceback[0]
+    return {"file": frame.filename, "line": frame.lineno, "bytes": size, "count": count}
+
+
+profiler = AllocationProfiler()
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -70,6 +70,7 @@ class SessionInput(BaseModel):
     user_id: int = Field(gt=0)
     metrics: SessionMetrics
     exercises: List[ExerciseLog] = Field(min_length=1)
+    idempotency_key: Optional[str] = None
 
     @field_validator("exercises")
     def unique_exercises(cls, values: List[ExerciseLog]) -> List[ExerciseLog]:
@@ -78,6 +79,12 @@ class SessionInput(BaseModel):
             raise ValueError("Exercise names must be unique per session")
         return values
 
+    @field_validator("idempotency_key")
+    def bounded_idempotency_key(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and not 1 <= len(value) <= 64:
+            raise ValueError("Idempotency key length must be between 1 and 64")
+        return value
+
 
 class DailyMetricsUpdate(BaseModel):
     """Payload for updating daily physiological metrics."""
@@ -111,6 +118,64 @@ class E1RMPoint(BaseModel):
     e1rm: float
 
 
+class PersonalRecord(BaseModel):
+    """Current personal records for one exercise."""
+
+    exercise: str
+    best_e1rm: float
+    best_e1rm_date: date
+    heaviest_load_kg: float
+    heaviest_load_reps: int
+    heaviest_load_date: date
+    most_reps: int
+    most_reps_load_kg: float
+    most_reps_date: date
+
+
+class MuscleWorkload(BaseModel):
+    """Acute and chronic workload with their ratio for one muscle group."""
+
+    muscle: str
+    acute: float
+    chronic: float
+    acwr: Optional[float] = None
+    flag: str
+
+
+class PrescriptionHistoryPoint(BaseModel):
+    """Prescription outcomes aggregated over one week or month."""
+
+    period_start: date
+    prescriptions: int
+    deloads: int
+    deload_days: int
+    deload_rate: float
+    avg_readiness: Optional[float] = None
+    min_readiness: Optional[float] = None
+    avg_fatigue: Optional[float] = None
+    avg_acwr: Optional[float] = None
+
+
+class TrendWindow(BaseModel):
+    """e1RM trend of one lift over its last `horizon` sessions."""
+
+    horizon: int
+    sessions: int
+    slope: float
+    mean: float
+    std: float
+    plateau: Optional[bool] = None
+
+
+class ExerciseTrend(BaseModel):
+    """Trend windows of one lift, shortest horizon first."""
+
+    exercise: str
+    sessions: int
+    latest_e1rm: float
+    windows: List[TrendWindow]
+
+
 class AnalyticsResponse(BaseModel):
     """Chart-friendly analytics payload."""
 
@@ -128,3 +193,23 @@ class DashboardResponse(BaseModel):
     next_workout: TrainingPrescription
     latest_metrics: SessionMetrics
     recent_sessions: List[SessionSummary]
+
+
+class SyncSession(BaseModel):
+    """A session with its metrics and logs as carried by delta sync."""
+
+    session_id: int
+    version: int
+    metrics: Optional[SessionMetrics] = None
+    exercises: List[ExerciseLog]
+
+
+class SyncResponse(BaseModel):
+    """Changes since a client's watermark; `full` replaces the client store."""
+
+    watermark: int
+    full: bool
+    profile: Optional[UserProfile] = None
+    sessions: List[SyncSession] = []
+    deleted_sessions: List[int] = []
+    next_workout: Optional[TrainingPrescription] = None
@@ -0,0 +1,102 @@
+"""Single-flight coalescing of identical concurrent computations.
+
+Callers that ask for a key already being computed wait for the in-flight
+result instead of starting their own. Coalescing is per process: callers
+in other workers compute independently.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class FlightStats:
+    """Counters for one single-flight group."""
+
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    in_flight: int = 0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "coalesced_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+        }
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time and shares its outcome."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.stats = FlightStats()
+        self._flights: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return `fn()`, or the result of an identical call already running."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._finish(key, future, error=exc)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            self.stats.calls += 1
+            future = self._flights.get(key)
+            if future is not None:
+                self.stats.coalesced += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self.stats.executions += 1
+            self.stats.in_flight += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result: Any = None, error: BaseException | None = None) -> None:
+        # Unregister before resolving so later callers start a fresh flight.
+        with self._lock:
+            self._flights.pop(key, None)
+            self.stats.in_flight -= 1
+            if error is not None:
+                self.stats.errors += 1
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+_groups: dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def flight(name: str) -> SingleFlight:
+    """Shared single-flight group registered under `name`."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def flight_stats() -> dict[str, dict[str, float]]:
+    with _groups_lock:
+        return {name: group.stats.as_dict() for name, group in sorted(_groups.items())}
@@ -0,0 +1,134 @@
+"""In-memory manifest for serving the built single-page app."""
+
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+
+from fastapi.responses import FileResponse, JSONResponse, Response
+
+from app.conditional import etag_matches
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Preferred order when the client accepts several encodings.
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass(frozen=True)
+class StaticVariant:
+    """One on-disk representation of an asset (identity or precompressed)."""
+
+    path: Path
+    etag: str
+    body: bytes | None = None
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """Asset entry with its negotiated variants and cache policy."""
+
+    media_type: str
+    cache_control: str
+    variants: dict[str, StaticVariant] = field(default_factory=dict)
+
+
+def _etag_for(path: Path) -> str:
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def accepted_encodings(header: str) -> set[str]:
+    accepted: set[str] = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(token)
+    return accepted
+
+
+def _is_client_route(full_path: str) -> bool:
+    """Whether a path the manifest lacks can be a client-side route rather than a file."""
+    first = full_path.split("/", 1)[0]
+    return first not in {"api", "assets"} and not PurePosixPath(full_path).suffix
+
+
+class SpaBundle:
+    """File manifest of `web/dist` resolved once at startup.
+
+    `index.html` (and its compressed variants) is held in memory; every other
+    file is streamed from disk with a precomputed strong ETag. Only route-like
+    paths fall back to the index; a missing asset or API path is a 404, so a
+    client on an old build gets a catchable error instead of HTML.
+    """
+
+    def __init__(self, root: Path, assets: dict[str, StaticAsset], index_path: str = "index.html") -> None:
+        self.root = root
+        self.assets = assets
+        self.index_path = index_path
+
+    @classmethod
+    def load(cls, root: Path) -> SpaBundle:
+        compressed_suffixes = tuple(ENCODING_SUFFIXES.values())
+        assets: dict[str, StaticAsset] = {}
+        for path in sorted(root.rglob("*")):
+            if not path.is_file() or path.name.endswith(compressed_suffixes):
+                continue
+            rel = path.relative_to(root).as_posix()
+            in_memory = rel == "index.html"
+            variants = {"identity": StaticVariant(path, _etag_for(path), path.read_bytes() if in_memory else None)}
+            for encoding, suffix in ENCODING_SUFFIXES.items():
+                compressed = path.with_name(path.name + suffix)
+                if compressed.is_file():
+                    variants[encoding] = StaticVariant(
+                        compressed,
+                        _etag_for(compressed),
+                        compressed.read_bytes() if in_memory else None,
+                    )
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            cache_control = IMMUTABLE_CACHE if rel.startswith("assets/") else REVALIDATE_CACHE
+            assets[rel] = StaticAsset(media_type=media_type, cache_control=cache_control, variants=variants)
+        if "index.html" not in assets:
+            raise FileNotFoundError(f"{root / 'index.html'} is missing; build the web app first")
+        return cls(root, assets)
+
+    def response(self, full_path: str, headers: Mapping[str, str]) -> Response:
+        """Build a response for `full_path`, falling back to the SPA index for client routes."""
+        asset = self.assets.get(full_path)
+        if asset is None:
+            if not _is_client_route(full_path):
+                return JSONResponse({"detail": "Not Found"}, status_code=404)
+            asset = self.assets[self.index_path]
+        accepted = accepted_encodings(headers.get("accept-encoding", ""))
+        encoding = next((enc for enc in ENCODING_SUFFIXES if enc in accepted and enc in asset.variants), "identity")
+        variant = asset.variants[encoding]
+
+        response_headers = {
+            "ETag": variant.etag,
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, variant.etag):
+            return Response(status_code=304, headers=response_headers)
+        if variant.body is not None:
+            return Response(content=variant.body, media_type=asset.media_type, headers=response_headers)
+        return FileResponse(variant.path, media_type=asset.media_type, headers=response_headers)
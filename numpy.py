@@ -97,6 +97,16 @@ def diff(values: ndarray) -> ndarray:
     return ndarray(data[i + 1] - data[i] for i in range(len(data) - 1))
 
 
+def power(base, exponent):
+    if isinstance(exponent, ndarray):
+        if isinstance(base, ndarray):
+            return ndarray(a**b for a, b in zip(base, exponent))
+        return ndarray(float(base) ** b for b in exponent)
+    if isinstance(base, ndarray):
+        return base ** exponent
+    return float(base) ** float(exponent)
+
+
 def abs(value):
     if isinstance(value, ndarray):
         return ndarray(builtins.abs(v) for v in value)
@@ -53,6 +53,16 @@ class BaseModel:
             current = getattr(self, key)
             setattr(self, key, validator(self.__class__, current))
 
+    @classmethod
+    def model_construct(cls, **kwargs):
+        instance = cls.__new__(cls)
+        for key in getattr(cls, "__annotations__", {}):
+            default = getattr(cls, key, ...)
+            if isinstance(default, FieldInfo):
+                default = default.default
+            setattr(instance, key, kwargs.get(key, default))
+        return instance
+
     @staticmethod
     def _validate_field(name: str, value, info: FieldInfo) -> None:
         if value is ...:
@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """A session on a fresh embedded database, with the columnar store kept under `tmp_path`."""
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.columnar import column_store
+    from app.db.database import create_database_engine
+    from app.db.migrations import upgrade_schema
+
+    monkeypatch.setattr(column_store, "root", tmp_path / "columnar")
+    bind = create_database_engine(f"sqlite:///{tmp_path / 'gymyo.db'}")
+    upgrade_schema(bind)
+    db = sessionmaker(bind=bind, autoflush=False, expire_on_commit=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        bind.dispose()
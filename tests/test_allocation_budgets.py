@@ -0,0 +1,129 @@
+import tracemalloc
+from datetime import date, timedelta
+
+import pytest
+
+from app.profiling import AllocationProfiler
+from app.schemas.models import ExerciseLog, ProfileUpdate, SessionInput, SessionMetrics
+
+# Peak bytes allocated above the starting point by the work behind each route,
+# on a fresh request-scoped session as the API uses.
+NEXT_WORKOUT_PEAK_BUDGET = 1024 * 1024
+ANALYTICS_PEAK_BUDGET = 512 * 1024
+PROFILE = ProfileUpdate(age=30, bodyweight_kg=82, training_age_years=4, goal="strength", mrv_baseline_sets=14)
+
+
+def _session(user_id: int, i: int) -> SessionInput:
+    metrics = SessionMetrics(
+        date=date(2024, 1, 1) + timedelta(days=i * 2),
+        sleep_hours=7.5,
+        resting_hr=56,
+        hrv_rmssd=58,
+        soreness=3,
+        motivation=8,
+        rpe_session=7.5,
+        duration_min=75,
+    )
+    exercises = [
+        ExerciseLog(exercise="Squat", sets=4, reps=5, load_kg=100 + i % 20, rir=2),
+        ExerciseLog(exercise="Bench Press", sets=3, reps=8, load_kg=70, rir=2),
+    ]
+    return SessionInput(user_id=user_id, metrics=metrics, exercises=exercises, idempotency_key=f"s{i}")
+
+
+def test_next_workout_and_analytics_stay_within_allocation_budgets(sqlite_db) -> None:
+    from sqlalchemy.orm import Session
+
+    from app.core.analytics import summarize_history
+    from app.db.repositories import create_user, iter_session_history, save_session
+    from app.prescriptions import prescription_for
+
+    short_user, long_user = create_user(sqlite_db, PROFILE).id, create_user(sqlite_db, PROFILE).id
+    for i in range(400):
+        if i < 40:
+            save_session(sqlite_db, _session(short_user, i))
+        save_session(sqlite_db, _session(long_user, i))
+
+    profiler = AllocationProfiler(snapshot_every=1)
+    profiler.start()
+    try:
+        for round_ in range(3):
+            # A new session per round, so every prescription is a cache miss.
+            save_session(sqlite_db, _session(long_user, 400 + round_))
+            for route, run in (
+                ("next-workout", lambda db: prescription_for(db, long_user)),
+                ("analytics-short", lambda db: summarize_history(iter_session_history(db, short_user), "squat")),
+                ("analytics-long", lambda db: summarize_history(iter_session_history(db, long_user), "squat")),
+            ):
+                db = Session(bind=sqlite_db.get_bind(), autoflush=False, expire_on_commit=False)
+                try:
+                    with profiler.measure(route):
+                        run(db)
+                finally:
+                    db.close()
+    finally:
+        profiler.stop()
+
+    routes = profiler.routes
+    assert routes["next-workout"].max_peak_bytes < NEXT_WORKOUT_PEAK_BUDGET
+    assert routes["analytics-long"].max_peak_bytes < ANALYTICS_PEAK_BUDGET
+    # A streamed history must not cost more memory just because it is longer.
+    assert routes["analytics-long"].max_peak_bytes < 2 * routes["analytics-short"].max_peak_bytes + 64 * 1024
+    assert routes["next-workout"].sampled == 3
+
+
+def test_report_lists_routes_and_sites() -> None:
+    profiler = AllocationProfiler(snapshot_every=1)
+    profiler.start()
+    try:
+        with profiler.measure("GET /api/analytics"):
+            kept = [bytearray(1024) for _ in range(8)]
+        report = profiler.report(limit=5)
+    finally:
+        profiler.stop()
+
+    assert kept and report["enabled"] is True
+    assert set(report) == {"enabled", "traced_bytes", "traced_peak_bytes", "routes", "top_sites", "growth"}
+    assert set(report["routes"]["GET /api/analytics"]) == {
+        "requests",
+        "mean_net_bytes",
+        "mean_peak_bytes",
+        "max_peak_bytes",
+        "mean_retained_blocks",
+    }
+    assert report["routes"]["GET /api/analytics"]["mean_net_bytes"] >= 8 * 1024
+    assert 0 < len(report["top_sites"]) <= 5
+    assert set(report["top_sites"][0]) == {"file", "line", "bytes", "count"}
+
+
+def test_stop_leaves_tracing_started_elsewhere_running() -> None:
+    tracemalloc.start()
+    try:
+        profiler = AllocationProfiler()
+        profiler.start()
+        profiler.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    profiler.start()
+    profiler.stop()
+    assert not tracemalloc.is_tracing()
+
+
+def test_admin_endpoints_need_the_operator_token(monkeypatch) -> None:
+    pytest.importorskip("fastapi")
+    from fastapi import HTTPException
+
+    from app.api import dependencies
+
+    monkeypatch.setattr(dependencies, "ADMIN_TOKEN", "")
+    with pytest.raises(HTTPException) as unset:
+        dependencies.require_admin("anything")
+    assert unset.value.status_code == 404
+
+    monkeypatch.setattr(dependencies, "ADMIN_TOKEN", "s3cret")
+    for token in (None, "wrong"):
+        with pytest.raises(HTTPException) as denied:
+            dependencies.require_admin(token)
+        assert denied.value.status_code == 403
+    dependencies.require_admin("s3cret")
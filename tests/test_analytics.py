@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.analytics import AnalyticsWindows, extend_with_rollups, summarize_history
+from app.core.rollups import rollup_cutoff, rollup_sessions, week_start
+from app.core.strength import StrengthCurve
+from app.schemas.models import ExerciseLog, SessionMetrics
+
+
+def _history(count: int):
+    base = date(2026, 1, 1)
+    for i in reversed(range(count)):
+        metrics = SessionMetrics(
+            date=base + timedelta(days=i * 3),
+            sleep_hours=7.5,
+            resting_hr=56,
+            hrv_rmssd=58,
+            soreness=3,
+            motivation=8,
+            rpe_session=7.5,
+            duration_min=75,
+        )
+        yield metrics, [ExerciseLog(exercise="Squat", sets=4, reps=5, load_kg=100 + i, rir=2)]
+
+
+def test_single_pass_respects_each_window_and_stops_early() -> None:
+    consumed = []
+
+    def tracked():
+        for item in _history(30):
+            consumed.append(item)
+            yield item
+
+    summary = summarize_history(tracked(), "squat", AnalyticsWindows(sessions=4, volume_weeks=2, e1rm_sessions=6))
+
+    assert summary.sessions == 4
+    assert len(summary.readiness) == 4
+    assert [d for d, _ in summary.e1rm_trend] == sorted(d for d, _ in summary.e1rm_trend)
+    assert len(summary.e1rm_trend) == 6
+    assert {week for week, _ in summary.weekly_volume} <= {date(2026, 3, 16), date(2026, 3, 23)}
+    assert len(consumed) == 7
+
+
+def test_rollups_stand_in_for_rolled_up_weeks() -> None:
+    history = list(_history(60))
+    through = rollup_cutoff(date(2026, 4, 1), min_age_days=35)
+    assert through.weekday() == 6
+    recent = [item for item in history if item[0].date > through]
+    rolled = rollup_sessions(item for item in history if item[0].date <= through)
+    windows = AnalyticsWindows(sessions=50, volume_weeks=30, e1rm_sessions=50)
+
+    full = summarize_history(iter(history), "squat", windows)
+    combined = extend_with_rollups(
+        summarize_history(iter(recent), "squat", windows),
+        [rolled[week] for week in sorted(rolled, reverse=True)],
+        "squat",
+        windows,
+    )
+
+    assert combined.weekly_volume == full.weekly_volume
+    assert combined.sessions == full.sessions == 50
+    assert combined.readiness == pytest.approx(full.readiness)
+    assert [d for d, _ in combined.e1rm_trend] == sorted(d for d, _ in combined.e1rm_trend)
+    # Rolled-up weeks contribute one best-e1RM point each, dated at the week start.
+    older = [(d, e1rm) for d, e1rm in combined.e1rm_trend if d <= through]
+    assert all(d.weekday() == 0 for d, _ in older)
+    assert older[-1][1] == max(e1rm for d, e1rm in full.e1rm_trend if week_start(d) == older[-1][0])
+
+
+def test_e1rm_points_use_the_fitted_curve() -> None:
+    curve = StrengthCurve(intercept=1 / 150, slope=1 / 150 / 20, sets=40)
+    history = list(_history(5))
+
+    summary = summarize_history(iter(history), "squat", curve=curve)
+    rolled = rollup_sessions(iter(history), curves={"squat": curve})
+
+    expected = [curve.e1rm_from(100 + i, 5, 2) for i in range(5)]
+    assert [e1rm for _, e1rm in summary.e1rm_trend] == expected
+    assert max(week.exercises["squat"].best_e1rm for week in rolled.values()) == expected[-1]
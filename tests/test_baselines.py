@@ -0,0 +1,20 @@
+import math
+
+import pytest
+
+from app.core.baselines import RunningStat
+
+
+def test_running_stat_matches_batch_statistics_after_replace() -> None:
+    values = [52.0, 61.0, 58.0, 49.0, 66.0]
+    stat = RunningStat()
+    for value in values:
+        stat.push(value)
+    stat.replace(49.0, 55.0)
+
+    expected = [52.0, 61.0, 58.0, 55.0, 66.0]
+    mean = sum(expected) / len(expected)
+    variance = sum((v - mean) ** 2 for v in expected) / (len(expected) - 1)
+    assert stat.count == 5
+    assert stat.mean == pytest.approx(mean)
+    assert stat.std == pytest.approx(math.sqrt(variance))
@@ -0,0 +1,40 @@
+from datetime import date
+
+from app.db.columnar import ColumnStore
+
+
+def test_column_store_appends_and_filters_by_date(tmp_path) -> None:
+    store = ColumnStore(tmp_path)
+    store.append(
+        7,
+        [
+            (1, date(2025, 1, 6), "Squat", 4, 5, 120.0, 2.0),
+            (2, date(2025, 2, 3), "Bench", 3, 8, 80.0, 1.0),
+        ],
+        cutoff=date(2025, 2, 28),
+        max_session_id=2,
+    )
+    store.append(7, [(3, date(2025, 2, 10), "Squat", 5, 5, 125.0, 1.5)], cutoff=date(2025, 2, 28), max_session_id=3)
+
+    manifest = store.manifest(7)
+    assert manifest.max_session_id == 3
+    assert manifest.months == {"2025-01": "2025-01.v1", "2025-02": "2025-02.v2"}
+    assert list(store.iter_rows(7, since=date(2025, 2, 1))) == [
+        (2, date(2025, 2, 3), "Bench", 3, 8, 80.0, 1.0),
+        (3, date(2025, 2, 10), "Squat", 5, 5, 125.0, 1.5),
+    ]
+    assert len(list(store.iter_rows(7))) == 3
+
+
+def test_column_store_unmaps_partitions_after_reading(tmp_path) -> None:
+    store = ColumnStore(tmp_path)
+    store.append(7, [(1, date(2025, 1, 6), "Squat", 4, 5, 120.0, 2.0)], cutoff=date(2025, 1, 31), max_session_id=1)
+
+    cols = store.month(7, store.manifest(7).months["2025-01"])
+    assert cols.load_kg[0] == 120.0
+    cols.close()
+    assert all(mapped.closed for mapped in cols.maps)
+
+    rows = store.iter_rows(7)
+    next(rows)
+    rows.close()
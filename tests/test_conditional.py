@@ -0,0 +1,27 @@
+from datetime import date
+
+from app.conditional import data_etag, etag_matches, not_modified
+
+
+def test_etag_changes_with_version_and_salt() -> None:
+    assert data_etag(7, 3, salt="") == 'W/"7.3"'
+    assert data_etag(7, 4, salt="") != data_etag(7, 3, salt="")
+    assert data_etag(7, 3, salt="v2") == 'W/"7.3.v2"'
+    assert data_etag(7, 3, salt="v2", day=date(2026, 3, 1)) == 'W/"7.3.20260301.v2"'
+
+
+def test_if_none_match_uses_weak_comparison() -> None:
+    etag = data_etag(7, 3, salt="")
+    assert etag_matches(etag, etag)
+    assert etag_matches('"7.3"', etag)
+    assert etag_matches('W/"1.1", W/"7.3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"7.2"', etag)
+
+
+def test_only_if_none_match_answers_304() -> None:
+    etag = data_etag(7, 3, salt="")
+    assert not_modified('W/"7.3"', etag)
+    assert not not_modified('W/"7.2"', etag)
+    assert not not_modified(None, etag)
+    assert not not_modified("", etag)
@@ -0,0 +1,92 @@
+import asyncio
+
+from app.events import EventBus
+
+
+def test_event_bus_publishes_only_changed_fields() -> None:
+    async def scenario() -> list[dict]:
+        bus = EventBus()
+        async with bus.subscription(1) as queue:
+            assert bus.wants_updates(1)
+            bus.publish(1, {"readiness": 0.7, "next_workout": None})
+            bus.publish(1, {"readiness": 0.7, "next_workout": None})
+            bus.publish(1, {"readiness": 0.65, "next_workout": None})
+            await asyncio.sleep(0)
+            events = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert not bus.wants_updates(1)
+        return events
+
+    events = asyncio.run(scenario())
+    assert [e["delta"] for e in events] == [{"readiness": 0.7, "next_workout": None}, {"readiness": 0.65}]
+    assert [e["version"] for e in events] == [1, 2]
+
+
+class _RemoteBroker:
+    remote = True
+
+    def __init__(self) -> None:
+        self.watched: set[int] = set()
+        self.elsewhere: set[int] = set()
+
+    def publish(self, user_id: int, payload: dict) -> None:
+        pass
+
+    def watch(self, user_id: int) -> None:
+        self.watched.add(user_id)
+
+    def unwatch(self, user_id: int) -> None:
+        self.watched.discard(user_id)
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self.watched or user_id in self.elsewhere
+
+
+def test_remote_broker_is_only_used_for_users_with_subscribers() -> None:
+    async def scenario(bus: EventBus, broker: _RemoteBroker) -> None:
+        async with bus.subscription(1):
+            async with bus.subscription(1):
+                assert broker.watched == {1}
+            assert broker.watched == {1}
+        assert broker.watched == set()
+
+    bus = EventBus()
+    broker = _RemoteBroker()
+    bus.broker = broker
+    assert not bus.wants_updates(2)
+    broker.elsewhere.add(2)
+    assert bus.wants_updates(2)
+    asyncio.run(scenario(bus, broker))
+
+
+class _SharedBroker(_RemoteBroker):
+    """Fans every publish out to the buses watching the user, like a Redis channel."""
+
+    def __init__(self, buses: list[EventBus]) -> None:
+        super().__init__()
+        self.buses = buses
+        self.sent: list[dict] = []
+
+    def publish(self, user_id: int, payload: dict) -> None:
+        self.sent.append(payload)
+        for bus in self.buses:
+            if user_id in bus._subscribers:
+                bus.deliver(user_id, payload)
+
+
+def test_workers_not_streaming_a_user_publish_full_snapshots() -> None:
+    streaming, other = EventBus(), EventBus()
+    streaming.broker = other.broker = broker = _SharedBroker([streaming, other])
+
+    async def scenario() -> list[dict]:
+        async with streaming.subscription(1) as queue:
+            other.publish(1, {"readiness": 0.7, "acwr": 1.1})
+            streaming.publish(1, {"readiness": 0.6, "acwr": 1.1})
+            other.publish(1, {"readiness": 0.7, "acwr": 1.1})
+            await asyncio.sleep(0)
+            return [queue.get_nowait()["delta"] for _ in range(queue.qsize())]
+
+    full = {"readiness": 0.7, "acwr": 1.1}
+    assert asyncio.run(scenario()) == [full, {"readiness": 0.6}, full]
+    assert broker.sent[-1] == full
+    assert not streaming._snapshots and not streaming._versions
+    assert not other._snapshots
@@ -0,0 +1,30 @@
+import gzip
+import json
+from datetime import date
+
+from app.export import encode_csv, encode_ndjson, gzip_chunks
+
+COLUMNS = (("session_id", "int"), ("date", "date"), ("exercise", "str"), ("rationale", "json"))
+
+
+def _rows(count: int):
+    for i in range(count):
+        yield i, date(2024, 1, 1), "Bench, Press", {"fatigue": 0.5} if i % 2 else None
+
+
+def test_csv_export_is_chunked_and_complete() -> None:
+    chunks = list(encode_csv(COLUMNS, _rows(500), chunk_bytes=1024))
+    assert len(chunks) > 1
+    assert all(len(chunk) < 2048 for chunk in chunks)
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0] == "session_id,date,exercise,rationale"
+    assert lines[1] == '0,2024-01-01,"Bench, Press",'
+    assert lines[2] == '1,2024-01-01,"Bench, Press","{""fatigue"":0.5}"'
+    assert len(lines) == 501
+
+
+def test_gzipped_ndjson_round_trips() -> None:
+    body = b"".join(gzip_chunks(encode_ndjson(COLUMNS, _rows(300), chunk_bytes=512)))
+    records = [json.loads(line) for line in gzip.decompress(body).splitlines()]
+    assert len(records) == 300
+    assert records[1] == {"session_id": 1, "date": "2024-01-01", "exercise": "Bench, Press", "rationale": {"fatigue": 0.5}}
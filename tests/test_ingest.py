@@ -0,0 +1,149 @@
+import json
+import os
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.ingest import BOUNDS, IngestError, decode_sessions, encode_sessions, sessions_from_json
+from app.schemas.models import ExerciseLog, SessionInput, SessionMetrics
+
+METRICS = dict(
+    sleep_hours=7.5, resting_hr=56, hrv_rmssd=58.2, soreness=3, motivation=8, rpe_session=7.5, duration_min=75
+)
+EXERCISE = dict(exercise="Squat", sets=4, reps=5, load_kg=102.5, rir=2)
+# Timing comparison against JSON parsing; opt in with GYMYO_BENCH_INGEST=1 and run with -s.
+BENCH_INGEST = os.getenv("GYMYO_BENCH_INGEST", "0") == "1"
+
+
+def _as_json(session) -> dict:
+    return {
+        "user_id": session.user_id,
+        "metrics": {**vars(session.metrics), "date": session.metrics.date.isoformat()},
+        "exercises": [vars(ex) for ex in session.exercises],
+        "idempotency_key": session.idempotency_key,
+    }
+
+
+def _session(i: int = 0, metrics: dict | None = None, exercise: dict | None = None, key: str | None = None):
+    # Plain namespaces so out-of-range values can be encoded without the schema rejecting them first.
+    return SimpleNamespace(
+        user_id=1,
+        metrics=SimpleNamespace(date=date(2026, 1, 1) + timedelta(days=i), **{**METRICS, **(metrics or {})}),
+        exercises=[
+            SimpleNamespace(**{**EXERCISE, **(exercise or {})}),
+            SimpleNamespace(exercise="Bench Press", sets=3, reps=8, load_kg=70.0, rir=1.5),
+        ],
+        idempotency_key=key,
+    )
+
+
+def test_round_trip_into_columns() -> None:
+    batch = decode_sessions(encode_sessions([_session(0, key="a1"), _session(1)]))
+
+    assert batch.user_id == 1 and len(batch) == 2
+    assert batch.names == ["Squat", "Bench Press"]
+    assert list(batch.exercise_start) == [0, 2, 4]
+    assert list(batch.sessions["day"]) == [date(2026, 1, 1).toordinal(), date(2026, 1, 2).toordinal()]
+    assert list(batch.sessions["hrv_rmssd"]) == [58.2, 58.2]
+    assert list(batch.exercises["load_kg"]) == [102.5, 70.0, 102.5, 70.0]
+    assert list(batch.exercises["name_id"]) == [0, 1, 0, 1]
+    assert batch.idempotency_keys == ["a1", None]
+
+
+def test_binary_and_json_build_the_same_inputs() -> None:
+    sessions = [_session(0, key="a1"), _session(1)]
+    from_binary = decode_sessions(encode_sessions(sessions)).to_inputs()
+    from_json = sessions_from_json(json.dumps([_as_json(s) for s in sessions]).encode(), many=True)
+
+    assert all(isinstance(payload, SessionInput) for payload in from_binary)
+    for binary, parsed in zip(from_binary, from_json, strict=True):
+        assert (binary.user_id, binary.idempotency_key) == (parsed.user_id, parsed.idempotency_key)
+        assert vars(binary.metrics) == vars(parsed.metrics)
+        assert [vars(ex) for ex in binary.exercises] == [vars(ex) for ex in parsed.exercises]
+    assert from_binary[0].metrics.date == date(2026, 1, 1)
+    assert [ex.exercise for ex in from_binary[1].exercises] == ["Squat", "Bench Press"]
+
+
+def test_json_body_is_validated_like_the_schema() -> None:
+    good = _as_json(_session())
+    assert len(sessions_from_json(json.dumps(good).encode())) == 1
+
+    missing_date = {**good, "metrics": {k: v for k, v in good["metrics"].items() if k != "date"}}
+    heavy = {**good, "exercises": [{**EXERCISE, "load_kg": 600}]}
+    for body in (b"{", b"[]", json.dumps(missing_date).encode(), json.dumps(heavy).encode(), json.dumps([good]).encode()):
+        with pytest.raises(IngestError):
+            sessions_from_json(body)
+    with pytest.raises(IngestError):
+        sessions_from_json(json.dumps(good).encode(), many=True)
+
+
+@pytest.mark.parametrize("field", sorted(BOUNDS))
+def test_binary_and_schema_enforce_the_same_bounds(field: str) -> None:
+    low, low_inclusive, high, high_inclusive = BOUNDS[field]
+    is_metric = field in METRICS
+    model, base = (SessionMetrics, {"date": date(2026, 1, 1), **METRICS}) if is_metric else (ExerciseLog, EXERCISE)
+
+    def accepted(value) -> tuple[bool, bool]:
+        try:
+            model(**{**base, field: value})
+            schema_ok = True
+        except ValueError:
+            schema_ok = False
+        override = {field: value}
+        session = _session(metrics=override) if is_metric else _session(exercise=override)
+        try:
+            decode_sessions(encode_sessions([session]))
+            binary_ok = True
+        except IngestError:
+            binary_ok = False
+        return schema_ok, binary_ok
+
+    step = 1 if field in {"resting_hr", "duration_min", "sets", "reps"} else 0.5
+    if low - step >= 0:
+        assert accepted(low - step) == (False, False)
+    assert accepted(high + step) == (False, False)
+    assert accepted(low) == (low_inclusive, low_inclusive)
+    assert accepted(high) == (high_inclusive, high_inclusive)
+
+
+def test_rejects_what_session_input_rejects() -> None:
+    duplicate = _session()
+    duplicate.exercises[1] = SimpleNamespace(**{**EXERCISE, "exercise": "SQUAT"})
+    short_name = _session(exercise={"exercise": "S"})
+    long_key = _session(key="k" * 65)
+    nan = _session(metrics={"sleep_hours": float("nan")})
+    empty = _session()
+    empty.exercises = []
+    for session in (duplicate, short_name, long_key, nan, empty):
+        with pytest.raises(IngestError):
+            decode_sessions(encode_sessions([session]))
+
+    payload = encode_sessions([_session()])
+    for broken in (payload[:-3], payload + b"\0", b"JSON" + payload[4:]):
+        with pytest.raises(IngestError):
+            decode_sessions(broken)
+
+
+@pytest.mark.skipif(not BENCH_INGEST, reason="set GYMYO_BENCH_INGEST=1 to time binary decoding against JSON")
+def test_binary_decode_benchmark_against_json() -> None:
+    sessions = [_session(i, key=f"k{i}") for i in range(500)]
+    binary = encode_sessions(sessions)
+    as_json = [json.dumps(_as_json(s)).encode() for s in sessions]
+
+    def best_of(fn, rounds: int = 5) -> float:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    json_seconds = best_of(lambda: [sessions_from_json(body) for body in as_json])
+    binary_seconds = best_of(lambda: decode_sessions(binary).to_inputs())
+    print(
+        f"\n500 sessions: json {sum(map(len, as_json))} B {json_seconds * 1e3:.2f} ms, "
+        f"binary {len(binary)} B {binary_seconds * 1e3:.2f} ms"
+    )
+    assert len(binary) * 3 < sum(map(len, as_json))
@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import insert, select
+
+from app.db.migrations import backfill_prescription_rationale
+from app.db.models import Prescription
+from app.db.rationale import decode_extra
+from app.db.repositories import create_user
+from app.schemas.models import ProfileUpdate
+
+PROFILE = ProfileUpdate(age=30, bodyweight_kg=80, training_age_years=4, goal="strength", mrv_baseline_sets=18)
+
+
+def test_rationale_backfill_is_idempotent(sqlite_db) -> None:
+    user_id = create_user(sqlite_db, PROFILE).id
+    row = {
+        "user_id": user_id,
+        "target_date": date(2025, 3, 5),
+        "exercise": "Squat",
+        "sets": 3,
+        "reps": 5,
+        "load_kg": 100.0,
+        "deload": False,
+    }
+    sqlite_db.execute(
+        insert(Prescription),
+        [
+            {**row, "rationale": {"fatigue": 0.4, "note": "legacy"}},
+            {**row, "rationale": {}, "fatigue": 0.2, "rationale_extra": None},
+        ],
+    )
+    sqlite_db.commit()
+    bind = sqlite_db.get_bind()
+
+    assert backfill_prescription_rationale(bind) == 1
+    assert backfill_prescription_rationale(bind) == 0
+    sqlite_db.expire_all()
+    legacy, current = sqlite_db.scalars(select(Prescription).order_by(Prescription.id)).all()
+    assert legacy.rationale == {} and legacy.readiness is None and legacy.fatigue == 0.4
+    assert decode_extra(legacy.rationale_extra) == {"note": "legacy"}
+    assert current.fatigue == 0.2
@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.repositories import _pg_session_upsert, _prescription_insert, _record_upsert
+from app.schemas.models import ExerciseLog, SessionInput, SessionMetrics, TrainingPrescription
+
+# Every DB test runs on SQLite, so these only check the PostgreSQL statements compile.
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_session_upsert_compiles_as_one_cte_statement() -> None:
+    metrics = SessionMetrics(
+        date=date(2025, 1, 6),
+        sleep_hours=7.5,
+        resting_hr=56,
+        hrv_rmssd=58,
+        soreness=3,
+        motivation=8,
+        rpe_session=7.5,
+        duration_min=75,
+    )
+    exercises = [ExerciseLog(exercise="Squat", sets=4, reps=5, load_kg=100, rir=2)]
+    sql = _compile(_pg_session_upsert(SessionInput(user_id=1, metrics=metrics, exercises=exercises), "key"))
+    assert sql.startswith("WITH upserted_session AS")
+    assert sql.count("ON CONFLICT") == 3
+
+
+def test_record_and_prescription_upserts_compile() -> None:
+    records = _compile(_record_upsert(postgresql.insert, 1, [(date(2025, 1, 6), "Squat", 5, 100.0, 2.0)]))
+    assert "ON CONFLICT (user_id, exercise) DO UPDATE" in records
+    prescription = TrainingPrescription(
+        target_date=date(2025, 1, 7),
+        exercise="Squat",
+        sets=4,
+        reps=5,
+        load_kg=102.5,
+        deload=False,
+        rationale={"readiness": 0.7, "note": "steady"},
+    )
+    sql = _compile(_prescription_insert(postgresql.insert, 1, prescription, 3, date(2025, 1, 7)))
+    assert "ON CONFLICT (user_id, data_version, computed_on) DO NOTHING RETURNING" in sql
@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import func, select
+
+from app.db.models import Prescription
+from app.db.repositories import (
+    create_user,
+    get_cached_prescription,
+    get_stale_prescription_users,
+    mark_prescription_skipped,
+    save_prescription,
+    save_session,
+)
+from app.schemas.models import ExerciseLog, ProfileUpdate, SessionInput, SessionMetrics, TrainingPrescription
+
+PROFILE = ProfileUpdate(age=30, bodyweight_kg=80, training_age_years=4, goal="strength", mrv_baseline_sets=18)
+DAY = date(2025, 3, 5)
+
+
+def test_skipped_users_wait_for_their_next_write(sqlite_db) -> None:
+    first = create_user(sqlite_db, PROFILE).id
+    second = create_user(sqlite_db, PROFILE).id
+    assert [row[0] for row in get_stale_prescription_users(sqlite_db, DAY)] == [first, second]
+
+    mark_prescription_skipped(sqlite_db, first, 0)
+    assert [row[0] for row in get_stale_prescription_users(sqlite_db, DAY)] == [second]
+
+    metrics = SessionMetrics(
+        date=date(2025, 3, 3),
+        sleep_hours=7.5,
+        resting_hr=56,
+        hrv_rmssd=58,
+        soreness=3,
+        motivation=8,
+        rpe_session=7.5,
+        duration_min=75,
+    )
+    exercises = [ExerciseLog(exercise="Squat", sets=3, reps=5, load_kg=100, rir=2)]
+    save_session(sqlite_db, SessionInput(user_id=first, metrics=metrics, exercises=exercises, idempotency_key="a"))
+    assert [row[:2] for row in get_stale_prescription_users(sqlite_db, DAY)] == [(first, 1), (second, 0)]
+
+
+def test_one_prescription_is_stored_per_version_and_day(sqlite_db) -> None:
+    user_id = create_user(sqlite_db, PROFILE).id
+    prescription = TrainingPrescription(
+        target_date=DAY, exercise="Squat", sets=3, reps=5, load_kg=100, deload=False, rationale={"fatigue": 0.3}
+    )
+    first = save_prescription(sqlite_db, user_id, prescription, data_version=0, computed_on=DAY)
+    # A second worker computing the same prescription keeps the stored row.
+    assert save_prescription(sqlite_db, user_id, prescription, data_version=0, computed_on=DAY) == first
+    assert sqlite_db.scalar(select(func.count()).select_from(Prescription)) == 1
+
+    assert get_cached_prescription(sqlite_db, user_id, 0, DAY).rationale["fatigue"] == 0.3
+    assert get_cached_prescription(sqlite_db, user_id, 0, date(2025, 3, 6)) is None
+    assert get_stale_prescription_users(sqlite_db, DAY) == []
+    assert [row[0] for row in get_stale_prescription_users(sqlite_db, date(2025, 3, 6))] == [user_id]
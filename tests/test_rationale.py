@@ -0,0 +1,25 @@
+from app.db.rationale import decode_extra, encode_extra, join_rationale, split_rationale
+
+
+def test_rationale_round_trips_through_typed_columns_and_extra() -> None:
+    rationale = {
+        "readiness": 0.71,
+        "fatigue": 1.8,
+        "trend": -0.02,
+        "mrv_sets": 16.0,
+        "adaptation_score": 0.4,
+        "deload": "1",
+        "acwr": 1.62,
+        "note": "travel week",
+    }
+    typed, extra = split_rationale(rationale)
+    assert typed["readiness"] == 0.71 and typed["acwr"] == 1.62
+    assert decode_extra(extra) == {"note": "travel week"}
+    assert join_rationale(typed, True, extra) == rationale
+
+
+def test_extra_encoding_preserves_value_types() -> None:
+    values = {"sessions": 12, "score": 0.5, "flagged": True, "missing": None, "tags": ["a", "b"]}
+    encoded = encode_extra(values)
+    assert decode_extra(encoded) == values
+    assert encode_extra({}) is None and decode_extra(None) == {}
@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.db.database import ShardRouter, create_database_engine
+from app.db.migrations import upgrade_schema
+from app.db.repositories import create_user, save_prescription, update_user_profile
+from app.schemas.models import ProfileUpdate, TrainingPrescription
+
+PROFILE = ProfileUpdate(age=30, bodyweight_kg=80, training_age_years=4, goal="strength", mrv_baseline_sets=18)
+
+
+def test_only_writes_of_user_data_make_reads_sticky(tmp_path) -> None:
+    bind = create_database_engine(f"sqlite:///{tmp_path / 'gymyo.db'}")
+    upgrade_schema(bind)
+    router = ShardRouter(bind, [], {})
+    with router.shard_session(0) as db:
+        user_id = create_user(db, PROFILE).id
+
+    prescription = TrainingPrescription(
+        target_date=date(2025, 3, 5), exercise="Squat", sets=3, reps=5, load_kg=100, deload=False, rationale={}
+    )
+    with router.session(user_id) as db:
+        save_prescription(db, user_id, prescription, data_version=0)
+    assert not router._recent_writers.is_sticky(user_id)
+
+    with router.session(user_id) as db:
+        update_user_profile(db, user_id, PROFILE)
+    assert router._recent_writers.is_sticky(user_id)
+    bind.dispose()
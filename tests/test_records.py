@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.db.repositories import create_user, get_personal_records, save_session
+from app.schemas.models import ExerciseLog, ProfileUpdate, SessionInput, SessionMetrics
+
+PROFILE = ProfileUpdate(age=30, bodyweight_kg=80, training_age_years=4, goal="strength", mrv_baseline_sets=18)
+
+
+def _session(user_id: int, day: date, exercises: list[ExerciseLog], key: str) -> SessionInput:
+    metrics = SessionMetrics(
+        date=day,
+        sleep_hours=7.5,
+        resting_hr=56,
+        hrv_rmssd=58,
+        soreness=3,
+        motivation=8,
+        rpe_session=7.5,
+        duration_min=75,
+    )
+    return SessionInput(user_id=user_id, metrics=metrics, exercises=exercises, idempotency_key=key)
+
+
+def test_corrected_retry_lowers_and_drops_records(sqlite_db) -> None:
+    user_id = create_user(sqlite_db, PROFILE).id
+    first = [ExerciseLog(exercise="Squat", sets=3, reps=5, load_kg=120, rir=2)]
+    save_session(sqlite_db, _session(user_id, date(2025, 3, 3), first, "a"))
+    typo = [
+        ExerciseLog(exercise="Squat", sets=3, reps=5, load_kg=400, rir=2),
+        ExerciseLog(exercise="Curl", sets=3, reps=12, load_kg=20, rir=1),
+    ]
+    save_session(sqlite_db, _session(user_id, date(2025, 3, 5), typo, "b"))
+    assert get_personal_records(sqlite_db, user_id, "squat")[0].heaviest_load_kg == 400
+
+    fixed = [ExerciseLog(exercise="Squat", sets=3, reps=5, load_kg=140, rir=2)]
+    save_session(sqlite_db, _session(user_id, date(2025, 3, 5), fixed, "b"))
+
+    squat = get_personal_records(sqlite_db, user_id, "squat")[0]
+    assert squat.heaviest_load_kg == 140
+    assert squat.heaviest_load_date == date(2025, 3, 5)
+    assert squat.most_reps == 5 and squat.most_reps_date == date(2025, 3, 3)
+    assert get_personal_records(sqlite_db, user_id, "curl") == []
@@ -0,0 +1,160 @@
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.core.analytics import AnalyticsWindows, extend_with_rollups, summarize_history
+from app.db.models import Session as SessionDB
+from app.db.repositories import (
+    backfill_training_loads,
+    create_user,
+    get_baseline,
+    get_data_version,
+    get_e1rm_trend,
+    get_load_states,
+    get_personal_records,
+    get_strength_curves,
+    get_weekly_rollups,
+    get_weekly_volume,
+    iter_session_history,
+    merge_duplicate_sessions,
+    rebuild_baseline,
+    rebuild_personal_records,
+    rebuild_strength_curves,
+    rollup_sessions_through,
+    save_session,
+    update_metrics,
+)
+from app.schemas.models import ExerciseLog, ProfileUpdate, SessionInput, SessionMetrics
+
+PROFILE = ProfileUpdate(age=30, bodyweight_kg=80, training_age_years=4, goal="strength", mrv_baseline_sets=18)
+START = date(2025, 1, 6)
+THROUGH = date(2025, 2, 2)
+
+
+def _metrics(day: date, sleep: float = 7.5) -> SessionMetrics:
+    return SessionMetrics(
+        date=day,
+        sleep_hours=sleep,
+        resting_hr=56,
+        hrv_rmssd=58,
+        soreness=3,
+        motivation=8,
+        rpe_session=7.5,
+        duration_min=75,
+    )
+
+
+def _session(user_id: int, i: int, key: str | None = None, squat: float | None = None, day: date | None = None):
+    exercises = [
+        ExerciseLog(exercise="Squat", sets=4, reps=5 + i % 3, load_kg=squat or 100 + i, rir=2),
+        ExerciseLog(exercise="Bench Press", sets=3, reps=8, load_kg=70 + i % 5, rir=1.5),
+    ]
+    metrics = _metrics(day or START + timedelta(days=2 * i), sleep=6 + i % 4)
+    return SessionInput(user_id=user_id, metrics=metrics, exercises=exercises, idempotency_key=key or f"s{i}")
+
+
+def _history(db, sessions: int = 24) -> int:
+    user_id = create_user(db, PROFILE).id
+    for i in range(sessions):
+        save_session(db, _session(user_id, i))
+    return user_id
+
+
+def _weeks(db, user_id: int) -> dict:
+    return {
+        week.week_start: (
+            week.sessions,
+            round(week.readiness_sum, 6),
+            {name: round(totals.tonnage, 6) for name, totals in week.exercises.items()},
+        )
+        for week in get_weekly_rollups(db, user_id)
+    }
+
+
+def test_rebuilds_after_archiving_keep_archived_history(sqlite_db) -> None:
+    user_id = _history(sqlite_db)
+    records = get_personal_records(sqlite_db, user_id)
+    baseline = get_baseline(sqlite_db, user_id)
+    loads = get_load_states(sqlite_db, user_id)
+    curves = get_strength_curves(sqlite_db, user_id)
+
+    assert rollup_sessions_through(sqlite_db, user_id, THROUGH, archive=True) == 14
+    assert sqlite_db.query(SessionDB).filter(SessionDB.user_id == user_id).count() == 10
+
+    version = get_data_version(sqlite_db, user_id)[0]
+    rebuild_personal_records(sqlite_db, user_id)
+    rebuilt_baseline = rebuild_baseline(sqlite_db, user_id)
+    rebuilt_loads = backfill_training_loads(sqlite_db, user_id)
+    assert get_data_version(sqlite_db, user_id)[0] == version + 3
+    rebuild_strength_curves(sqlite_db, user_id)
+
+    assert [vars(record) for record in get_personal_records(sqlite_db, user_id)] == [vars(r) for r in records]
+    for (name, stat), (_, rebuilt) in zip(baseline.stats(), rebuilt_baseline.stats()):
+        assert rebuilt.count == stat.count, name
+        assert rebuilt.mean == pytest.approx(stat.mean) and rebuilt.m2 == pytest.approx(stat.m2)
+    day = START + timedelta(days=60)
+    assert set(rebuilt_loads) == set(loads)
+    for muscle, state in loads.items():
+        assert rebuilt_loads[muscle].decayed(day).acute == pytest.approx(state.decayed(day).acute)
+        assert rebuilt_loads[muscle].decayed(day).chronic == pytest.approx(state.decayed(day).chronic)
+        assert rebuilt_loads[muscle].first_date == state.first_date
+    rebuilt_curves = get_strength_curves(sqlite_db, user_id)
+    for name, curve in curves.items():
+        assert rebuilt_curves[name].sets == curve.sets
+        assert rebuilt_curves[name].intercept == pytest.approx(curve.intercept)
+
+
+def test_writes_to_rolled_up_sessions_refold_their_weeks(sqlite_db) -> None:
+    user_id = _history(sqlite_db)
+    rollup_sessions_through(sqlite_db, user_id, THROUGH)
+
+    save_session(sqlite_db, _session(user_id, 2, squat=150))
+    save_session(sqlite_db, _session(user_id, 3, day=THROUGH + timedelta(days=3)))
+    update_metrics(sqlite_db, user_id, _metrics(START + timedelta(days=8), sleep=9))
+    save_session(sqlite_db, _session(user_id, 5, key="dup"))
+    assert merge_duplicate_sessions(sqlite_db, user_id) == 1
+
+    fresh = _history(sqlite_db, sessions=0)
+    for i in range(24):
+        if i == 3:
+            continue
+        payload = _session(fresh, i, squat=150 if i == 2 else None)
+        if i == 4:
+            payload.metrics = _metrics(START + timedelta(days=8), sleep=9)
+        save_session(sqlite_db, payload)
+    rollup_sessions_through(sqlite_db, fresh, THROUGH)
+    assert _weeks(sqlite_db, user_id) == _weeks(sqlite_db, fresh)
+
+
+def test_archived_weeks_reject_changes(sqlite_db) -> None:
+    user_id = _history(sqlite_db)
+    rollup_sessions_through(sqlite_db, user_id, THROUGH, archive=True)
+    backdated = _session(user_id, 30, key="late", day=START + timedelta(days=1))
+    save_session(sqlite_db, backdated)
+    rollup_sessions_through(sqlite_db, user_id, THROUGH)
+
+    with pytest.raises(ValueError, match="archived week"):
+        update_metrics(sqlite_db, user_id, _metrics(backdated.metrics.date, sleep=9))
+    with pytest.raises(ValueError, match="archived week"):
+        save_session(sqlite_db, _session(user_id, 30, key="late", squat=150, day=backdated.metrics.date))
+    assert get_personal_records(sqlite_db, user_id, "squat")[0].heaviest_load_kg == 130
+
+
+def test_volume_and_e1rm_queries_match_the_history_pass(sqlite_db) -> None:
+    user_id = _history(sqlite_db)
+    windows = AnalyticsWindows(sessions=3, volume_weeks=6, e1rm_sessions=15)
+    for through in (None, THROUGH):
+        if through is not None:
+            rollup_sessions_through(sqlite_db, user_id, through)
+        history = iter_session_history(sqlite_db, user_id, after=through)
+        curve = get_strength_curves(sqlite_db, user_id)["squat"]
+        summary = summarize_history(history, "Squat", windows, curve=curve)
+        if through is not None:
+            summary = extend_with_rollups(summary, get_weekly_rollups(sqlite_db, user_id), "Squat", windows)
+
+        volume = get_weekly_volume(sqlite_db, user_id, weeks=windows.volume_weeks)
+        assert {(p.week_start, p.muscle): p.volume for p in volume} == pytest.approx(summary.weekly_volume)
+        trend = get_e1rm_trend(sqlite_db, user_id, "Squat", sessions=windows.e1rm_sessions)
+        assert [(p.date, p.e1rm) for p in trend] == [(day, pytest.approx(e1rm)) for day, e1rm in summary.e1rm_trend]
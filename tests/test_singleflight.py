@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_threads_share_one_execution() -> None:
+    group = SingleFlight("test")
+    release = threading.Event()
+    executions = []
+
+    def compute() -> str:
+        executions.append(1)
+        release.wait(timeout=5)
+        return "prescription"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(group.do, (1, 7), compute) for _ in range(4)]
+        while group.stats.calls < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert results == ["prescription"] * 4
+    assert len(executions) == 1
+    stats = group.stats.as_dict()
+    assert (stats["executions"], stats["coalesced"], stats["in_flight"]) == (1, 3, 0)
+    assert stats["coalesced_ratio"] == 0.75
+    # A finished flight is not reused: the next call recomputes.
+    assert group.do((1, 7), lambda: "fresh") == "fresh"
+
+
+
+def test_waiting_callers_share_the_leader_error() -> None:
+    group = SingleFlight("test")
+    release = threading.Event()
+
+    def compute() -> str:
+        release.wait(timeout=5)
+        raise ValueError("Need at least 5 sessions")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(group.do, (2, 1), compute) for _ in range(3)]
+        while group.stats.calls < 3:
+            time.sleep(0.001)
+        release.set()
+        errors = [future.exception(timeout=5) for future in futures]
+
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert group.stats.errors == 1 and group.stats.coalesced == 2
+    assert group.stats.in_flight == 0
@@ -0,0 +1,69 @@
+import gzip
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.responses import FileResponse
+
+from app.static import IMMUTABLE_CACHE, REVALIDATE_CACHE, SpaBundle
+
+INDEX = b"<!doctype html><div id=root></div>"
+CHUNK = b"console.log('app')"
+
+
+@pytest.fixture
+def bundle(tmp_path) -> SpaBundle:
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(INDEX)
+    (tmp_path / "index.html.br").write_bytes(b"brotli index")
+    (tmp_path / "index.html.gz").write_bytes(gzip.compress(INDEX))
+    (tmp_path / "assets" / "app-1a2b.js").write_bytes(CHUNK)
+    (tmp_path / "assets" / "app-1a2b.js.gz").write_bytes(gzip.compress(CHUNK))
+    (tmp_path / "favicon.svg").write_bytes(b"<svg/>")
+    return SpaBundle.load(tmp_path)
+
+
+def test_client_routes_fall_back_to_the_index(bundle) -> None:
+    response = bundle.response("history/42", {})
+    assert response.status_code == 200
+    assert response.body == INDEX
+    assert response.media_type == "text/html"
+    assert response.headers["cache-control"] == REVALIDATE_CACHE
+
+
+@pytest.mark.parametrize("path", ["assets/app-0000.js", "assets/old", "robots.txt", "api", "api/profile"])
+def test_missing_files_and_api_paths_are_404(bundle, path) -> None:
+    assert bundle.response(path, {}).status_code == 404
+
+
+def test_hashed_assets_are_immutable_and_streamed(bundle, tmp_path) -> None:
+    response = bundle.response("assets/app-1a2b.js", {})
+    assert isinstance(response, FileResponse)
+    assert response.path == tmp_path / "assets" / "app-1a2b.js"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE
+    assert bundle.response("favicon.svg", {}).headers["cache-control"] == REVALIDATE_CACHE
+
+
+def test_precompressed_variants_follow_accept_encoding(bundle) -> None:
+    assert bundle.response("", {"accept-encoding": "gzip, br"}).headers["content-encoding"] == "br"
+    assert bundle.response("", {"accept-encoding": "br;q=0, gzip"}).headers["content-encoding"] == "gzip"
+    identity = bundle.response("", {"accept-encoding": "deflate"})
+    assert "content-encoding" not in identity.headers
+    assert identity.body == INDEX
+    chunk = bundle.response("assets/app-1a2b.js", {"accept-encoding": "br, gzip"})
+    assert chunk.headers["content-encoding"] == "gzip"
+    assert chunk.headers["vary"] == "Accept-Encoding"
+
+
+def test_matching_etag_answers_304_per_variant(bundle) -> None:
+    etag = bundle.response("", {"accept-encoding": "gzip"}).headers["etag"]
+    assert bundle.response("", {"accept-encoding": "gzip", "if-none-match": etag}).status_code == 304
+    assert bundle.response("", {"if-none-match": etag}).status_code == 200
+
+
+def test_load_requires_an_index(tmp_path) -> None:
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "app.js").write_bytes(CHUNK)
+    with pytest.raises(FileNotFoundError, match="index.html"):
+        SpaBundle.load(tmp_path)
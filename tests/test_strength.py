@@ -0,0 +1,93 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.prediction import epley_e1rm, next_session_load_predictor
+from app.core.strength import CurveStats, accumulate_curve_stats, fit_curves
+
+
+def _logs(true_1rm: float, reps_factor: float, count: int, seed: int = 3):
+    rng = random.Random(seed)
+    start = date(2026, 1, 1)
+    for i in range(count):
+        reps, rir = rng.choice([(3, 1), (5, 2), (8, 2), (10, 1), (12, 2)])
+        load = true_1rm / (1 + reps_factor * (reps + rir)) * rng.uniform(0.99, 1.01)
+        yield start + timedelta(days=2 * i), "Squat", 3, reps, round(load, 1), rir
+
+
+def test_fit_recovers_each_lifters_curve_in_one_pass() -> None:
+    rows = list(_logs(150.0, 1 / 25, 40)) + [(date(2026, 1, 1), "Bench Press", 4, 5, 100.0, 2)]
+    curves = fit_curves(accumulate_curve_stats(rows))
+
+    assert curves["squat"].e1rm == pytest.approx(150.0, rel=0.02)
+    assert 1 / curves["squat"].reps_factor == pytest.approx(25.0, rel=0.1)
+    # A single rep range carries no shape information, so the prior makes it exactly Epley.
+    assert curves["bench press"].e1rm == epley_e1rm(100.0, 5, 2)
+    assert curves["bench press"].reps_factor == pytest.approx(1 / 30)
+
+
+def test_incremental_folds_match_a_full_refit() -> None:
+    rows = list(_logs(120.0, 1 / 28, 30))
+    batch = accumulate_curve_stats(rows)
+
+    incremental: dict[str, CurveStats] = {}
+    for row in rows[:10] + rows[20:] + rows[10:20]:  # includes backdated sessions
+        accumulate_curve_stats([row], incremental)
+
+    assert incremental["squat"].as_of == batch["squat"].as_of
+    for field in ("sw", "sr", "srr", "sy", "sry"):
+        assert getattr(incremental["squat"], field) == pytest.approx(getattr(batch["squat"], field))
+    assert fit_curves(incremental)["squat"].e1rm == pytest.approx(fit_curves(batch)["squat"].e1rm)
+
+
+def test_load_predictor_uses_the_fitted_curve() -> None:
+    curve = fit_curves(accumulate_curve_stats(_logs(150.0, 1 / 25, 40)))["squat"]
+    expected = 150.0 / (1 + (5 + 2) / 25)
+
+    load = next_session_load_predictor(expected, one_rm=0.0, target_reps=5, readiness=0.5, curve=curve, target_rir=2)
+    assert load == pytest.approx(expected, rel=0.02)
+
+
+def test_corrected_retry_refits_like_a_rebuild(sqlite_db) -> None:
+    from app.db.repositories import (
+        create_user,
+        get_e1rm_series,
+        get_strength_curves,
+        rebuild_strength_curves,
+        save_session,
+    )
+    from app.schemas.models import ExerciseLog, ProfileUpdate, SessionInput, SessionMetrics
+
+    profile = ProfileUpdate(age=30, bodyweight_kg=80, training_age_years=4, goal="strength", mrv_baseline_sets=18)
+    user_id = create_user(sqlite_db, profile).id
+
+    def save(day: date, exercises: list[tuple], key: str) -> None:
+        metrics = SessionMetrics(
+            date=day,
+            sleep_hours=7.5,
+            resting_hr=56,
+            hrv_rmssd=58,
+            soreness=3,
+            motivation=8,
+            rpe_session=7.5,
+            duration_min=75,
+        )
+        logs = [ExerciseLog(exercise=e[0], sets=e[1], reps=e[2], load_kg=e[3], rir=e[4]) for e in exercises]
+        save_session(sqlite_db, SessionInput(user_id=user_id, metrics=metrics, exercises=logs, idempotency_key=key))
+
+    for i, (_, _, sets, reps, load, rir) in enumerate(_logs(150.0, 1 / 25, 12)):
+        save(date(2026, 1, 1) + timedelta(days=2 * i), [("Squat", sets, reps, load, rir)], f"s{i}")
+    save(date(2026, 2, 1), [("Squat", 3, 5, 400.0, 2), ("Curl", 3, 12, 20.0, 1)], "typo")
+    save(date(2026, 2, 2), [("Squat", 3, 5, 120.0, 2)], "typo")
+
+    corrected = get_strength_curves(sqlite_db, user_id)
+    rebuild_strength_curves(sqlite_db, user_id)
+    rebuilt = get_strength_curves(sqlite_db, user_id)
+
+    assert set(corrected) == set(rebuilt) == {"squat"}
+    assert corrected["squat"].sets == rebuilt["squat"].sets
+    assert corrected["squat"].intercept == pytest.approx(rebuilt["squat"].intercept)
+    assert corrected["squat"].slope == pytest.approx(rebuilt["squat"].slope)
+    latest = get_e1rm_series(sqlite_db, user_id)["Squat"][-1]
+    assert latest == (date(2026, 2, 2), rebuilt["squat"].e1rm_from(120.0, 5, 2))
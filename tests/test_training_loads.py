@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.db.repositories import backfill_training_loads, create_user, get_load_states, save_session, update_metrics
+from app.schemas.models import ExerciseLog, ProfileUpdate, SessionInput, SessionMetrics
+
+PROFILE = ProfileUpdate(age=30, bodyweight_kg=80, training_age_years=4, goal="strength", mrv_baseline_sets=18)
+
+
+def _metrics(day: date, rpe: float) -> SessionMetrics:
+    return SessionMetrics(
+        date=day,
+        sleep_hours=7.5,
+        resting_hr=56,
+        hrv_rmssd=58,
+        soreness=3,
+        motivation=8,
+        rpe_session=rpe,
+        duration_min=75,
+    )
+
+
+def test_corrections_keep_loads_equal_to_a_backfill(sqlite_db) -> None:
+    user_id = create_user(sqlite_db, PROFILE).id
+    start = date(2025, 3, 3)
+    for i in range(6):
+        exercises = [ExerciseLog(exercise="Squat", sets=4, reps=5, load_kg=100 + i, rir=2)]
+        metrics = _metrics(start + timedelta(days=2 * i), 7)
+        save_session(sqlite_db, SessionInput(user_id=user_id, metrics=metrics, exercises=exercises, idempotency_key=f"s{i}"))
+
+    corrected = [
+        ExerciseLog(exercise="Squat", sets=3, reps=5, load_kg=90, rir=2),
+        ExerciseLog(exercise="Bench Press", sets=3, reps=8, load_kg=70, rir=1),
+    ]
+    moved = start + timedelta(days=5)
+    retry = SessionInput(user_id=user_id, metrics=_metrics(moved, 8), exercises=corrected, idempotency_key="s2")
+    save_session(sqlite_db, retry)
+    update_metrics(sqlite_db, user_id, _metrics(start + timedelta(days=10), 9))
+    incremental = get_load_states(sqlite_db, user_id)
+
+    rebuilt = backfill_training_loads(sqlite_db, user_id)
+    assert set(rebuilt) == {"All", "Lower Body", "Chest"}
+    as_of = start + timedelta(days=12)
+    for muscle, state in incremental.items():
+        expected = rebuilt[muscle].decayed(as_of) if muscle in rebuilt else None
+        assert state.decayed(as_of).acute == pytest.approx(expected.acute if expected else 0.0, abs=1e-9)
+        assert state.decayed(as_of).chronic == pytest.approx(expected.chronic if expected else 0.0, abs=1e-9)
@@ -0,0 +1,49 @@
+import math
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.trends import PrefixStats, lift_trends
+
+
+def _brute(values: list[float]) -> tuple[float, float, float]:
+    n = len(values)
+    mean = sum(values) / n
+    x_mean = (n - 1) / 2
+    var_x = sum((x - x_mean) ** 2 for x in range(n))
+    slope = sum((x - x_mean) * (y - mean) for x, y in enumerate(values)) / var_x if var_x else 0.0
+    std = math.sqrt(sum((y - mean) ** 2 for y in values) / n)
+    return slope, mean, std
+
+
+def test_every_window_matches_a_direct_fit() -> None:
+    rng = random.Random(7)
+    values = [100 + 0.4 * i + rng.gauss(0, 3) for i in range(120)]
+    stats = PrefixStats(values)
+
+    for start, end in [(0, 120), (10, 14), (60, 112), (119, 120), (37, 53)]:
+        window = stats.window(start, end)
+        slope, mean, std = _brute(values[start:end])
+        assert window.count == end - start
+        assert window.slope == pytest.approx(slope, abs=1e-9)
+        assert window.mean == pytest.approx(mean)
+        assert window.std == pytest.approx(std, abs=1e-6)
+    assert stats.last(500).count == 120
+    with pytest.raises(ValueError):
+        stats.window(5, 5)
+
+
+def test_lift_trends_flag_plateaus_only_on_complete_windows() -> None:
+    start = date(2025, 1, 1)
+    rising = [(start + timedelta(days=3 * i), 100 + 1.5 * i) for i in range(20)]
+    stalled = [(start + timedelta(days=3 * i), 140.0 + (i % 2)) for i in range(20)]
+    trends = lift_trends({"Squat": rising, "Bench": stalled, "Row": rising[:1]}, horizons=(4, 16, 52))
+
+    assert set(trends) == {"Squat", "Bench"}
+    squat = {trend.horizon: trend for trend in trends["Squat"]}
+    bench = {trend.horizon: trend for trend in trends["Bench"]}
+    assert squat[4].stats.slope == pytest.approx(1.5)
+    assert (squat[4].plateau, squat[16].plateau, squat[52].plateau) == (False, False, None)
+    assert squat[52].stats.count == 20
+    assert bench[16].plateau is True
@@ -0,0 +1,21 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.workload import LoadState, acwr_flag, backfill_load_states
+
+
+def test_incremental_updates_match_closed_form_backfill() -> None:
+    start = date(2026, 3, 2)
+    history = [(start + timedelta(days=d), {"All": load}) for d, load in [(0, 4.0), (2, 5.5), (5, 3.0), (9, 6.0)]]
+
+    state = LoadState()
+    for day, loads in [history[0], history[1], history[3], history[2]]:
+        state.add(day, loads["All"])
+    backfilled = backfill_load_states(history)["All"]
+
+    assert state.last_date == backfilled.last_date == start + timedelta(days=9)
+    assert state.acute == pytest.approx(backfilled.acute)
+    assert state.chronic == pytest.approx(backfilled.chronic)
+    assert acwr_flag(state.acwr) == "insufficient"
+    assert acwr_flag(state.decayed(start + timedelta(days=40)).acwr) == "low"
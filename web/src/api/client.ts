@@ -2,8 +2,12 @@ import type {
   AnalyticsResponse,
   DailyMetricsUpdate,
   DashboardResponse,
+  DashboardDelta,
+  ExerciseTrend,
+  PersonalRecord,
   ProfileUpdate,
   SessionInput,
+  SyncResponse,
   TrainingPrescription,
   UserProfile,
 } from "./types";
@@ -37,6 +41,14 @@ async function request<T>(path: string, init?: RequestInit): Promise<T> {
   return (await response.json()) as T;
 }
 
+function subscribe(userId: number, onDelta: (delta: DashboardDelta) => void): () => void {
+  const source = new EventSource(`/api/stream?user_id=${userId}`);
+  source.addEventListener("update", (event) => {
+    onDelta(JSON.parse((event as MessageEvent<string>).data) as DashboardDelta);
+  });
+  return () => source.close();
+}
+
 export const api = {
   getProfile: () => request<UserProfile>("/profile"),
   updateProfile: (payload: ProfileUpdate) => request<UserProfile>("/profile", { method: "PUT", body: JSON.stringify(payload) }),
@@ -45,6 +57,12 @@ export const api = {
   getNextWorkout: (userId: number) => request<TrainingPrescription>(`/next-workout?user_id=${userId}`),
   getAnalytics: (userId: number, exercise: string) => request<AnalyticsResponse>(`/analytics?user_id=${userId}&exercise=${encodeURIComponent(exercise)}`),
   getDashboard: (userId: number) => request<DashboardResponse>(`/dashboard?user_id=${userId}`),
+  getRecords: (userId: number, exercise?: string) =>
+    request<PersonalRecord[]>(`/records?user_id=${userId}${exercise ? `&exercise=${encodeURIComponent(exercise)}` : ""}`),
+  getTrends: (userId: number) => request<ExerciseTrend[]>(`/trends?user_id=${userId}`),
+  sync: (userId: number, since?: number) =>
+    request<SyncResponse>(`/sync?user_id=${userId}${since === undefined ? "" : `&since=${since}`}`),
+  subscribe,
 };
 
 export { ApiError };
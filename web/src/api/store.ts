@@ -0,0 +1,80 @@
+import { api } from "./client";
+import type { DashboardResponse, SessionSummary, SyncResponse, SyncSession, TrainingPrescription, UserProfile } from "./types";
+
+export type LocalStore = {
+  watermark: number;
+  profile: UserProfile | null;
+  sessions: Record<number, SyncSession>;
+  nextWorkout: TrainingPrescription | null;
+};
+
+const emptyStore = (): LocalStore => ({ watermark: 0, profile: null, sessions: {}, nextWorkout: null });
+
+const storageKey = (userId: number) => `gymyo:store:${userId}`;
+
+function loadStore(userId: number): LocalStore | null {
+  try {
+    const raw = localStorage.getItem(storageKey(userId));
+    return raw ? (JSON.parse(raw) as LocalStore) : null;
+  } catch {
+    return null;
+  }
+}
+
+function saveStore(userId: number, store: LocalStore): void {
+  try {
+    localStorage.setItem(storageKey(userId), JSON.stringify(store));
+  } catch {
+    // Storage full or disabled: the next sync simply starts from a snapshot again.
+  }
+}
+
+export function applyDelta(store: LocalStore, delta: SyncResponse): LocalStore {
+  const base = delta.full ? emptyStore() : store;
+  const sessions = { ...base.sessions };
+  for (const id of delta.deleted_sessions) delete sessions[id];
+  for (const session of delta.sessions) sessions[session.session_id] = session;
+  return {
+    watermark: delta.watermark,
+    profile: delta.profile ?? base.profile,
+    sessions,
+    nextWorkout: delta.next_workout ?? (delta.watermark === base.watermark ? base.nextWorkout : null),
+  };
+}
+
+/** Fetch only what changed since the cached watermark and persist the merged store. */
+export async function syncStore(userId: number): Promise<LocalStore> {
+  const cached = loadStore(userId);
+  const delta = await api.sync(userId, cached?.watermark);
+  const store = applyDelta(cached ?? emptyStore(), delta);
+  saveStore(userId, store);
+  return store;
+}
+
+function sortedSessions(store: LocalStore): SyncSession[] {
+  return Object.values(store.sessions)
+    .filter((session) => session.metrics !== null)
+    .sort((a, b) => b.metrics!.date.localeCompare(a.metrics!.date) || b.session_id - a.session_id);
+}
+
+function summarize(session: SyncSession): SessionSummary {
+  const tonnage = session.exercises.reduce((total, ex) => total + ex.load_kg * ex.reps * ex.sets, 0);
+  const avgRir = session.exercises.reduce((total, ex) => total + ex.rir, 0) / Math.max(session.exercises.length, 1);
+  return {
+    date: session.metrics!.date,
+    exercise_count: session.exercises.length,
+    tonnage: Math.round(tonnage * 100) / 100,
+    avg_rir: Math.round(avgRir * 100) / 100,
+  };
+}
+
+/** Dashboard payload derived locally; null until enough history exists for a prescription. */
+export function dashboardFromStore(store: LocalStore): DashboardResponse | null {
+  const sessions = sortedSessions(store);
+  if (!store.nextWorkout || sessions.length === 0) return null;
+  return {
+    next_workout: store.nextWorkout,
+    latest_metrics: sessions[0].metrics!,
+    recent_sessions: sessions.slice(0, 5).map(summarize),
+  };
+}
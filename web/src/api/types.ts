@@ -32,6 +32,7 @@ export type SessionInput = {
   user_id: number;
   metrics: SessionMetrics;
   exercises: ExerciseLog[];
+  idempotency_key?: string;
 };
 
 export type DailyMetricsUpdate = {
@@ -62,6 +63,11 @@ export type DashboardResponse = {
   recent_sessions: SessionSummary[];
 };
 
+export type DashboardDelta = Partial<Omit<DashboardResponse, "next_workout">> & {
+  readiness?: number | null;
+  next_workout?: TrainingPrescription | null;
+};
+
 export type WeeklyVolumePoint = {
   week_start: string;
   muscle: string;
@@ -82,3 +88,47 @@ export type AnalyticsResponse = {
   weekly_volume: WeeklyVolumePoint[];
   e1rm_trend: E1RMPoint[];
 };
+
+export type TrendWindow = {
+  horizon: number;
+  sessions: number;
+  slope: number;
+  mean: number;
+  std: number;
+  plateau: boolean | null;
+};
+
+export type ExerciseTrend = {
+  exercise: string;
+  sessions: number;
+  latest_e1rm: number;
+  windows: TrendWindow[];
+};
+
+export type PersonalRecord = {
+  exercise: string;
+  best_e1rm: number;
+  best_e1rm_date: string;
+  heaviest_load_kg: number;
+  heaviest_load_reps: number;
+  heaviest_load_date: string;
+  most_reps: number;
+  most_reps_load_kg: number;
+  most_reps_date: string;
+};
+
+export type SyncSession = {
+  session_id: number;
+  version: number;
+  metrics: SessionMetrics | null;
+  exercises: ExerciseLog[];
+};
+
+export type SyncResponse = {
+  watermark: number;
+  full: boolean;
+  profile: UserProfile | null;
+  sessions: SyncSession[];
+  deleted_sessions: number[];
+  next_workout: TrainingPrescription | null;
+};
@@ -24,6 +24,8 @@ export function AnalyticsPage(): JSX.Element {
   };
 
   useEffect(load, []);
+  // Refetch only when the server reports that this user's data changed.
+  useEffect(() => api.subscribe(USER_ID, load), [exercise]);
 
   const weeklyData = useMemo(() => {
     if (!data) return [];
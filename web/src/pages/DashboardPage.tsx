@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 
 import { api, ApiError } from "../api/client";
+import { dashboardFromStore, syncStore } from "../api/store";
 import type { DashboardResponse } from "../api/types";
 
 const USER_ID = 1;
@@ -10,12 +11,20 @@ export function DashboardPage(): JSX.Element {
   const [error, setError] = useState<string>("");
 
   useEffect(() => {
-    api
-      .getDashboard(USER_ID)
-      .then(setData)
-      .catch((err: unknown) => {
-        setError(err instanceof ApiError ? err.message : "Failed to load dashboard");
-      });
+    // Pull only the rows changed since the locally cached watermark.
+    const refresh = () =>
+      syncStore(USER_ID)
+        .then((store) => {
+          const dashboard = dashboardFromStore(store);
+          setData(dashboard);
+          setError(dashboard ? "" : "Need at least 5 sessions for next workout");
+        })
+        .catch((err: unknown) => {
+          setError(err instanceof ApiError ? err.message : "Failed to load dashboard");
+        });
+
+    refresh();
+    return api.subscribe(USER_ID, refresh);
   }, []);
 
   if (error) {
@@ -25,6 +25,8 @@ export function LogSessionPage(): JSX.Element {
     { exercise: "Squat", sets: 4, reps: 5, load_kg: 100, rir: 2 },
   ]);
   const [message, setMessage] = useState<string>("");
+  // Reused across retries of the same submission so the server can deduplicate them.
+  const [idempotencyKey, setIdempotencyKey] = useState<string>(() => crypto.randomUUID());
 
   const updateExercise = (index: number, patch: Partial<ExerciseLog>) => {
     setExercises((prev) => prev.map((row, i) => (i === index ? { ...row, ...patch } : row)));
@@ -32,10 +34,11 @@ export function LogSessionPage(): JSX.Element {
 
   const submit = async (event: FormEvent) => {
     event.preventDefault();
-    const payload: SessionInput = { user_id: USER_ID, metrics, exercises };
+    const payload: SessionInput = { user_id: USER_ID, metrics, exercises, idempotency_key: idempotencyKey };
     try {
       const response = await api.logSession(payload);
       setMessage(`Session logged with ID ${response.session_id}`);
+      setIdempotencyKey(crypto.randomUUID());
     } catch (err) {
       setMessage(err instanceof ApiError ? err.message : "Failed to log session");
     }